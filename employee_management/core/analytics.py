@@ -0,0 +1,60 @@
+from datetime import date
+
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+
+# Tenure buckets as (label, at least this many years); employees without a
+# hire date land in `unknown`
+TENURE_BUCKETS = (('<1y', 0), ('1-3y', 1), ('3-5y', 3), ('5-10y', 5), ('10y+', 10))
+
+
+def years_before(day, years):
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        # 29 February
+        return day.replace(year=day.year - years, day=28)
+
+
+def tenure_counts(employees, today):
+    # One pass with a conditional count per bucket. Tenure is compared as
+    # hired_on against cutoff dates rather than computed per row, so the
+    # (company, hired_on) index can serve it.
+    cutoffs = [years_before(today, years) for _, years in TENURE_BUCKETS]
+    counts = {}
+    for index, (label, _) in enumerate(TENURE_BUCKETS):
+        condition = Q(hired_on__lte=cutoffs[index]) if index else Q(hired_on__isnull=False)
+        if index + 1 < len(cutoffs):
+            condition &= Q(hired_on__gt=cutoffs[index + 1])
+        counts[label] = Count('id', filter=condition)
+    counts['unknown'] = Count('id', filter=Q(hired_on__isnull=True))
+    return employees.aggregate(headcount=Count('id'), **counts)
+
+
+def grouped(employees, *columns):
+    return list(employees.values(*columns).annotate(count=Count('id')).order_by(*columns))
+
+
+def workforce_analytics(employees, today=None):
+    # Headcount breakdowns for `employees` (one company's, already scoped),
+    # all computed by GROUP BY queries in the database: no employee rows are
+    # loaded
+    today = today or date.today()
+    employees = employees.order_by()
+    tenure = tenure_counts(employees, today)
+    headcount = tenure.pop('headcount')
+    hires = (
+        employees.filter(hired_on__isnull=False).annotate(month=TruncMonth('hired_on'))
+        .values('month').annotate(count=Count('id')).order_by('month')
+    )
+    return {
+        'headcount': headcount,
+        'by_status': grouped(employees, 'status'),
+        'by_department': [
+            {'department': row['department_id'], 'name': row['department__name'], 'count': row['count']}
+            for row in grouped(employees, 'department_id', 'department__name')
+        ],
+        'by_designation': grouped(employees, 'designation'),
+        'by_tenure': [{'bucket': label, 'count': count} for label, count in tenure.items()],
+        'hires_per_month': [{'month': row['month'].strftime('%Y-%m'), 'count': row['count']} for row in hires],
+    }
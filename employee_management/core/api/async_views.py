@@ -0,0 +1,144 @@
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from core.models import Employee
+from core.routers import replica_reads
+from core.sharding import ashard_for_company, sharding_enabled, tenant_queryset
+from .authentication import aauthenticate
+from .conditional import aconditional_get
+from .principal import aget_principal
+from .renderers import FastJSONRenderer
+from .serializers import UserSerializer
+
+
+class AsyncReadView(View):
+    # Async counterpart of a DRF read endpoint for ASGI deployments. Uses the
+    # same authentication and permission classes, exception handler,
+    # ETag/response cache and JSON bytes; every query goes through the async
+    # ORM, so no worker thread is held while the database answers.
+    http_method_names = ['get', 'head']
+    renderer = FastJSONRenderer()
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() not in self.http_method_names:
+            return await self.http_method_not_allowed(request, *args, **kwargs)
+        with replica_reads():
+            return await self.respond(request, *args, **kwargs)
+
+    async def respond(self, request, *args, **kwargs):
+        self.request = Request(request, authenticators=())
+        self.request.accepted_renderer = self.renderer
+        self.request.accepted_media_type = self.renderer.media_type
+        try:
+            await self.authenticate(self.request)
+            for permission in self.get_permissions():
+                if not permission.has_permission(self.request, self):
+                    self.permission_denied(permission)
+            principal = await aget_principal(self.request)
+            if sharding_enabled() and principal.company_id is not None:
+                # Fill the shard map cache, so tenant_queryset() in the sync
+                # get_queryset() code doesn't query
+                await ashard_for_company(principal.company_id)
+
+            async def render():
+                return self.render(await self.get(self.request, *args, **kwargs))
+            return await aconditional_get(self.request, principal, render)
+        except Exception as exc:
+            return self.handle_exception(exc)
+
+    def get_authenticators(self):
+        return [authenticator() for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+
+    def get_permissions(self):
+        return [permission() for permission in api_settings.DEFAULT_PERMISSION_CLASSES]
+
+    async def authenticate(self, request):
+        for authenticator in self.get_authenticators():
+            result = await aauthenticate(authenticator, request)
+            if result is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = result
+                return
+        request._not_authenticated()
+
+    def permission_denied(self, permission):
+        if self.request._authenticator is None:
+            raise exceptions.NotAuthenticated()
+        raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+
+    def check_object_permissions(self, obj):
+        for permission in self.get_permissions():
+            if not permission.has_object_permission(self.request, self, obj):
+                self.permission_denied(permission)
+
+    def render(self, data, status=200, headers=()):
+        response = HttpResponse(self.renderer.render(data), status=status,
+                                content_type=self.renderer.media_type)
+        for name, value in headers:
+            response[name] = value
+        return response
+
+    def handle_exception(self, exc):
+        # APIView.handle_exception(): 401 with WWW-Authenticate when the first
+        # authenticator offers one, 403 otherwise
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            authenticators = self.get_authenticators()
+            header = authenticators[0].authenticate_header(self.request) if authenticators else None
+            if header:
+                exc.auth_header = header
+            else:
+                exc.status_code = 403
+        response = exception_handler(exc, {'view': self, 'args': self.args, 'kwargs': self.kwargs,
+                                           'request': self.request})
+        if response is None:
+            raise exc
+        headers = [(name, value) for name, value in response.items() if name.lower() != 'content-type']
+        return self.render(response.data, response.status_code, headers)
+
+
+class AsyncViewSetReadView(AsyncReadView):
+    # list/retrieve of a ModelViewSet: scoping, fieldsets, permissions,
+    # serializer and pagination all come from the viewset itself
+    viewset_class = None
+
+    def get_viewset(self):
+        if not hasattr(self, 'viewset'):
+            action = 'retrieve' if 'pk' in self.kwargs else 'list'
+            self.viewset = self.viewset_class(
+                request=self.request, args=self.args, kwargs=self.kwargs, action=action, format_kwarg=None
+            )
+        return self.viewset
+
+    def get_permissions(self):
+        return self.get_viewset().get_permissions()
+
+    async def get(self, request, pk=None):
+        viewset = self.get_viewset()
+        # The principal is already on the request, so this builds the queryset
+        # without running any query
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        serializer_class = viewset.get_serializer_class()
+        context = viewset.get_serializer_context()
+        if pk is not None:
+            obj = await queryset.filter(pk=pk).afirst()
+            if obj is None:
+                raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+            self.check_object_permissions(obj)
+            return serializer_class(obj, context=context).data
+        paginator = viewset.paginator
+        page = await paginator.apaginate_queryset(queryset, request, view=viewset)
+        return paginator.get_paginated_response(serializer_class(page, many=True, context=context).data).data
+
+
+class AsyncProfileView(AsyncReadView):
+    async def get(self, request):
+        principal = await aget_principal(request)
+        employees = tenant_queryset(Employee.objects.select_related('user'), principal.company_id)
+        employee = await employees.filter(user_id=request.user.id).afirst()
+        if employee is None:
+            raise Http404('No Employee matches the given query.')
+        return UserSerializer(employee).data
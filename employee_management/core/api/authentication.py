@@ -0,0 +1,184 @@
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.metrics import cache_lookup
+from core.models import Company, Employee, User
+from core.sharding import sharded
+
+def claims_settings():
+    return {
+        'TOKEN_CACHE_SIZE': 10000,
+        'REVOCATION_CHECK_INTERVAL': 30,
+        **getattr(settings, 'JWT_CLAIMS_AUTH', {}),
+    }
+
+
+def add_principal_claims(token, user):
+    # Claims read by ClaimsJWTAuthentication instead of loading the user
+    employee = sharded(Employee.objects.filter(user=user)).values_list('id', 'company_id').first()
+    token['uid'] = user.pk
+    token['ver'] = user.token_version
+    token['role'] = user.role
+    token['employee_id'], token['company_id'] = employee or (None, None)
+    return token
+
+
+def revoke_tokens(*user_ids):
+    # Tokens issued up to now for these users stop being accepted: their
+    # `ver` claim no longer matches. The version lives in the database, so
+    # every worker sees it; this one also drops the tokens it has verified.
+    User.objects.using(DEFAULT_DB_ALIAS).filter(pk__in=user_ids).update(token_version=F('token_version') + 1)
+    verified_tokens.forget_users(set(user_ids))
+
+
+def is_revoked(token):
+    # Deleted and deactivated users' tokens count as revoked too
+    version = (
+        User.objects.using(DEFAULT_DB_ALIAS).filter(pk=token.get('uid'), is_active=True)
+        .values_list('token_version', flat=True).first()
+    )
+    return version is None or version != token.get('ver', 0)
+
+
+class VerifiedTokenCache:
+    # Bounded LRU of raw token -> [validated token, expiry, last revocation check]
+    # so repeat requests skip signature verification until the token expires.
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, raw_token, now):
+        with self.lock:
+            entry = self.entries.get(raw_token)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self.entries[raw_token]
+                return None
+            self.entries.move_to_end(raw_token)
+            return entry
+
+    def put(self, raw_token, token, now):
+        entry = [token, token['exp'], now]
+        with self.lock:
+            self.entries[raw_token] = entry
+            self.entries.move_to_end(raw_token)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return entry
+
+    def forget_users(self, user_ids):
+        with self.lock:
+            for raw_token in [key for key, entry in self.entries.items() if entry[0].get('uid') in user_ids]:
+                del self.entries[raw_token]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+verified_tokens = VerifiedTokenCache(claims_settings()['TOKEN_CACHE_SIZE'])
+
+
+class ClaimsUser(TokenUser):
+    # Stateless user built from the role/employee/company claims. `employee`
+    # is an unsaved reference instance carrying only IDs, so comparisons and
+    # filters work without touching the database.
+    @cached_property
+    def id(self):
+        return self.token['uid']
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def email(self):
+        return self.token.get(jwt_settings.USER_ID_CLAIM, '')
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+    @cached_property
+    def employee(self):
+        if self.token.get('employee_id') is None:
+            raise User.employee.RelatedObjectDoesNotExist('User has no employee.')
+        employee = Employee(id=self.token['employee_id'], user_id=self.id, company_id=self.token['company_id'])
+        employee.company = Company(id=self.token['company_id'])
+        return employee
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    # Opt-in replacement for JWTAuthentication that authorizes from token
+    # claims alone. Verified tokens are cached until they expire. A token is
+    # checked against its user's token_version when first seen and then at
+    # most every REVOCATION_CHECK_INTERVAL seconds, which bounds how long
+    # other workers accept a revoked token; that check is the only query.
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        now = time.time()
+        entry = verified_tokens.get(raw_token, now)
+        cache_lookup('verified_tokens', entry is not None)
+        if entry is None:
+            token = self.get_validated_token(raw_token)
+            if 'uid' not in token or 'role' not in token:
+                raise InvalidToken('Token has no role claims, sign in again')
+            entry = verified_tokens.put(raw_token, token, 0)
+        token = entry[0]
+        if now - entry[2] >= claims_settings()['REVOCATION_CHECK_INTERVAL']:
+            if is_revoked(token):
+                verified_tokens.forget_users({token['uid']})
+                raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+            entry[2] = now
+        return ClaimsUser(token), token
+
+
+async def aauthenticate(authenticator, request):
+    # authenticator.authenticate(request) for the async views. The claims
+    # class never queries; JWTAuthentication's user lookup goes through the
+    # async ORM; anything else runs in a thread.
+    if isinstance(authenticator, ClaimsJWTAuthentication):
+        return authenticator.authenticate(request)
+    if type(authenticator) is not JWTAuthentication:
+        return await sync_to_async(authenticator.authenticate)(request)
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return None
+    token = authenticator.get_validated_token(raw_token)
+    return await aget_token_user(token), token
+
+
+async def aget_token_user(token):
+    # JWTAuthentication.get_user() with the async ORM
+    if jwt_settings.USER_ID_CLAIM not in token:
+        raise InvalidToken('Token contained no recognizable user identification')
+    try:
+        user = await User.objects.aget(**{jwt_settings.USER_ID_FIELD: token[jwt_settings.USER_ID_CLAIM]})
+    except User.DoesNotExist:
+        raise AuthenticationFailed('User not found', code='user_not_found')
+    if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed('User is inactive', code='user_inactive')
+    if jwt_settings.CHECK_REVOKE_TOKEN and token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+        raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+    return user
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from core.metrics import cache_lookup
+
+
+def response_cache():
+    alias = getattr(settings, 'API_RESPONSE_CACHE', None)
+    return caches[alias] if alias else None
+
+
+def response_cache_key(principal, etag):
+    # The ETag already covers path, renderer, role and the data version of
+    # every company the caller can see; role/company keep keys readable
+    return f'api:response:{principal.role}:{principal.company_id}:{etag.strip(chr(34))}'
+
+
+def cacheable(request):
+    return response_cache() is not None and request.accepted_renderer.format == 'json'
+
+
+def cached_response(request, key):
+    if not cacheable(request):
+        return None
+    entry = response_cache().get(key)
+    cache_lookup('response', entry is not None)
+    if entry is None:
+        return None
+    content, content_type = entry
+    return HttpResponse(content, content_type=content_type)
+
+
+def store_response(request, response, key):
+    # Keep the rendered JSON bytes; the browsable API embeds per-user forms
+    if not cacheable(request) or response.status_code != 200:
+        return
+    cache = response_cache()
+
+    def store(rendered):
+        cache.set(key, (rendered.content, rendered['Content-Type']))
+    response.add_post_render_callback(store)
+
+
+async def acached_response(request, key):
+    if not cacheable(request):
+        return None
+    entry = await response_cache().aget(key)
+    cache_lookup('response', entry is not None)
+    if entry is None:
+        return None
+    content, content_type = entry
+    return HttpResponse(content, content_type=content_type)
+
+
+async def astore_response(request, response, key):
+    # The async views hand over responses that are already rendered
+    if cacheable(request) and response.status_code == 200:
+        await response_cache().aset(key, (response.content, response['Content-Type']))
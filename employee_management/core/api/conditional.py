@@ -0,0 +1,122 @@
+import hashlib
+from datetime import datetime, time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max, Subquery, Sum
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from core.models import Company, DataVersion
+from .caching import acached_response, astore_response, cached_response, response_cache_key, store_response
+from .principal import get_principal
+
+VALIDATOR_AGGREGATES = {
+    'version': Sum('data_version'), 'count': Count('pk'), 'last_id': Max('pk'), 'modified': Max('data_modified'),
+}
+# Admins see every company, so their validators also carry the version
+# deleting a company bumps, read by the same query
+DELETIONS = DataVersion.objects.filter(name='companies')
+ADMIN_VALIDATOR_AGGREGATES = {
+    **VALIDATOR_AGGREGATES,
+    'deleted': Max(Subquery(DELETIONS.values('version'))),
+    'deleted_modified': Max(Subquery(DELETIONS.values('modified'))),
+}
+
+
+def visible_companies(principal):
+    companies = Company.objects.all()
+    if principal.role != 'admin':
+        companies = companies.filter(pk=principal.company_id)
+    return companies
+
+
+def validator_state(principal):
+    if principal.role != 'admin':
+        return visible_companies(principal).aggregate(**VALIDATOR_AGGREGATES)
+    state = visible_companies(principal).aggregate(**ADMIN_VALIDATOR_AGGREGATES)
+    if not state['count']:
+        # No company row to read the subqueries through
+        deletion = DELETIONS.values('version', 'modified').first() or {}
+        state['deleted'], state['deleted_modified'] = deletion.get('version'), deletion.get('modified')
+    return state
+
+
+def validators_from_state(request, principal, state):
+    # days_employed changes at midnight without any write
+    midnight = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    last_modified = max(state['modified'] or midnight, state.get('deleted_modified') or midnight, midnight)
+    renderer = getattr(request, 'accepted_renderer', None)
+    key = '|'.join(str(part) for part in (
+        request.build_absolute_uri(), getattr(renderer, 'format', ''), principal.role,
+        principal.user_id if principal.role == 'employee' else '',
+        state['version'], state['count'], state['last_id'], state.get('deleted'), last_modified.isoformat(),
+    ))
+    etag = '"%s"' % hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+    return etag, last_modified
+
+
+def data_validators(request, principal):
+    # (ETag, Last-Modified) for whatever the caller can see, from the
+    # company data versions alone: one aggregate query, no serialization
+    return validators_from_state(request, principal, validator_state(principal))
+
+
+async def adata_validators(request, principal):
+    # QuerySet.aaggregate() only exists from Django 5.0
+    state = await sync_to_async(validator_state)(principal)
+    return validators_from_state(request, principal, state)
+
+
+def add_validators(response, etag, timestamp):
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(timestamp)
+        # Let browsers keep the body but revalidate on every use
+        response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def conditional_get(view):
+    # Answer 304 Not Modified when If-None-Match/If-Modified-Since still
+    # match, else serve the response cached under the same validators
+    @wraps(view)
+    def wrapped(self, request, *args, **kwargs):
+        principal = get_principal(request)
+        etag, last_modified = data_validators(request, principal)
+        timestamp = int(last_modified.timestamp())
+        key = response_cache_key(principal, etag)
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = cached_response(request, key)
+        if response is None:
+            response = view(self, request, *args, **kwargs)
+            store_response(request, response, key)
+        return add_validators(response, etag, timestamp)
+    return wrapped
+
+
+async def aconditional_get(request, principal, render):
+    # conditional_get() for the async views; `render` is a coroutine
+    # function returning the rendered HttpResponse
+    etag, last_modified = await adata_validators(request, principal)
+    timestamp = int(last_modified.timestamp())
+    key = response_cache_key(principal, etag)
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = await acached_response(request, key)
+    if response is None:
+        response = await render()
+        await astore_response(request, response, key)
+    return add_validators(response, etag, timestamp)
+
+
+class ConditionalGetMixin:
+    @conditional_get
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
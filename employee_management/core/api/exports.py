@@ -0,0 +1,74 @@
+import csv
+import json
+from datetime import date
+from django.core.serializers.json import DjangoJSONEncoder
+
+# (column name, values() lookup) for every exported employee column
+EMPLOYEE_EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('name', 'name'),
+    ('email', 'user__email'),
+    ('role', 'user__role'),
+    ('status', 'status'),
+    ('company', 'company_id'),
+    ('department', 'department_id'),
+    ('designation', 'designation'),
+    ('mobile_number', 'mobile_number'),
+    ('address', 'address'),
+    ('hired_on', 'hired_on'),
+)
+
+EXPORT_CHUNK_SIZE = 2000
+# Rows per chunk handed to the WSGI server; one write per row is too chatty
+LINES_PER_WRITE = 500
+
+
+class LineBuffer:
+    # File-like object for csv.writer that keeps lines until they are flushed
+    def __init__(self):
+        self.lines = []
+
+    def write(self, value):
+        self.lines.append(value)
+
+    def flush(self):
+        data = ''.join(self.lines)
+        self.lines = []
+        return data
+
+
+def employee_export_rows(queryset):
+    lookups = [lookup for _, lookup in EMPLOYEE_EXPORT_COLUMNS]
+    today = date.today()
+    rows = queryset.order_by('id').values_list(*lookups).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for row in rows:
+        hired_on = row[-1]
+        yield row + ((today - hired_on).days if hired_on else 0,)
+
+
+def export_header():
+    return [name for name, _ in EMPLOYEE_EXPORT_COLUMNS] + ['days_employed']
+
+
+def stream_csv(rows):
+    buffer = LineBuffer()
+    writer = csv.writer(buffer)
+    writer.writerow(export_header())
+    yield buffer.flush()
+    for index, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if index % LINES_PER_WRITE == 0:
+            yield buffer.flush()
+    yield buffer.flush()
+
+
+def stream_ndjson(rows):
+    header = export_header()
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    lines = []
+    for row in rows:
+        lines.append(encoder.encode(dict(zip(header, row))) + '\n')
+        if len(lines) == LINES_PER_WRITE:
+            yield ''.join(lines)
+            lines = []
+    yield ''.join(lines)
@@ -0,0 +1,105 @@
+from datetime import date
+
+from django.db.models import Func, IntegerField, Value
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from core.timing import timed_serialization
+from .fieldsets import EmployeeFieldset
+
+# EmployeeSerializer output order, with the values() column behind each field
+EMPLOYEE_VALUE_COLUMNS = {
+    'id': 'id',
+    'days_employed': 'days_employed',
+    'user': 'user_id',
+    'role': 'user__role',
+    'email': 'user__email',
+    'status': 'status',
+    'name': 'name',
+    'mobile_number': 'mobile_number',
+    'address': 'address',
+    'designation': 'designation',
+    'hired_on': 'hired_on',
+    'company': 'company_id',
+    'department': 'department_id',
+}
+
+
+class DaysSince(Func):
+    # Whole days from a date column to `today`, 0 when the column is NULL
+    # (Employee.days_employed in SQL)
+    output_field = IntegerField()
+
+    def __init__(self, expression, today, **extra):
+        super().__init__(Value(today), expression, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, template='COALESCE(CAST(julianday(%(expressions)s) AS INTEGER), 0)',
+            arg_joiner=') - julianday(', **extra_context
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, template='COALESCE(%(expressions)s::date, 0)',
+            arg_joiner='::date - ', **extra_context
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='COALESCE(DATEDIFF(%(expressions)s), 0)',
+                           **extra_context)
+
+
+def employee_values(queryset, fieldset=None):
+    # The columns EmployeeSerializer would read, as values() dicts. Pagination
+    # still works since CursorPagination reads positions from dicts too.
+    fieldset = fieldset or EmployeeFieldset()
+    columns = ['id']
+    for name, column in EMPLOYEE_VALUE_COLUMNS.items():
+        if not fieldset.includes(name) or name == 'days_employed':
+            continue
+        if name in fieldset.expand:
+            columns += [f'{name}_id', f'{name}__name']
+        elif column not in columns:
+            columns.append(column)
+    expressions = {}
+    if fieldset.includes('days_employed'):
+        expressions['days_employed'] = DaysSince('hired_on', date.today())
+    # values() joins what it needs, so select_related() is moot
+    return queryset.select_related(None).values(*columns, **expressions)
+
+
+def employee_row(values, fieldset):
+    row = {}
+    for name, column in EMPLOYEE_VALUE_COLUMNS.items():
+        if not fieldset.includes(name):
+            continue
+        if name in fieldset.expand:
+            value = {'id': values[f'{name}_id'], 'name': values[f'{name}__name']}
+        elif name == 'user':
+            # The nested UserSerializer only ever yields the user's id
+            value = {'id': values[column]}
+        elif name == 'hired_on':
+            value = values[column].isoformat() if values[column] is not None else None
+        else:
+            value = values[column]
+        row[name] = value
+    return row
+
+
+class EmployeeRowSerializer:
+    # Read-only stand-in for EmployeeSerializer over employee_values() rows:
+    # same output, without per-field serializer work
+    def __init__(self, instance=None, many=False, context=None, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+
+    @property
+    def data(self):
+        return timed_serialization(self.build)
+
+    def build(self):
+        fieldset = self.context.get('fieldset') or EmployeeFieldset()
+        if self.many:
+            return ReturnList([employee_row(values, fieldset) for values in self.instance], serializer=self)
+        return ReturnDict(employee_row(self.instance, fieldset), serializer=self)
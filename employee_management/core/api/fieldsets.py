@@ -0,0 +1,81 @@
+from rest_framework.serializers import ValidationError
+
+# What each EmployeeSerializer field reads, as only() paths. The nested
+# `user` serializer only ever outputs the user's id.
+EMPLOYEE_FIELD_COLUMNS = {
+    'id': ('id',),
+    'days_employed': ('hired_on',),
+    'user': ('user__id',),
+    'role': ('user__role',),
+    'email': ('user__email',),
+    'status': ('status',),
+    'name': ('name',),
+    'mobile_number': ('mobile_number',),
+    'address': ('address',),
+    'designation': ('designation',),
+    'hired_on': ('hired_on',),
+    'company': ('company',),
+    'department': ('department',),
+}
+EXPANDABLE = ('company', 'department')
+
+
+def parse_list(request, name):
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class EmployeeFieldset:
+    # ?fields=a,b picks the top-level fields of EmployeeSerializer and
+    # ?expand=company,department nests those relations as {id, name}
+    # instead of ids. Both also shape the queryset, so narrow requests read
+    # narrow rows and skip the joins they don't need.
+    def __init__(self, fields=None, expand=()):
+        self.fields = fields
+        self.expand = tuple(expand)
+
+    @classmethod
+    def from_request(cls, request):
+        fields = parse_list(request, 'fields')
+        expand = parse_list(request, 'expand') or []
+        errors = {}
+        if fields is not None:
+            unknown = [name for name in fields if name not in EMPLOYEE_FIELD_COLUMNS]
+            if unknown or not fields:
+                errors['fields'] = f'Unknown field(s): {", ".join(unknown)}' if unknown else 'No fields given'
+        unknown = [name for name in expand if name not in EXPANDABLE]
+        if unknown:
+            errors['expand'] = f'Can only expand: {", ".join(EXPANDABLE)}'
+        if errors:
+            raise ValidationError(errors)
+        if fields is not None:
+            # Expanding a relation implies selecting it
+            fields = list(dict.fromkeys(fields + [name for name in expand if name not in fields]))
+        return cls(fields, expand)
+
+    @property
+    def is_default(self):
+        return self.fields is None and not self.expand
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields
+
+    def apply(self, queryset):
+        related = list(self.expand)
+        if any(self.includes(name) for name in ('user', 'role', 'email')):
+            related.append('user')
+        # select_related() with no arguments would follow every relation
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        if self.fields is None:
+            return queryset
+        columns = {'id'}
+        for name in self.fields:
+            if name in self.expand:
+                columns.update((f'{name}__id', f'{name}__name'))
+            else:
+                columns.update(EMPLOYEE_FIELD_COLUMNS[name])
+        return queryset.only(*sorted(columns))
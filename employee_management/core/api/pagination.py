@@ -0,0 +1,46 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class IdCursorPagination(CursorPagination):
+    # Keyset pagination on the primary key: every page is a range scan on the
+    # index, so page 20,000 costs the same as page 1 (unlike OFFSET).
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # paginate_queryset() for the async views, fetching the page with the
+        # async ORM. Mirrors CursorPagination for the single `id` ordering.
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+
+        queryset = queryset.order_by('-id' if reverse else 'id')
+        if current_position is not None:
+            queryset = queryset.filter(**{'id__lt' if reverse else 'id__gt': current_position})
+        results = [row async for row in queryset[offset:offset + self.page_size + 1]]
+        self.page = results[:self.page_size]
+
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        has_current = current_position is not None or offset > 0
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = has_current, following_position is not None
+            self.next_position, self.previous_position = current_position, following_position
+        else:
+            self.has_next, self.has_previous = following_position is not None, has_current
+            self.next_position, self.previous_position = following_position, current_position
+        return self.page
+
+
+class SearchPagination(LimitOffsetPagination):
+    # Search results are ordered by rank, which has no stable keyset; people
+    # rarely page deep into them so LIMIT/OFFSET is fine here
+    default_limit = 20
+    max_limit = 100
@@ -0,0 +1,22 @@
+import csv
+import io
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class CSVParser(BaseParser):
+    # Parses a CSV body with a header row into a list of dicts
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            text = io.StringIO(stream.read().decode(encoding), newline='')
+            return [
+                {key: value for key, value in row.items() if value not in ('', None)}
+                for row in csv.DictReader(text)
+            ]
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise ParseError(f'CSV parse error - {exc}')
@@ -1,4 +1,5 @@
 from rest_framework import permissions
+from .principal import get_principal
 
 class IsAdminUser(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -9,10 +10,12 @@ class IsManagerUser(permissions.BasePermission):
         return request.user and request.user.role == 'manager'
 
     def has_object_permission(self, request, view, obj):
-        if request.user.role == 'manager':
-            if hasattr(obj, 'company'):
-                return obj.company == request.user.employee.company
-            return obj == request.user.employee.company
+        principal = get_principal(request)
+        if principal.role == 'manager':
+            # Compare IDs so neither side has to load a Company
+            if hasattr(obj, 'company_id'):
+                return obj.company_id == principal.company_id
+            return obj.pk == principal.company_id
         return False
 
 class IsEmployeeUser(permissions.BasePermission):
@@ -20,4 +23,4 @@ class IsEmployeeUser(permissions.BasePermission):
         return request.user and request.user.role == 'employee'
 
     def has_object_permission(self, request, view, obj):
-        return obj.user == request.user
\ No newline at end of file
+        return obj.user_id == request.user.id
\ No newline at end of file
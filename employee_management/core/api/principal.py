@@ -0,0 +1,54 @@
+from core.models import Employee
+from core.sharding import sharded
+from .authentication import ClaimsUser
+
+
+class Principal:
+    # Who is making the request, reduced to IDs: resolved once per request and
+    # shared by views, permissions and serializers.
+    def __init__(self, user_id, role, employee_id=None, company_id=None):
+        self.user_id = user_id
+        self.role = role
+        self.employee_id = employee_id
+        self.company_id = company_id
+
+    def __repr__(self):
+        return f'<Principal user={self.user_id} role={self.role} company={self.company_id}>'
+
+    @classmethod
+    def for_user(cls, user):
+        if isinstance(user, ClaimsUser):
+            return cls(user.id, user.role, user.token.get('employee_id'), user.token.get('company_id'))
+        if user.role == 'admin':
+            return cls(user.pk, user.role)
+        employee = sharded(Employee.objects.filter(user_id=user.pk)).values_list('id', 'company_id').first()
+        return cls(user.pk, user.role, *(employee or (None, None)))
+
+    @classmethod
+    async def afor_user(cls, user):
+        if isinstance(user, ClaimsUser) or user.role == 'admin':
+            return cls.for_user(user)
+        employee = await sharded(Employee.objects.filter(user_id=user.pk)).values_list('id', 'company_id').afirst()
+        return cls(user.pk, user.role, *(employee or (None, None)))
+
+
+def get_principal(request):
+    # Cache on the Django request so the DRF Request wrappers and the
+    # serializer context all see the same object
+    http_request = getattr(request, '_request', request)
+    principal = getattr(http_request, 'principal', None)
+    if principal is None or principal.user_id != request.user.pk:
+        principal = Principal.for_user(request.user)
+        http_request.principal = principal
+    return principal
+
+
+async def aget_principal(request):
+    # get_principal() for the async views; later get_principal() calls on
+    # the same request reuse the result without querying
+    http_request = getattr(request, '_request', request)
+    principal = getattr(http_request, 'principal', None)
+    if principal is None or principal.user_id != request.user.pk:
+        principal = await Principal.afor_user(request.user)
+        http_request.principal = principal
+    return principal
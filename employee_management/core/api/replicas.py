@@ -0,0 +1,14 @@
+from rest_framework.permissions import SAFE_METHODS
+
+from core.routers import replica_reads
+
+
+class ReplicaReadMixin:
+    # GET/HEAD/OPTIONS requests read from the replicas (core/routers.py);
+    # requests that write keep every query on the primary, so validation
+    # never sees a stale row
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
@@ -1,17 +1,37 @@
+from django.conf import settings
 from rest_framework import serializers
 from rest_framework.serializers import ValidationError
 from core.models import Company, Department, Employee, User
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from core.sharding import sharded
+from core.timing import TimedSerializerMixin
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from .authentication import add_principal_claims, is_revoked, revoke_tokens
+from .principal import get_principal
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     username_field = 'email'  
+
+    @classmethod
+    def get_token(cls, user):
+        # role/employee_id/company_id claims for ClaimsJWTAuthentication
+        return add_principal_claims(super().get_token(user), user)
+
     def validate(self, attrs):
         data = super().validate(attrs)
         self.user.role = self.user.role
         return data
 
 
-class UserSerializer(serializers.ModelSerializer):
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        # Refreshing copies the old claims, so revoked refresh tokens must fail here
+        if is_revoked(self.token_class(attrs['refresh'])):
+            raise InvalidToken('Token has been revoked')
+        return super().validate(attrs)
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     # Fields from the User model
     email = serializers.EmailField(source='user.email', read_only=True)
     first_name = serializers.CharField(source='user.first_name', read_only=True)
@@ -31,23 +51,29 @@ class UserSerializer(serializers.ModelSerializer):
             'mobile_number', 'address', 'hired_on', 'designation'
         )
 
-class CompanySerializer(serializers.ModelSerializer):
+class CompanySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     number_of_departments = serializers.IntegerField(read_only=True)
     number_of_employees = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Company
-        fields = '__all__'
+        exclude = ('department_count', 'employee_count', 'data_version', 'data_modified')
 
-class DepartmentSerializer(serializers.ModelSerializer):
+class DepartmentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     number_of_employees = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Department
-        fields = '__all__'
+        exclude = ('employee_count',)
         read_only_fields = ('company',)
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class RelatedSummarySerializer(serializers.Serializer):
+    # `?expand=` form of a company or department: {id, name}
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(read_only=True)
+
+
+class EmployeeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     days_employed = serializers.IntegerField(read_only=True)
     user = UserSerializer(read_only=True)
     role = serializers.SerializerMethodField() 
@@ -58,6 +84,18 @@ class EmployeeSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('user', 'company')
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Sparse fieldset from core.api.fieldsets.EmployeeFieldset, if any
+        fieldset = self.context.get('fieldset')
+        if fieldset is None or fieldset.is_default:
+            return
+        for name in list(self.fields):
+            if not fieldset.includes(name):
+                self.fields.pop(name)
+        for name in fieldset.expand:
+            self.fields[name] = RelatedSummarySerializer(read_only=True)
+
     # Method to get the role from the related User model
     def get_role(self, obj):
         return obj.user.role  
@@ -67,9 +105,16 @@ class EmployeeSerializer(serializers.ModelSerializer):
         return obj.user.email  
 
 
-class EmployeeCreateSerializer(serializers.ModelSerializer):
+class ShardedRelatedField(serializers.PrimaryKeyRelatedField):
+    # Department ids are looked up on every shard (core/sharding.py)
+    def get_queryset(self):
+        return sharded(super().get_queryset())
+
+
+class EmployeeCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     email = serializers.EmailField(write_only=True)
     password = serializers.CharField(write_only=True)
+    department = ShardedRelatedField(queryset=Department.objects.all())
     
     class Meta:
         model = Employee
@@ -104,14 +149,14 @@ class EmployeeCreateSerializer(serializers.ModelSerializer):
             })
 
         # Check if department belongs to the specified company
-        if department.company.id != company.id:
+        if department.company_id != company.id:
             raise ValidationError({
                 'department': f'Department {department.name} does not belong to company {company.name}'
             })
 
         # For managers, validate they're creating employee for their own company
         if user and user.role == 'manager':
-            if company.id != user.employee.company.id:
+            if company.id != get_principal(request).company_id:
                 raise ValidationError({
                     'company': 'You can only create employees for your own company'
                 })
@@ -147,10 +192,27 @@ class EmployeeCreateSerializer(serializers.ModelSerializer):
         )
         return employee
     
-class EmployeeUpdateSerializer(serializers.ModelSerializer):
+class EmployeeImportRowSerializer(serializers.ModelSerializer):
+    # One row of a bulk import. Company and department stay plain IDs so a
+    # row validates without queries; core.bulk checks them for the whole batch.
+    email = serializers.EmailField()
+    password = serializers.CharField()
+    company = serializers.IntegerField(required=False)
+    department = serializers.IntegerField()
+
+    class Meta:
+        model = Employee
+        fields = (
+            'name', 'email', 'password', 'company', 'department',
+            'mobile_number', 'address', 'designation', 'hired_on', 'status'
+        )
+
+
+class EmployeeUpdateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     role = serializers.ChoiceField(choices=User.ROLES, required=False)
     email = serializers.EmailField(required=False)
     name = serializers.CharField(required=False) 
+    department = ShardedRelatedField(queryset=Department.objects.all(), required=False)
     
     class Meta:
         model = Employee
@@ -168,7 +230,7 @@ class EmployeeUpdateSerializer(serializers.ModelSerializer):
         if 'department' in data:
             department = data['department']
             if user.role == 'manager':
-                if department.company != user.employee.company:
+                if department.company_id != get_principal(request).company_id:
                     raise ValidationError({
                         'department': 'Department does not belong to your company'
                     })
@@ -208,13 +270,62 @@ class EmployeeUpdateSerializer(serializers.ModelSerializer):
                 user.last_name = ' '.join(name_parts[1:]) if len(name_parts) > 1 else ''
                 instance.name = name
                 
+            role_changed = False
             if 'role' in validated_data:
-                user.role = validated_data.pop('role')
+                role = validated_data.pop('role')
+                role_changed = role != user.role
+                user.role = role
             user.save()
+            if role_changed:
+                # Tokens carry the role as a claim; make the user sign in again
+                revoke_tokens(user.id)
                 
             # Update Employee fields
             for attr, value in validated_data.items():
                 setattr(instance, attr, value)
             instance.save()
             
-            return instance
\ No newline at end of file
+            return instance
+
+
+class BulkFieldsSerializer(serializers.Serializer):
+    # A filter or patch of a bulk update: at least one field, and no unknown
+    # ones, which would otherwise be dropped silently
+    def to_internal_value(self, data):
+        if isinstance(data, dict):
+            unknown = sorted(set(data) - set(self.fields))
+            if unknown:
+                raise ValidationError({name: 'Unknown field' for name in unknown})
+        data = super().to_internal_value(data)
+        if not data:
+            raise ValidationError(f'Give at least one of: {", ".join(self.fields)}')
+        return data
+
+
+class EmployeeBulkFilterSerializer(BulkFieldsSerializer):
+    company = serializers.IntegerField(required=False)
+    department = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Employee.STATUS_CHOICES, required=False)
+    designation = serializers.CharField(required=False)
+
+
+class EmployeeBulkPatchSerializer(BulkFieldsSerializer):
+    # Department stays a plain id; core.bulk checks it once for the whole set
+    status = serializers.ChoiceField(choices=Employee.STATUS_CHOICES, required=False)
+    department = serializers.IntegerField(required=False)
+    designation = serializers.CharField(max_length=100, required=False)
+
+
+class EmployeeBulkUpdateSerializer(serializers.Serializer):
+    # {"ids": [...]} or {"filter": {...}}, plus the {"patch": {...}} to apply
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    filter = EmployeeBulkFilterSerializer(required=False)
+    patch = EmployeeBulkPatchSerializer()
+
+    def validate(self, data):
+        if ('ids' in data) == ('filter' in data):
+            raise ValidationError('Give either ids or filter')
+        max_ids = getattr(settings, 'BULK_UPDATE_MAX_IDS', 50000)
+        if len(data.get('ids', ())) > max_ids:
+            raise ValidationError({'ids': f'At most {max_ids} ids per request'})
+        return data
@@ -6,8 +6,17 @@ from .views import (
     CompanyViewSet, 
     DepartmentViewSet, 
     EmployeeViewSet,
-    UserProfileView  
+    UserProfileView,
+    DashboardView
 )
+from .async_views import AsyncProfileView, AsyncViewSetReadView
+
+def async_read_urls(prefix, viewset, basename):
+    view = AsyncViewSetReadView.as_view(viewset_class=viewset)
+    return [
+        path(f'{prefix}/', view, name=f'async-{basename}-list'),
+        path(f'{prefix}/<int:pk>/', view, name=f'async-{basename}-detail'),
+    ]
 
 router = DefaultRouter()
 router.register(r'companies', CompanyViewSet, basename='company')  
@@ -19,4 +28,12 @@ urlpatterns = [
     path('signin/', SignInView.as_view(), name='signin'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('profile/', UserProfileView.as_view(), name='user-profile'),  
+    path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    # Async twins of the hot read endpoints for ASGI servers (core/api/async_views.py)
+    path('async/', include(
+        async_read_urls('companies', CompanyViewSet, 'company')
+        + async_read_urls('departments', DepartmentViewSet, 'department')
+        + async_read_urls('employees', EmployeeViewSet, 'employee')
+        + [path('profile/', AsyncProfileView.as_view(), name='async-user-profile')]
+    )),
 ]
\ No newline at end of file
@@ -1,14 +1,35 @@
 from rest_framework import viewsets, permissions, status, generics
+from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.serializers import ValidationError 
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from .serializers import (
     CompanySerializer, DepartmentSerializer, EmployeeSerializer, EmployeeUpdateSerializer,
-    UserSerializer, EmployeeCreateSerializer
+    UserSerializer, EmployeeCreateSerializer, EmployeeImportRowSerializer, EmployeeBulkUpdateSerializer
 )
 from core.models import Company, Department, Employee, User
 from .permissions import IsAdminUser, IsManagerUser, IsEmployeeUser
+from .principal import get_principal
+from .conditional import ConditionalGetMixin, conditional_get
+from .replicas import ReplicaReadMixin
+from .fieldsets import EmployeeFieldset
+from .fastpath import EmployeeRowSerializer, employee_values
+from .renderers import FastJSONRenderer
+from rest_framework.renderers import BrowsableAPIRenderer
+from .pagination import IdCursorPagination, SearchPagination
+from core.search import search_employees
+from core.analytics import workforce_analytics
+from core.sharding import sharded, sharding_enabled, tenant_queryset
+from .exports import employee_export_rows, stream_csv, stream_ndjson
+from .parsers import CSVParser
+from rest_framework.parsers import JSONParser
+from core.bulk import import_employees, update_employees
+from core.deletion import delete_company, delete_department
+from core.metrics import SIGNINS
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.response import Response
 from rest_framework import status
@@ -25,10 +46,12 @@ class SignInView(TokenObtainPairView):
         try:
             serializer.is_valid(raise_exception=True)
         except Exception as e:
+            SIGNINS.labels('invalid_credentials').inc()
             return Response(
                 {'error': 'Invalid credentials'},
                 status=status.HTTP_401_UNAUTHORIZED
             )
+        SIGNINS.labels('success').inc()
 
         user = serializer.user
         tokens = serializer.validated_data
@@ -46,32 +69,50 @@ class SignInView(TokenObtainPairView):
 
         return Response(response_data, status=status.HTTP_200_OK)
     
-class CompanyViewSet(viewsets.ModelViewSet):
+class CompanyViewSet(ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = CompanySerializer
     
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
             permission_classes = [IsAdminUser]
+        elif self.action == 'analytics':
+            permission_classes = [IsAdminUser|IsManagerUser]
         else:
             permission_classes = [permissions.IsAuthenticated]
         return [permission() for permission in permission_classes]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'admin':
+        principal = get_principal(self.request)
+        if principal.role == 'admin':
             return Company.objects.all()
-        elif user.role in ['manager', 'employee']:
-            return Company.objects.filter(id=user.employee.company.id)
+        elif principal.role in ['manager', 'employee']:
+            return Company.objects.filter(id=principal.company_id)
         return Company.objects.none()
 
+    def perform_destroy(self, instance):
+        # Chunked set-based DELETEs of its departments, employees and their
+        # users, without per-row signals (core/deletion.py)
+        delete_company(instance)
+
     @action(detail=True, methods=['get'])
+    @conditional_get
     def departments(self, request, pk=None):
         company = self.get_object()
         departments = company.departments.all()
-        serializer = DepartmentSerializer(departments, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(departments)
+        serializer = DepartmentSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    @conditional_get
+    def analytics(self, request, pk=None):
+        # Headcount by status, department, designation and tenure, and hires
+        # per month; managers only see their own company (get_queryset)
+        company = self.get_object()
+        employees = tenant_queryset(Employee.objects.filter(company_id=company.id), company.id)
+        return Response({'company': company.id, **workforce_analytics(employees)})
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class DepartmentViewSet(ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = DepartmentSerializer
     
     def get_permissions(self):
@@ -82,19 +123,20 @@ class DepartmentViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'admin':
-            return Department.objects.all()
-        elif user.role in ['manager', 'employee']:
-            return Department.objects.filter(company=user.employee.company)
+        principal = get_principal(self.request)
+        if principal.role == 'admin':
+            return sharded(Department.objects.all())
+        elif principal.role in ['manager', 'employee']:
+            return tenant_queryset(Department.objects.filter(company_id=principal.company_id), principal.company_id)
         return Department.objects.none()
 
     serializer_class = DepartmentSerializer
     
     def perform_create(self, serializer):
-        if self.request.user.role == 'manager':
+        principal = get_principal(self.request)
+        if principal.role == 'manager':
             # For managers, automatically use their company
-            serializer.save(company=self.request.user.employee.company)
+            serializer.save(company_id=principal.company_id)
         else:
             # For admin, require company_id in request
             company_id = self.request.data.get('company')
@@ -105,15 +147,37 @@ class DepartmentViewSet(viewsets.ModelViewSet):
             company = get_object_or_404(Company, id=company_id)
             serializer.save(company=company)
 
+    def perform_destroy(self, instance):
+        # Its employees and their users go too, in chunks (core/deletion.py)
+        delete_department(instance)
+
     @action(detail=True, methods=['get'])
+    @conditional_get
     def employees(self, request, pk=None):
         department = self.get_object()
-        employees = department.employees.all()
-        serializer = EmployeeSerializer(employees, many=True)
-        return Response(serializer.data)
+        fieldset = EmployeeFieldset.from_request(request)
+        employees = fieldset.apply(department.employees.all())
+        page = self.paginate_queryset(employees)
+        serializer = EmployeeSerializer(page, many=True, context={'request': request, 'fieldset': fieldset})
+        return self.get_paginated_response(serializer.data)
+
+class EmployeeViewSet(ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
+    # Actions that honour ?fields= / ?expand=
+    fieldset_actions = ('list', 'retrieve', 'search')
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def use_fast_reads(self):
+        # JSON list/retrieve straight from values() rows (core/api/fastpath.py)
+        return (
+            self.action in ('list', 'retrieve')
+            and getattr(settings, 'EMPLOYEE_FAST_READS', False)
+            and getattr(self.request, 'accepted_renderer', None) is not None
+            and self.request.accepted_renderer.format == 'json'
+        )
 
-class EmployeeViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
+        if self.use_fast_reads():
+            return EmployeeRowSerializer
         if self.action == 'create':
             return EmployeeCreateSerializer
         elif self.action in ['update', 'partial_update']:
@@ -121,29 +185,139 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         return EmployeeSerializer
     
     def get_permissions(self):
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'bulk_import', 'bulk_update']:
             permission_classes = [IsAdminUser|IsManagerUser]
         else:
             permission_classes = [permissions.IsAuthenticated]
         return [permission() for permission in permission_classes]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'admin':
-            return Employee.objects.all()
-        elif user.role == 'manager':
-            return Employee.objects.filter(company=user.employee.company)
-        elif user.role == 'employee':
-            return Employee.objects.filter(id=user.employee.id)
-        return Employee.objects.none()
+        principal = get_principal(self.request)
+        # EmployeeSerializer reads user.email/user.role for every row
+        employees = Employee.objects.select_related('user', 'department', 'company')
+        if principal.role == 'manager':
+            employees = tenant_queryset(employees.filter(company_id=principal.company_id), principal.company_id)
+        elif principal.role == 'employee':
+            employees = tenant_queryset(employees.filter(id=principal.employee_id), principal.company_id)
+        elif principal.role == 'admin':
+            employees = sharded(employees)
+        else:
+            return Employee.objects.none()
+        if self.use_fast_reads():
+            return employee_values(employees, self.get_fieldset())
+        if self.action in self.fieldset_actions:
+            employees = self.get_fieldset().apply(employees)
+        return employees
+
+    def get_fieldset(self):
+        if not hasattr(self, '_fieldset'):
+            self._fieldset = EmployeeFieldset.from_request(self.request)
+        return self._fieldset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in self.fieldset_actions:
+            context['fieldset'] = self.get_fieldset()
+        return context
+
     def perform_create(self, serializer):
-        if self.request.user.role == 'manager':
+        principal = get_principal(self.request)
+        if principal.role == 'manager':
             # For managers, force their company
-            serializer.save(company=self.request.user.employee.company)
+            serializer.save(company=Company(id=principal.company_id))
         else:
             # For admin, allow specified company
             serializer.save()
-class UserProfileView(generics.RetrieveUpdateAPIView):
+
+    @action(detail=False, methods=['post'], url_path='bulk', parser_classes=[JSONParser, CSVParser])
+    def bulk_import(self, request):
+        # Accepts a JSON list (or {"employees": [...]}) or a CSV body with a header row
+        rows = request.data.get('employees') if isinstance(request.data, dict) else request.data
+        if not isinstance(rows, list) or not rows:
+            raise ValidationError({'employees': 'Expected a non-empty list of employees'})
+        max_rows = getattr(settings, 'BULK_IMPORT_MAX_ROWS', 50000)
+        if len(rows) > max_rows:
+            raise ValidationError({'employees': f'At most {max_rows} employees per request'})
+
+        errors = {}
+        valid = []
+        for index, row in enumerate(rows):
+            serializer = EmployeeImportRowSerializer(data=row)
+            if serializer.is_valid():
+                valid.append((index, dict(serializer.validated_data)))
+            else:
+                errors[index] = serializer.errors
+
+        principal = get_principal(request)
+        company_id = principal.company_id if principal.role == 'manager' else None
+        created, batch_errors = import_employees(valid, company_id=company_id)
+        errors.update(batch_errors)
+        return Response(
+            {
+                'created': created,
+                'errors': [{'row': index, 'errors': errors[index]} for index in sorted(errors)],
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        )
+
+    @action(detail=False, methods=['post'], url_path='bulk-update')
+    def bulk_update(self, request):
+        # Set status, department and/or designation on many employees at once,
+        # picked by ids or by a filter within what the caller can see
+        serializer = EmployeeBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        employees = self.get_queryset()
+        if 'ids' in data:
+            employees = employees.filter(id__in=data['ids'])
+        else:
+            employees = employees.filter(**{
+                f'{name}_id' if name in ('company', 'department') else name: value
+                for name, value in data['filter'].items()
+            })
+        principal = get_principal(request)
+        company_id = principal.company_id if principal.role == 'manager' else None
+        updated, errors = update_employees(employees, data['patch'], data.get('ids'), company_id)
+        if errors:
+            raise ValidationError(errors)
+        return Response({'updated': updated})
+
+    @action(detail=False, methods=['get'])
+    @conditional_get
+    def search(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'This query parameter is required.'})
+        principal = get_principal(request)
+        scope = {}
+        if principal.role == 'manager':
+            scope['company_id'] = principal.company_id
+        elif principal.role == 'employee':
+            scope['employee_id'] = principal.employee_id
+        employees = search_employees(self.get_queryset(), query, **scope)
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(employees, request, view=self)
+        serializer = EmployeeSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        # Stream the whole (role-scoped) directory without building it in memory.
+        # `output` rather than `format`, which DRF reserves for content negotiation.
+        output = request.query_params.get('output', 'csv')
+        if output not in ('csv', 'ndjson'):
+            return Response(
+                {'output': 'Must be one of: csv, ndjson'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        rows = employee_export_rows(self.get_queryset())
+        if output == 'csv':
+            response = StreamingHttpResponse(stream_csv(rows), content_type='text/csv; charset=utf-8')
+            response['Content-Disposition'] = 'attachment; filename="employees.csv"'
+        else:
+            response = StreamingHttpResponse(stream_ndjson(rows), content_type='application/x-ndjson; charset=utf-8')
+        return response
+class UserProfileView(ReplicaReadMixin, generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -152,8 +326,42 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
         user = self.request.user
 
         # Get the associated Employee object
-        employee = get_object_or_404(Employee, user=user)
+        employees = Employee.objects.select_related('user')
+        if sharding_enabled():
+            employees = tenant_queryset(employees, get_principal(self.request).company_id)
+        employee = get_object_or_404(employees, user_id=user.id)
 
         return employee
 
 
+class DashboardView(ReplicaReadMixin, APIView):
+    # Everything a dashboard shows on load, in one response: companies for
+    # admins; profile, company and departments for managers and employees.
+    # The manager dashboard's employee list pages through /api/employees/ on
+    # its own, so it isn't included. A fixed number of queries whatever the
+    # company's size; `next` links continue on the list endpoints.
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def get(self, request):
+        principal = get_principal(request)
+        if principal.role == 'admin':
+            return Response({'companies': self.first_page(Company.objects.all(), CompanySerializer, 'company-list')})
+
+        company = get_object_or_404(Company, id=principal.company_id)
+        employees = tenant_queryset(Employee.objects.filter(company_id=company.id), company.id)
+        profile = employee_values(employees.filter(id=principal.employee_id)).first()
+        if profile is None:
+            raise Http404
+        departments = tenant_queryset(Department.objects.filter(company_id=company.id), company.id)
+        return Response({
+            'profile': EmployeeRowSerializer(profile).data,
+            'company': CompanySerializer(company).data,
+            'departments': self.first_page(departments, DepartmentSerializer, 'department-list'),
+        })
+
+    def first_page(self, queryset, serializer_class, list_url_name):
+        paginator = IdCursorPagination()
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        paginator.base_url = self.request.build_absolute_uri(reverse(list_url_name))
+        return {'next': paginator.get_next_link(), 'results': serializer_class(page, many=True).data}
@@ -8,4 +8,7 @@ class CoreConfig(AppConfig):
     
     
     def ready(self):
+        import core.checks
+        import core.db
+        import core.timing
         import core.signals
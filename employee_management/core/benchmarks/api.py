@@ -0,0 +1,239 @@
+import math
+import statistics
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections, transaction
+from django.test import Client
+from django.urls import reverse
+
+from core.api import urls
+from core.api.serializers import CustomTokenObtainPairSerializer
+from core.models import Company, Department, Employee, User
+
+ROLES = ('admin', 'manager', 'employee')
+PASSWORD = 'password123'
+
+# Every route in core/api/urls.py with the methods it serves:
+# (url name, method, url args, request data). Args and string values in the
+# data name keys of the ids dict from benchmark_ids(); `victim_*` ids are
+# rows created just before a delete. Writes are rolled back afterwards, so
+# every request sees the same dataset. PUT runs the same code as PATCH, so
+# only PATCH is measured.
+SCENARIOS = [
+    ('api-root', 'get', (), None),
+    ('company-list', 'get', (), None),
+    ('company-list', 'post', (), {'name': 'Benchmark Company'}),
+    ('company-detail', 'get', ('company',), None),
+    ('company-detail', 'patch', ('company',), {'name': 'Renamed Company'}),
+    ('company-detail', 'delete', ('victim_company',), None),
+    ('company-departments', 'get', ('company',), None),
+    ('company-analytics', 'get', ('company',), None),
+    ('department-list', 'get', (), None),
+    ('department-list', 'post', (), {'name': 'Benchmark Department', 'company': 'company'}),
+    ('department-detail', 'get', ('department',), None),
+    ('department-detail', 'patch', ('department',), {'name': 'Renamed Department'}),
+    ('department-detail', 'delete', ('victim_department',), None),
+    ('department-employees', 'get', ('department',), None),
+    ('employee-list', 'get', (), None),
+    ('employee-list', 'post', (), {
+        'name': 'Benchmark Hire', 'email': 'benchmark-hire@seed.example.com', 'password': PASSWORD,
+        'company': 'company', 'department': 'department', 'mobile_number': '01012345678',
+        'address': '1 Tahrir St, Cairo', 'designation': 'Engineer',
+    }),
+    ('employee-detail', 'get', ('employee',), None),
+    ('employee-detail', 'patch', ('employee',), {'designation': 'Senior Engineer'}),
+    ('employee-detail', 'delete', ('victim_employee',), None),
+    ('employee-bulk-import', 'post', (), [
+        {'name': f'Imported {n}', 'email': f'benchmark-import{n}@seed.example.com', 'password': PASSWORD,
+         'company': 'company', 'department': 'department', 'mobile_number': '01012345678',
+         'address': '1 Tahrir St, Cairo', 'designation': 'Engineer'}
+        for n in range(10)
+    ]),
+    ('employee-bulk-update', 'post', (), {
+        'filter': {'department': 'department'}, 'patch': {'designation': 'Senior Engineer'},
+    }),
+    ('employee-search', 'get', (), {'q': 'engineer'}),
+    ('employee-export', 'get', (), None),
+    ('signin', 'post', (), {'email': 'email', 'password': PASSWORD}),
+    ('token_refresh', 'post', (), {'refresh': 'refresh'}),
+    ('user-profile', 'get', (), None),
+    ('user-profile', 'patch', (), {}),
+    ('dashboard', 'get', (), None),
+    ('async-company-list', 'get', (), None),
+    ('async-company-detail', 'get', ('company',), None),
+    ('async-department-list', 'get', (), None),
+    ('async-department-detail', 'get', ('department',), None),
+    ('async-employee-list', 'get', (), None),
+    ('async-employee-detail', 'get', ('employee',), None),
+    ('async-user-profile', 'get', (), None),
+]
+
+
+def route_names(patterns=None):
+    names = set()
+    for pattern in urls.urlpatterns if patterns is None else patterns:
+        if hasattr(pattern, 'url_patterns'):
+            names |= route_names(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def missing_routes():
+    # Routes added to core/api/urls.py without a scenario here
+    return sorted(route_names() - {name for name, *_ in SCENARIOS})
+
+
+def benchmark_users():
+    # The company in the middle of the id range, its manager and one of its
+    # employees, and the first admin
+    companies = Company.objects.order_by('id')
+    company = companies[companies.count() // 2]
+    employees = Employee.objects.filter(company=company).select_related('user').order_by('id')
+    return company, {
+        'admin': User.objects.filter(role='admin').order_by('id').first(),
+        'manager': employees.filter(user__role='manager').first().user,
+        'employee': employees.filter(user__role='employee').first().user,
+    }
+
+
+def benchmark_ids(company, user):
+    department = Department.objects.filter(company=company).order_by('id').first()
+    refresh = CustomTokenObtainPairSerializer.get_token(user)
+    return {
+        'company': company.id,
+        'department': department.id,
+        # The user's own profile; admins have none, so theirs is the first
+        # employee of the department
+        'employee': (Employee.objects.filter(user=user).values_list('id', flat=True).first()
+                     or Employee.objects.filter(department=department).order_by('id').values_list('id', flat=True).first()),
+        'email': user.email,
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
+
+
+def create_victims(company_id, department_id):
+    # Rows for the delete scenarios, in the benchmark company so managers
+    # may delete them; small, so the cascade doesn't dominate the timing
+    company = Company.objects.create(name='Benchmark Victim')
+    department = Department.objects.create(name='Benchmark Victim', company_id=company_id)
+    user = User.objects.create(email='benchmark-victim@seed.example.com')
+    employee = Employee.objects.create(
+        user=user, company_id=company_id, department_id=department_id, name='Benchmark Victim',
+        mobile_number='01012345678', address='1 Tahrir St, Cairo', designation='Engineer',
+    )
+    return {'victim_company': company.id, 'victim_department': department.id, 'victim_employee': employee.id}
+
+
+def fill(value, ids):
+    if isinstance(value, dict):
+        return {key: fill(item, ids) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill(item, ids) for item in value]
+    return ids.get(value, value) if isinstance(value, str) else value
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def counting_queries():
+    # Every alias, so replica and shard queries count too
+    counter = QueryCounter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        yield counter
+
+
+@contextmanager
+def rolled_back(write):
+    if not write:
+        yield
+        return
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def percentile(samples, q):
+    # Nearest rank, so every figure is a latency that was actually observed
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def send(client, name, method, args, data, ids):
+    url = reverse(name, args=[ids[arg] for arg in args])
+    data = fill(data, ids)
+    if method == 'get':
+        response = client.get(url, data)
+    else:
+        response = getattr(client, method)(url, data, content_type='application/json')
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+def measure(client, scenario, ids, requests):
+    # One untimed warm-up request, `requests` timed ones, then one more under
+    # tracemalloc for the peak memory (tracing slows everything down)
+    name, method, args, data = scenario
+    write = method != 'get'
+    needs_victims = any(arg.startswith('victim_') for arg in args)
+    timings, queries, statuses = [], [], set()
+    for run in range(requests + 2):
+        with rolled_back(write):
+            request_ids = {**ids, **create_victims(ids['company'], ids['department'])} if needs_victims else ids
+            traced = run == requests + 1
+            if traced:
+                tracemalloc.start()
+                baseline = tracemalloc.get_traced_memory()[0]
+            with counting_queries() as counter:
+                start = time.perf_counter()
+                response = send(client, name, method, args, data, request_ids)
+                elapsed = time.perf_counter() - start
+            if traced:
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                tracemalloc.stop()
+            elif run:
+                timings.append(elapsed * 1000)
+                queries.append(counter.count)
+                statuses.add(response.status_code)
+    return {
+        'status': statuses.pop() if len(statuses) == 1 else sorted(statuses),
+        'requests': requests,
+        'p50_ms': percentile(timings, 50),
+        'p95_ms': percentile(timings, 95),
+        'p99_ms': percentile(timings, 99),
+        'mean_ms': statistics.fmean(timings),
+        'queries': statistics.median(queries),
+        'peak_kib': peak / 1024,
+    }
+
+
+def run_benchmark(requests=20, roles=ROLES, names=None, stdout=None):
+    # {"METHOD url-name": {role: result}} for every scenario (or those in
+    # `names`) as each role, against the current `default` database
+    company, users = benchmark_users()
+    results = {}
+    for role in roles:
+        ids = benchmark_ids(company, users[role])
+        client = Client(headers={'Authorization': f'Bearer {ids["access"]}'})
+        for scenario in SCENARIOS:
+            name, method = scenario[:2]
+            if names and name not in names:
+                continue
+            label = f'{method.upper()} {name}'
+            if stdout:
+                stdout.write(f'  {label} as {role}')
+            results.setdefault(label, {})[role] = measure(client, scenario, ids, requests)
+    return results
@@ -0,0 +1,57 @@
+import copy
+import os
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+
+
+def register_sqlite_database(alias, path=None, migrate=True, **overrides):
+    # Add a throwaway SQLite alias (same options as `default` plus
+    # `overrides`) so benchmarks never touch the development database.
+    # Returns the file path.
+    if path is None:
+        handle, path = tempfile.mkstemp(prefix=f'{alias}-', suffix='.sqlite3')
+        os.close(handle)
+        os.unlink(path)
+    config = copy.deepcopy(settings.DATABASES['default'])
+    config.update(overrides, NAME=str(path))
+    configured = connections.configure_settings({'default': settings.DATABASES['default'], alias: config})
+    connections.settings[alias] = configured[alias]
+    settings.DATABASES[alias] = connections.settings[alias]
+    if migrate:
+        call_command('migrate', database=alias, verbosity=0)
+    return str(path)
+
+
+def drop_database(alias, path):
+    connections[alias].close()
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(f'{path}{suffix}'):
+            os.unlink(f'{path}{suffix}')
+
+
+@contextmanager
+def default_sqlite_database(path=None):
+    # Point the `default` alias itself at a throwaway SQLite file, for
+    # benchmarks that drive the real WSGI/ASGI handlers. Thread connections
+    # share this settings dict, so they follow too.
+    connection = connections['default']
+    connection.close()
+    original = connection.settings_dict['NAME']
+    temporary = path is None
+    if temporary:
+        handle, path = tempfile.mkstemp(prefix='bench-default-', suffix='.sqlite3')
+        os.close(handle)
+        os.unlink(path)
+    connection.settings_dict['NAME'] = str(path)
+    try:
+        call_command('migrate', verbosity=0)
+        yield str(path)
+    finally:
+        connection.close()
+        connection.settings_dict['NAME'] = original
+        if temporary:
+            drop_database('default', path)
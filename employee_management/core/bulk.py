@@ -0,0 +1,204 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+import multiprocessing
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+
+from .counters import adjust_employee_count, bump_data_version
+from .models import Department, Employee, User
+from .sharding import ShardedQuerySet, company_alias, shard_batches, sharded
+
+
+def import_chunk_size():
+    return getattr(settings, 'BULK_IMPORT_CHUNK_SIZE', 1000)
+
+
+def hash_passwords(passwords, workers=None, threshold=None):
+    # PBKDF2 is CPU bound, so big batches are spread over a process pool.
+    # Workers are spawned (not forked) so they never inherit DB connections
+    # or locks from a threaded server.
+    workers = workers or getattr(settings, 'BULK_IMPORT_HASH_WORKERS', None) or os.cpu_count() or 1
+    if threshold is None:
+        threshold = getattr(settings, 'BULK_IMPORT_POOL_THRESHOLD', 64)
+    if workers == 1 or len(passwords) < threshold:
+        return [make_password(password) for password in passwords]
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=django.setup) as pool:
+        chunksize = max(1, len(passwords) // (workers * 4))
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def validate_import_rows(rows, company_id=None):
+    # Set-based checks for a batch of rows already validated one by one:
+    # one query for existing emails and one for the department/company pairs.
+    # `rows` is a list of (index, data); returns (valid rows, {index: errors}).
+    errors = {}
+    emails = [User.objects.normalize_email(data['email']) for _, data in rows]
+    existing = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+    departments = dict(
+        sharded(Department.objects.filter(id__in={data['department'] for _, data in rows})).values_list('id', 'company_id')
+    )
+    seen = set()
+    valid = []
+    for (index, data), email in zip(rows, emails):
+        row_errors = {}
+        if email in existing:
+            row_errors['email'] = 'User with this email already exists.'
+        elif email in seen:
+            row_errors['email'] = 'Duplicate email in this batch.'
+        seen.add(email)
+        if company_id is not None:
+            # Managers can only import into their own company
+            if data.get('company', company_id) != company_id:
+                row_errors['company'] = 'You can only create employees for your own company'
+            data['company'] = company_id
+        elif 'company' not in data:
+            row_errors['company'] = 'Company is required'
+        if data['department'] not in departments:
+            row_errors['department'] = 'Department does not exist'
+        elif 'company' in data and departments[data['department']] != data['company']:
+            row_errors['department'] = 'Department does not belong to company'
+        if row_errors:
+            errors[index] = row_errors
+        else:
+            data['email'] = email
+            valid.append((index, data))
+    return valid, errors
+
+
+def create_employees(rows):
+    # Insert one chunk of validated rows, whose `password` is already
+    # hashed; returns the created employees
+    users = []
+    for _, data in rows:
+        name_parts = data['name'].split()
+        users.append(User(
+            email=data['email'],
+            password=data.pop('password'),
+            first_name=name_parts[0] if name_parts else '',
+            last_name=' '.join(name_parts[1:]),
+            role='employee',
+        ))
+    with transaction.atomic():
+        users = User.objects.bulk_create(users)
+        if users and users[0].pk is None:
+            ids = dict(User.objects.filter(email__in=[u.email for u in users]).values_list('email', 'id'))
+            for user in users:
+                user.pk = ids[user.email]
+        employees = [
+            Employee(
+                user=user,
+                company_id=data['company'],
+                department_id=data['department'],
+                name=data['name'],
+                mobile_number=data['mobile_number'],
+                address=data['address'],
+                designation=data['designation'],
+                hired_on=data.get('hired_on'),
+                status=data.get('status', 'pending'),
+            )
+            for user, (_, data) in zip(users, rows)
+        ]
+        # One batch per shard (a single one without sharding)
+        for using, batch in shard_batches(Employee, employees):
+            with transaction.atomic(using=using, savepoint=False):
+                Employee.objects.using(using).bulk_create(batch)
+                # bulk_create skips post_save, so bump the counters once per department
+                for (department_id, company_id), total in Counter((e.department_id, e.company_id) for e in batch).items():
+                    adjust_employee_count(department_id, company_id, total, using)
+        bump_data_version({e.company_id for e in employees})
+    return employees
+
+
+def import_employees(rows, company_id=None):
+    # `rows` is a list of (index, data) that passed per-row validation.
+    # Returns (number created, {index: errors}).
+    valid, errors = validate_import_rows(rows, company_id)
+    # Hash the whole import at once, so a process pool starts at most once
+    # rather than once per chunk
+    hashes = hash_passwords([data['password'] for _, data in valid])
+    for (_, data), password in zip(valid, hashes):
+        data['password'] = password
+    created = 0
+    size = import_chunk_size()
+    for start in range(0, len(valid), size):
+        chunk = valid[start:start + size]
+        try:
+            created += len(create_employees(chunk))
+        except IntegrityError:
+            # Lost a race with a concurrent write; report the chunk, keep going
+            for index, _ in chunk:
+                errors[index] = {'non_field_errors': 'Conflicting write, retry this row'}
+    return created, errors
+
+
+def department_company(department_id):
+    return sharded(Department.objects.filter(id=department_id)).values_list('company_id', flat=True).first()
+
+
+def validate_bulk_update(employees, patch, ids=None, company_id=None):
+    # Set-based checks for a bulk update of `employees` (already scoped to
+    # what the caller may see): one query for the unknown ids, one for the
+    # department and one for employees outside the department's company.
+    # Returns {field: error}.
+    errors = {}
+    if ids is not None:
+        found = set(employees.values_list('id', flat=True))
+        unknown = sorted(set(ids) - found)
+        if unknown:
+            errors['ids'] = f'Unknown employee id(s): {", ".join(map(str, unknown[:20]))}'
+    if 'department' in patch:
+        target_company = department_company(patch['department'])
+        if target_company is None:
+            errors['department'] = 'Department does not exist'
+        elif company_id is not None and target_company != company_id:
+            errors['department'] = 'Department does not belong to your company'
+        elif employees.exclude(company_id=target_company).exists():
+            errors['department'] = 'Department does not belong to the company of every selected employee'
+    return errors
+
+
+def update_employees(employees, patch, ids=None, company_id=None):
+    # Validate and apply `patch` ({status, department, designation}) to every
+    # employee in `employees`, in one transaction: one UPDATE per database,
+    # then the department counters and the companies' data versions. save()
+    # and its receivers are skipped. Returns (number updated, {field: error}).
+    parts = employees.parts if isinstance(employees, ShardedQuerySet) else [employees]
+    fields = {('department_id' if name == 'department' else name): value for name, value in patch.items()}
+    updated = 0
+    with ExitStack() as stack:
+        for using in dict.fromkeys([company_alias(part.db) for part in parts] + [part.db for part in parts]):
+            stack.enter_context(transaction.atomic(using=using))
+        errors = validate_bulk_update(employees, patch, ids, company_id)
+        if errors:
+            return 0, errors
+        target_company = department_company(patch['department']) if 'department_id' in fields else None
+        for part in parts:
+            using = part.db
+            part = part.select_related(None).order_by()
+            if target_company is not None:
+                # The UPDATE itself never moves anyone into another tenant's
+                # department, whatever was written since the check
+                part = part.filter(company_id=target_company)
+            company_ids = set(part.values_list('company_id', flat=True).distinct())
+            if not company_ids:
+                continue
+            moves = []
+            if target_company is not None:
+                moves = list(
+                    part.exclude(department_id=fields['department_id'])
+                    .values_list('department_id').annotate(total=Count('pk'))
+                )
+            updated += part.update(**fields)
+            for department_id, total in moves:
+                adjust_employee_count(department_id, target_company, -total, using)
+            if moves:
+                adjust_employee_count(fields['department_id'], target_company, sum(total for _, total in moves), using)
+            bump_data_version(company_ids, using)
+    return updated, {}
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+PER_PROCESS_CACHES = ('django.core.cache.backends.locmem.LocMemCache', 'django.core.cache.backends.dummy.DummyCache')
+
+
+@register()
+def shard_map_cache_check(app_configs, **kwargs):
+    # Other processes only see a move_company through SHARD_MAP_CACHE
+    if not getattr(settings, 'DATABASE_SHARDS', None):
+        return []
+    backend = settings.CACHES.get(settings.SHARD_MAP_CACHE, {}).get('BACKEND')
+    if backend in PER_PROCESS_CACHES:
+        return [Warning(
+            f'SHARD_MAP_CACHE ({settings.SHARD_MAP_CACHE!r}) is not shared between processes.',
+            hint='With several server processes, point SHARD_MAP_CACHE at a shared cache (Redis, '
+                 'Memcached, database or file based), or they keep routing a moved company to its '
+                 'old shard for up to SHARD_MAP_TTL seconds.',
+            id='core.W001',
+        )]
+    return []
@@ -0,0 +1,91 @@
+from collections import Counter
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import Company, DataVersion, Department, Employee
+from .sharding import company_alias, sharding_enabled, tenant_aliases
+
+
+def count_subquery(queryset, field):
+    # Correlated COUNT(*) for a parent row, 0 when nothing matches
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts), 0)
+
+
+# `using` is where the department/employee rows live; on a shard the
+# company side is updated on the primary (core/sharding.py)
+
+def adjust_employee_count(department_id, company_id, delta, using='default'):
+    if not department_id or not delta:
+        return
+    Department.objects.using(using).filter(pk=department_id).update(
+        employee_count=F('employee_count') + delta
+    )
+    Company.objects.using(company_alias(using)).filter(pk=company_id).update(
+        employee_count=F('employee_count') + delta
+    )
+
+
+def adjust_department_count(company_id, delta, using='default'):
+    if not company_id or not delta:
+        return
+    Company.objects.using(company_alias(using)).filter(pk=company_id).update(
+        department_count=F('department_count') + delta
+    )
+
+
+def bump_data_version(company_ids, using='default'):
+    # `company_ids` may be an id list or, off shards, a values_list() subquery
+    Company.objects.using(company_alias(using)).filter(pk__in=company_ids).update(
+        data_version=F('data_version') + 1, data_modified=timezone.now()
+    )
+
+
+def bump_global_version(name):
+    # DataVersion rows live on the primary, like the companies
+    versions = DataVersion.objects.using(DEFAULT_DB_ALIAS)
+    now = timezone.now()
+    if not versions.filter(name=name).update(version=F('version') + 1, modified=now):
+        _, created = versions.get_or_create(name=name, defaults={'version': 1, 'modified': now})
+        if not created:
+            versions.filter(name=name).update(version=F('version') + 1, modified=now)
+
+
+def rebuild_counters(using='default'):
+    # Recompute every counter from the source tables. A company counts the
+    # employees whose `company` it is, as the write path does, wherever
+    # their department belongs.
+    if using == DEFAULT_DB_ALIAS and sharding_enabled():
+        return rebuild_sharded_counters()
+    departments = Department.objects.using(using).update(
+        employee_count=count_subquery(Employee.objects.using(using), 'department'),
+    )
+    companies = Company.objects.using(using).update(
+        department_count=count_subquery(Department.objects.using(using), 'company'),
+        employee_count=count_subquery(Employee.objects.using(using), 'company'),
+    )
+    return companies, departments
+
+
+def rebuild_sharded_counters():
+    # Departments are recounted on their own shard; company totals are summed
+    # over every shard and written to the primary
+    departments = 0
+    totals = {'department_count': Counter(), 'employee_count': Counter()}
+    for alias in tenant_aliases():
+        departments += Department.objects.using(alias).update(
+            employee_count=count_subquery(Employee.objects.using(alias), 'department'),
+        )
+        for field, model, company in (('department_count', Department, 'company'),
+                                      ('employee_count', Employee, 'company')):
+            totals[field].update(dict(
+                model.objects.using(alias).order_by().values_list(company).annotate(total=Count('pk'))
+            ))
+    companies = list(Company.objects.using(DEFAULT_DB_ALIAS).only('pk'))
+    for company in companies:
+        company.department_count = totals['department_count'][company.pk]
+        company.employee_count = totals['employee_count'][company.pk]
+    Company.objects.using(DEFAULT_DB_ALIAS).bulk_update(companies, ['department_count', 'employee_count'], batch_size=500)
+    return len(companies), departments
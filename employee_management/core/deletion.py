@@ -0,0 +1,80 @@
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.admin.models import LogEntry
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .api.authentication import revoke_tokens
+from .counters import adjust_department_count, adjust_employee_count, bump_data_version, bump_global_version
+from .models import Company, Department, Employee, User
+from .sharding import company_alias, forget_shard, is_shard, sharding_enabled
+
+# Deleting a company or department through the ORM collector loads every
+# employee, fires the counter and version receivers once per row and
+# leaves the employees' users behind. These delete the same rows with
+# set-based DELETEs instead, in chunks that each commit on their own, so
+# the write lock is released between chunks; counters and data versions
+# are adjusted once per chunk.
+
+
+def delete_chunk_size():
+    return getattr(settings, 'BULK_DELETE_CHUNK_SIZE', 1000)
+
+
+def delete_users(user_ids, using):
+    # Users and the rows that point at them; their employees are gone already.
+    # No delete signals run, so their tokens are revoked here.
+    revoke_tokens(*user_ids)
+    for through in (User.groups.through, User.user_permissions.through):
+        through.objects.filter(user_id__in=user_ids)._raw_delete(using)
+    LogEntry.objects.filter(user_id__in=user_ids)._raw_delete(using)
+    User.objects.filter(pk__in=user_ids)._raw_delete(using)
+
+
+def delete_employees(employees, using):
+    # Delete `employees` (a queryset on `using`) and their users. Returns
+    # the number of employees deleted.
+    deleted = 0
+    rows = employees.order_by('pk').values_list('pk', 'user_id', 'department_id', 'company_id')
+    while True:
+        with ExitStack() as stack:
+            for alias in dict.fromkeys([using, company_alias(using)]):
+                stack.enter_context(transaction.atomic(using=alias))
+            chunk = list(rows[:delete_chunk_size()])
+            if not chunk:
+                return deleted
+            user_ids = [user_id for _, user_id, _, _ in chunk]
+            Employee.objects.filter(pk__in=[pk for pk, _, _, _ in chunk])._raw_delete(using)
+            if is_shard(using):
+                # The shard's copies, then the users themselves on the primary
+                User.objects.filter(pk__in=user_ids)._raw_delete(using)
+            delete_users(user_ids, company_alias(using))
+            for (department_id, company_id), total in Counter((row[2], row[3]) for row in chunk).items():
+                adjust_employee_count(department_id, company_id, -total, using)
+            bump_data_version({row[3] for row in chunk}, using)
+        deleted += len(chunk)
+
+
+def delete_department(department):
+    using = department._state.db or DEFAULT_DB_ALIAS
+    delete_employees(Employee.objects.using(using).filter(department_id=department.pk), using)
+    with transaction.atomic(using=using):
+        Department.objects.filter(pk=department.pk)._raw_delete(using)
+        adjust_department_count(department.company_id, -1, using)
+        bump_data_version([department.company_id], using)
+
+
+def delete_company(company):
+    # `company` is the primary's row; its tenant rows are on its shard
+    using = company.shard if sharding_enabled() and company.shard else DEFAULT_DB_ALIAS
+    delete_employees(Employee.objects.using(using).filter(company_id=company.pk), using)
+    with ExitStack() as stack:
+        for alias in dict.fromkeys([using, DEFAULT_DB_ALIAS]):
+            stack.enter_context(transaction.atomic(using=alias))
+        Department.objects.filter(company_id=company.pk)._raw_delete(using)
+        if is_shard(using):
+            Company.objects.filter(pk=company.pk)._raw_delete(using)
+        Company.objects.filter(pk=company.pk)._raw_delete(DEFAULT_DB_ALIAS)
+        bump_global_version('companies')
+    forget_shard(company.pk)
@@ -0,0 +1,105 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks.api import ROLES, missing_routes, run_benchmark
+from core.benchmarks.database import default_sqlite_database
+from core.benchmarks.seed import seed
+from core.models import Employee
+
+
+def git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=settings.BASE_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Seed a throwaway SQLite database, send every route in core/api/urls.py as each role and '
+            'report p50/p95/p99 latency, queries per request and peak memory')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=10)
+        parser.add_argument('--departments', type=int, default=10, help='Departments per company')
+        parser.add_argument('--employees', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--requests', type=int, default=20, help='Timed requests per route, method and role')
+        parser.add_argument('--roles', default=','.join(ROLES), help='Comma-separated roles to run as')
+        parser.add_argument('--routes', help='Comma-separated URL names to run (default: all)')
+        parser.add_argument('--cache', action='store_true', help='Keep the response cache on')
+        parser.add_argument('--db', help='SQLite file to use (default: a temp file that is removed afterwards)')
+        parser.add_argument('--json', default='bench_api.json', help='Results file')
+        parser.add_argument('--compare', help='Results file of an earlier run to print the differences against')
+
+    def handle(self, *args, **options):
+        roles = [role.strip() for role in options['roles'].split(',') if role.strip()]
+        if set(roles) - set(ROLES):
+            raise CommandError(f'Roles must be among: {", ".join(ROLES)}')
+        names = set(filter(None, (name.strip() for name in (options['routes'] or '').split(','))))
+        if missing_routes():
+            self.stderr.write(f'No benchmark scenario for: {", ".join(missing_routes())}')
+
+        # What a production process runs with: no query log, no cache hits
+        # unless asked for
+        settings.DEBUG = False
+        settings.ALLOWED_HOSTS = ['testserver']
+        if not options['cache']:
+            settings.API_RESPONSE_CACHE = None
+        dataset = {key: options[key] for key in ('companies', 'departments', 'employees', 'seed')}
+        with default_sqlite_database(options['db']) as path:
+            if not Employee.objects.exists():
+                self.stdout.write(f'Seeding {options["employees"]} employees into {path}')
+                seed('default', options['companies'], options['departments'], options['employees'],
+                     seed=options['seed'], admins=1, stdout=self.stdout)
+            results = run_benchmark(options['requests'], roles, names, stdout=self.stdout)
+
+        report = {
+            'meta': {
+                'commit': git('rev-parse', 'HEAD'),
+                'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+                'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'dataset': dataset,
+                'requests': options['requests'],
+                'cache': options['cache'],
+            },
+            'results': results,
+        }
+        with open(options['json'], 'w') as handle:
+            json.dump(report, handle, indent=2)
+
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as handle:
+                baseline = json.load(handle)
+            if baseline['meta']['dataset'] != dataset or baseline['meta']['requests'] != options['requests']:
+                self.stderr.write(f'{options["compare"]} was run with a different dataset or request count')
+        self.report(results, baseline)
+        self.stdout.write(f'Results written to {options["json"]}')
+
+    def report(self, results, baseline=None):
+        width = max(len(name) for name in results)
+        self.stdout.write(
+            f'{"route".ljust(width)}  {"role":<8}  {"status":>6}  {"p50 ms":>8}  {"p95 ms":>8}  {"p99 ms":>8}  '
+            f'{"queries":>7}  {"peak KiB":>9}' + ('  {:>9}  {:>11}'.format('p50 diff', 'query diff') if baseline else '')
+        )
+        for name, by_role in results.items():
+            for role, result in by_role.items():
+                line = (
+                    f'{name.ljust(width)}  {role:<8}  {str(result["status"]):>6}  {result["p50_ms"]:>8.2f}  '
+                    f'{result["p95_ms"]:>8.2f}  {result["p99_ms"]:>8.2f}  {result["queries"]:>7g}  '
+                    f'{result["peak_kib"]:>9.0f}'
+                )
+                before = (baseline or {}).get('results', {}).get(name, {}).get(role)
+                if before:
+                    line += (f'  {(result["p50_ms"] - before["p50_ms"]) / before["p50_ms"]:>+9.0%}  '
+                             f'{result["queries"] - before["queries"]:>+11g}')
+                self.stdout.write(line)
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+
+from core.api.serializers import CustomTokenObtainPairSerializer
+from core.benchmarks.database import default_sqlite_database
+from core.benchmarks.seed import seed
+from core.models import Department, Employee, User
+
+# (name, sync path, async path); {company}/{employee} are filled in per run
+ENDPOINTS = [
+    ('employee list', '/api/employees/', '/api/async/employees/'),
+    ('employee detail', '/api/employees/{employee}/', '/api/async/employees/{employee}/'),
+    ('department list', '/api/departments/', '/api/async/departments/'),
+    ('company detail', '/api/companies/{company}/', '/api/async/companies/{company}/'),
+    ('profile', '/api/profile/', '/api/async/profile/'),
+]
+
+
+def wsgi_get(app, url, token):
+    parts = urlsplit(url)
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': parts.path, 'QUERY_STRING': parts.query,
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+        'HTTP_AUTHORIZATION': token, 'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.input': BytesIO(),
+        'wsgi.url_scheme': 'http', 'wsgi.errors': BytesIO(), 'wsgi.multithread': True,
+        'wsgi.multiprocess': False, 'wsgi.run_once': False, 'wsgi.version': (1, 0),
+    }
+    status = []
+    body = b''.join(app(environ, lambda code, headers: status.append(code)))
+    return int(status[0].split()[0]), body
+
+
+async def asgi_get(app, url, token):
+    parts = urlsplit(url)
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': parts.path, 'raw_path': parts.path.encode(),
+        'query_string': parts.query.encode(), 'root_path': '', 'client': ('127.0.0.1', 50000),
+        'server': ('localhost', 80), 'headers': [(b'host', b'localhost'), (b'authorization', token.encode())],
+    }
+    received = False
+    response = {'body': b''}
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Nobody disconnects; Django cancels this once the response is sent
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        else:
+            response['body'] += message.get('body', b'')
+
+    await app(scope, receive, send)
+    return response['status'], response['body']
+
+
+class Command(BaseCommand):
+    help = ('Measure concurrent request throughput of the read endpoints through the WSGI handler '
+            '(threads), the ASGI handler with the sync views, and the ASGI handler with the async views')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=20000)
+        parser.add_argument('--requests', type=int, default=400, help='Requests per endpoint and mode')
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--cache', action='store_true', help='Keep the response cache on')
+        parser.add_argument('--db', help='SQLite file to use (default: a temp file that is removed afterwards)')
+        parser.add_argument('--json', help='Also write the results to this file')
+
+    def handle(self, *args, **options):
+        settings.DEBUG = False
+        settings.ALLOWED_HOSTS = ['localhost']
+        if not options['cache']:
+            settings.API_RESPONSE_CACHE = None
+        with default_sqlite_database(options['db']) as path:
+            if not Employee.objects.exists():
+                self.stdout.write(f'Seeding {options["employees"]} employees into {path}')
+                seed('default', 10, 10, options['employees'], stdout=self.stdout)
+            department = Department.objects.order_by('id').first()
+            manager = User.objects.get(employee__department=department, role='manager')
+            token = f'Bearer {CustomTokenObtainPairSerializer.get_token(manager).access_token}'
+            ids = {'company': department.company_id, 'employee': manager.employee.id}
+            results = self.run(token, ids, options['requests'], options['concurrency'])
+
+        width = max(len(name) for name in results)
+        self.stdout.write(f'{"endpoint".ljust(width)}  {"wsgi req/s":>11}  {"asgi sync req/s":>16}  {"asgi async req/s":>17}')
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name.ljust(width)}  {result["wsgi"]:>11.0f}  {result["asgi_sync"]:>16.0f}  {result["asgi_async"]:>17.0f}'
+            )
+        if options['json']:
+            with open(options['json'], 'w') as handle:
+                json.dump(results, handle, indent=2)
+
+    def run(self, token, ids, requests, concurrency):
+        wsgi, asgi = get_wsgi_application(), get_asgi_application()
+        results = {}
+        for name, sync_path, async_path in ENDPOINTS:
+            sync_url, async_url = sync_path.format(**ids), async_path.format(**ids)
+            results[name] = {
+                'wsgi': self.measure_wsgi(wsgi, sync_url, token, requests, concurrency),
+                'asgi_sync': asyncio.run(self.measure_asgi(asgi, sync_url, token, requests, concurrency)),
+                'asgi_async': asyncio.run(self.measure_asgi(asgi, async_url, token, requests, concurrency)),
+            }
+        return results
+
+    def measure_wsgi(self, app, url, token, requests, concurrency):
+        # A threaded WSGI server: one thread per in-flight request
+        self.ensure_ok(*wsgi_get(app, url, token))
+        with ThreadPoolExecutor(concurrency) as pool:
+            start = time.perf_counter()
+            statuses = list(pool.map(lambda _: wsgi_get(app, url, token), range(requests)))
+            elapsed = time.perf_counter() - start
+        for response in statuses:
+            self.ensure_ok(*response)
+        return requests / elapsed
+
+    async def measure_asgi(self, app, url, token, requests, concurrency):
+        self.ensure_ok(*await asgi_get(app, url, token))
+        slots = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with slots:
+                return await asgi_get(app, url, token)
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+        for response in responses:
+            self.ensure_ok(*response)
+        return requests / elapsed
+
+    def ensure_ok(self, status, body):
+        if status != 200:
+            raise RuntimeError(f'Benchmark request failed with {status}: {body[:200]!r}')
@@ -0,0 +1,98 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Count
+
+from core.benchmarks.database import drop_database, register_sqlite_database
+from core.benchmarks.seed import seed
+from core.models import Department, Employee
+
+ALIAS = 'bench_indexes'
+
+
+def access_patterns(company_id, department_id):
+    # The querysets core/api/views.py and the dashboards actually run
+    employees = Employee.objects.using(ALIAS)
+    return {
+        'company page (ORDER BY id)': lambda: list(
+            employees.filter(company_id=company_id).order_by('id')[:51]),
+        'company + status page': lambda: list(
+            employees.filter(company_id=company_id, status='active').order_by('id')[:51]),
+        'company status counts': lambda: list(
+            employees.filter(company_id=company_id).values('status').annotate(n=Count('id')).order_by()),
+        'department status counts': lambda: list(
+            employees.filter(department_id=department_id).values('status').annotate(n=Count('id')).order_by()),
+        'company newest hires': lambda: list(
+            employees.filter(company_id=company_id).order_by('-hired_on')[:50]),
+        'company sorted by name': lambda: list(
+            employees.filter(company_id=company_id).order_by('name')[:50]),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Seed a throwaway SQLite database and time the employee access patterns with and without the composite indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=1000000)
+        parser.add_argument('--companies', type=int, default=50)
+        parser.add_argument('--departments', type=int, default=10, help='Departments per company')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--db', help='SQLite file to use (default: a temp file that is removed afterwards)')
+        parser.add_argument('--json', help='Also write the results to this file')
+
+    def handle(self, *args, **options):
+        path = register_sqlite_database(ALIAS, options['db'])
+        try:
+            if not Employee.objects.using(ALIAS).exists():
+                self.stdout.write(f'Seeding {options["employees"]} employees into {path}')
+                seed(ALIAS, options['companies'], options['departments'], options['employees'],
+                     stdout=self.stdout)
+            results = self.run(options['repeat'])
+        finally:
+            if not options['db']:
+                drop_database(ALIAS, path)
+
+        width = max(len(name) for name in results)
+        self.stdout.write(f'{"query".ljust(width)}  {"before ms":>10}  {"after ms":>10}  {"speedup":>8}')
+        for name, timing in results.items():
+            self.stdout.write(
+                f'{name.ljust(width)}  {timing["before_ms"]:>10.3f}  {timing["after_ms"]:>10.3f}  '
+                f'{timing["before_ms"] / max(timing["after_ms"], 1e-6):>7.1f}x'
+            )
+        if options['json']:
+            with open(options['json'], 'w') as handle:
+                json.dump(results, handle, indent=2)
+
+    def run(self, repeat):
+        # A company and department in the middle of the id range
+        departments = Department.objects.using(ALIAS).order_by('id')
+        department = departments[departments.count() // 2]
+        queries = access_patterns(department.company_id, department.id)
+        indexes = Employee._meta.indexes
+        results = {name: {} for name in queries}
+
+        connection = connections[ALIAS]
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.remove_index(Employee, index)
+        self.time_queries(queries, repeat, results, 'before_ms')
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.add_index(Employee, index)
+        self.time_queries(queries, repeat, results, 'after_ms')
+        return results
+
+    def time_queries(self, queries, repeat, results, key):
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute('ANALYZE')
+        for name, query in queries.items():
+            query()  # warm the page cache
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                query()
+                samples.append((time.perf_counter() - start) * 1000)
+            results[name][key] = statistics.median(samples)
@@ -0,0 +1,91 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from core.api.fastpath import EmployeeRowSerializer, employee_values
+from core.api.fieldsets import EmployeeFieldset
+from core.api.renderers import FastJSONRenderer
+from core.api.serializers import EmployeeSerializer
+from core.benchmarks.database import drop_database, register_sqlite_database
+from core.benchmarks.seed import seed
+from core.models import Employee
+
+ALIAS = 'bench_serialization'
+
+# The shapes the dashboards ask for
+FIELDSETS = {
+    'full (default)': EmployeeFieldset(),
+    'card: id,name,designation,days_employed': EmployeeFieldset(['id', 'name', 'designation', 'days_employed']),
+    'table: + email,status,expand=department': EmployeeFieldset(
+        ['id', 'name', 'designation', 'email', 'status', 'department'], ['department']),
+}
+
+
+class Command(BaseCommand):
+    help = ('Time query + serialization + rendering of an employee list for each ?fields=/?expand= shape, '
+            'through EmployeeSerializer and through the values() fast path')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=50000)
+        parser.add_argument('--rows', type=int, default=5000, help='Employees serialized per run')
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--db', help='SQLite file to use (default: a temp file that is removed afterwards)')
+        parser.add_argument('--json', help='Also write the results to this file')
+
+    def handle(self, *args, **options):
+        path = register_sqlite_database(ALIAS, options['db'])
+        try:
+            if not Employee.objects.using(ALIAS).exists():
+                self.stdout.write(f'Seeding {options["employees"]} employees into {path}')
+                seed(ALIAS, 10, 10, options['employees'], stdout=self.stdout)
+            results = {
+                f'{name} [{mode}]': self.measure(fieldset, options['rows'], options['repeat'], mode == 'fast')
+                for name, fieldset in FIELDSETS.items()
+                for mode in ('serializer', 'fast')
+            }
+        finally:
+            if not options['db']:
+                drop_database(ALIAS, path)
+
+        width = max(len(name) for name in results)
+        self.stdout.write(
+            f'{"shape [path]".ljust(width)}  {"bytes":>10}  {"query ms":>9}  {"serialize ms":>12}  '
+            f'{"render ms":>9}  {"rows/s":>9}'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name.ljust(width)}  {result["bytes"]:>10}  {result["query_ms"]:>9.1f}  '
+                f'{result["serialize_ms"]:>12.1f}  {result["render_ms"]:>9.1f}  {result["rows_per_second"]:>9.0f}'
+            )
+        if options['json']:
+            with open(options['json'], 'w') as handle:
+                json.dump(results, handle, indent=2)
+
+    def measure(self, fieldset, rows, repeat, fast):
+        employees = Employee.objects.using(ALIAS).order_by('id')
+        if fast:
+            queryset = employee_values(employees, fieldset)
+            serializer_class, renderer = EmployeeRowSerializer, FastJSONRenderer()
+        else:
+            queryset = fieldset.apply(employees)
+            serializer_class, renderer = EmployeeSerializer, JSONRenderer()
+        samples = {'query_ms': [], 'serialize_ms': [], 'render_ms': []}
+        for _ in range(repeat + 1):
+            start = time.perf_counter()
+            employees = list(queryset[:rows])
+            fetched = time.perf_counter()
+            data = serializer_class(employees, many=True, context={'fieldset': fieldset}).data
+            serialized = time.perf_counter()
+            content = renderer.render(data)
+            rendered = time.perf_counter()
+            samples['query_ms'].append((fetched - start) * 1000)
+            samples['serialize_ms'].append((serialized - fetched) * 1000)
+            samples['render_ms'].append((rendered - serialized) * 1000)
+        # The first run only warms the page cache
+        result = {key: statistics.median(values[1:]) for key, values in samples.items()}
+        result['rows_per_second'] = len(employees) / (sum(result.values()) / 1000)
+        result['bytes'] = len(content)
+        return result
@@ -0,0 +1,154 @@
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+
+from core.api.conditional import VALIDATOR_AGGREGATES
+from core.api.fastpath import employee_values
+from core.benchmarks.database import drop_database, register_sqlite_database
+from core.benchmarks.seed import seed
+from core.models import Company, Employee
+
+SEED_ALIAS = 'bench_sqlite_seed'
+DESIGNATIONS = ['Engineer', 'Senior Engineer', 'Analyst', 'Accountant', 'Designer']
+
+
+def read(alias, company_id):
+    # What a conditional employee list GET runs: the validator aggregate,
+    # then the first page
+    Company.objects.using(alias).filter(pk=company_id).aggregate(**VALIDATOR_AGGREGATES)
+    list(employee_values(Employee.objects.using(alias).filter(company_id=company_id).order_by('id'))[:51])
+
+
+def write(alias, employee_id, rng):
+    # A PATCH: load, then save() with the counter/data-version receivers
+    employee = Employee.objects.using(alias).get(pk=employee_id)
+    employee.designation = rng.choice(DESIGNATIONS)
+    employee.save(using=alias)
+
+
+def worker(alias, kind, start_at, duration, company_ids, employee_ids, results):
+    try:
+        results.put((kind, *hammer(alias, kind, start_at, duration, company_ids, employee_ids)))
+    except BaseException as exc:
+        results.put(('failed', repr(exc), 0))
+        raise
+
+
+def hammer(alias, kind, start_at, duration, company_ids, employee_ids):
+    rng = random.Random(os.getpid())
+    connection = connections[alias]
+    done = locked = 0
+    while time.time() < start_at:
+        time.sleep(0.001)
+    while time.time() < start_at + duration:
+        try:
+            if kind == 'read':
+                read(alias, rng.choice(company_ids))
+            else:
+                write(alias, rng.choice(employee_ids), rng)
+            done += 1
+        except OperationalError as exc:
+            if 'locked' not in str(exc):
+                raise
+            locked += 1
+        finally:
+            # What request_finished does: close unless CONN_MAX_AGE keeps it
+            connection.close_if_unusable_or_obsolete()
+    connection.close()
+    return done, locked
+
+
+class Command(BaseCommand):
+    help = ('Run concurrent reader and writer processes against a seeded SQLite file under each '
+            'SQLITE_PROFILES entry and report throughput and "database is locked" rates')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=20000)
+        parser.add_argument('--readers', type=int, default=6, help='Reader processes')
+        parser.add_argument('--writers', type=int, default=2, help='Writer processes')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per profile')
+        parser.add_argument('--profiles', default='stock,performance',
+                            help='Comma-separated SQLITE_PROFILES names, in run order')
+        parser.add_argument('--json', help='Also write the results to this file')
+
+    def handle(self, *args, **options):
+        profiles = [name.strip() for name in options['profiles'].split(',') if name.strip()]
+        unknown = [name for name in profiles if name not in settings.SQLITE_PROFILES]
+        if unknown:
+            raise CommandError(f'Unknown SQLite profile(s): {", ".join(unknown)}')
+
+        directory = tempfile.mkdtemp(prefix='bench-sqlite-load-')
+        try:
+            # Seed once in rollback-journal mode; every profile gets a fresh
+            # copy since journal_mode=WAL sticks to the file
+            base = register_sqlite_database(SEED_ALIAS, os.path.join(directory, 'seed.sqlite3'),
+                                            **settings.SQLITE_PROFILES['stock'])
+            self.stdout.write(f'Seeding {options["employees"]} employees')
+            seed(SEED_ALIAS, 10, 10, options['employees'], stdout=self.stdout)
+            company_ids = list(Company.objects.using(SEED_ALIAS).values_list('id', flat=True))
+            employee_ids = list(Employee.objects.using(SEED_ALIAS).values_list('id', flat=True))
+            connections[SEED_ALIAS].close()
+
+            results = {}
+            for profile in profiles:
+                path = os.path.join(directory, f'{profile}.sqlite3')
+                shutil.copyfile(base, path)
+                alias = f'bench_sqlite_{profile}'
+                register_sqlite_database(alias, path, migrate=False, **settings.SQLITE_PROFILES[profile])
+                results[profile] = self.run(alias, company_ids, employee_ids, options)
+                drop_database(alias, path)
+        finally:
+            connections[SEED_ALIAS].close()
+            shutil.rmtree(directory, ignore_errors=True)
+
+        self.stdout.write(
+            f'{"profile":<12}  {"reads/s":>9}  {"read locked":>11}  {"writes/s":>9}  {"write locked":>12}'
+        )
+        for profile, result in results.items():
+            self.stdout.write(
+                f'{profile:<12}  {result["reads_per_second"]:>9.0f}  {result["read_locked_rate"]:>10.2%}  '
+                f'{result["writes_per_second"]:>9.0f}  {result["write_locked_rate"]:>11.2%}'
+            )
+        if options['json']:
+            with open(options['json'], 'w') as handle:
+                json.dump(results, handle, indent=2)
+
+    def run(self, alias, company_ids, employee_ids, options):
+        # Forked workers must not share the parent's sqlite handles
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        start_at = time.time() + 1
+        kinds = ['read'] * options['readers'] + ['write'] * options['writers']
+        processes = [
+            context.Process(target=worker, args=(alias, kind, start_at, options['duration'],
+                                                 company_ids, employee_ids, queue))
+            for kind in kinds
+        ]
+        for process in processes:
+            process.start()
+        totals = {'read': [0, 0], 'write': [0, 0]}
+        for _ in processes:
+            kind, done, locked = queue.get()
+            if kind == 'failed':
+                raise CommandError(f'A {alias} worker failed: {done}')
+            totals[kind][0] += done
+            totals[kind][1] += locked
+        for process in processes:
+            process.join()
+            if process.exitcode:
+                raise CommandError(f'A {alias} worker exited with status {process.exitcode}')
+
+        result = {}
+        for kind, (done, locked) in totals.items():
+            result[f'{kind}s_per_second'] = done / options['duration']
+            result[f'{kind}_locked_rate'] = locked / max(done + locked, 1)
+        return result
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Company
+from core.sharding import move_company, tenant_aliases
+
+
+class Command(BaseCommand):
+    help = ("Move a company's departments and employees to another shard (or back to 'default') "
+            'and point the shard map at it')
+
+    def add_arguments(self, parser):
+        parser.add_argument('company', type=int, help='Company id')
+        parser.add_argument('shard', help='Target database alias')
+
+    def handle(self, *args, **options):
+        if options['shard'] not in tenant_aliases():
+            raise CommandError(f'{options["shard"]} is not one of: {", ".join(tenant_aliases())}')
+        try:
+            source, departments, employees = move_company(options['company'], options['shard'])
+        except Company.DoesNotExist:
+            raise CommandError(f'Company {options["company"]} does not exist')
+        self.stdout.write(
+            f'Moved company {options["company"]} from {source} to {options["shard"]}: '
+            f'{departments} departments, {employees} employees'
+        )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from core.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized department and employee counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options['database']
+        with transaction.atomic(using=using):
+            companies, departments = rebuild_counters(using)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt counters for {companies} companies and {departments} departments'
+        ))
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from core.benchmarks.seed import seed
+
+
+class Command(BaseCommand):
+    help = ('Bulk-insert a deterministic dataset of companies, departments and employees, for benchmarks '
+            'and local load testing. Every seeded user gets the same password.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=10)
+        parser.add_argument('--departments', type=int, default=10, help='Departments per company')
+        parser.add_argument('--employees', type=int, default=10000, help='Employees in total')
+        parser.add_argument('--admins', type=int, default=1)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same rows')
+        parser.add_argument('--password', default='password123')
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options['companies'] < 1 or options['departments'] < 1:
+            raise CommandError('Seed at least one company with at least one department')
+        started = time.perf_counter()
+        company_ids = seed(
+            options['database'], options['companies'], options['departments'], options['employees'],
+            seed=options['seed'], password=options['password'], batch_size=options['batch_size'],
+            admins=options['admins'], stdout=self.stdout,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded companies {company_ids[0]}-{company_ids[-1]} with {options["employees"]} employees '
+            f'in {time.perf_counter() - started:.1f}s'
+        ))
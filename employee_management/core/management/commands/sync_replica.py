@@ -0,0 +1,42 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def copy_sqlite_database(source, target, pages=1024):
+    # The online backup API copies a consistent snapshot while the primary
+    # keeps taking writes, and replaces the target under SQLite's own locks,
+    # so replica readers never see a half-written file
+    primary, replica = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        primary.backup(replica, pages=pages)
+    finally:
+        replica.close()
+        primary.close()
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database over every settings.DATABASE_REPLICAS alias'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Keep copying every N seconds (default: copy once and exit)')
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS].settings_dict
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('No replicas configured; set SQLITE_REPLICA or DATABASE_REPLICAS')
+        for alias in [DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS]:
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError(f'{alias} is not SQLite; use the database server\'s own replication')
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                started = time.perf_counter()
+                copy_sqlite_database(str(primary['NAME']), str(connections[alias].settings_dict['NAME']))
+                self.stdout.write(f'Copied {primary["NAME"]} to {alias} in {time.perf_counter() - started:.2f}s')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
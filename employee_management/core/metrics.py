@@ -0,0 +1,95 @@
+import os
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+from .timing import view_name
+
+# Request latency uses prometheus_client's default buckets
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+REQUESTS = Counter(
+    'http_requests_total', 'Requests by view (viewset.action), method and status code.',
+    ['view', 'method', 'status'],
+)
+REQUEST_ERRORS = Counter(
+    'http_request_errors_total', 'Requests that ended in a 5xx response, by view.', ['view'],
+)
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by view.', ['view'],
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'Database queries per request by view (sampled requests, core/timing.py).',
+    ['view'], buckets=QUERY_BUCKETS,
+)
+SIGNINS = Counter(
+    'signin_attempts_total', 'Sign-in attempts by outcome.', ['outcome'],
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Cache lookups by cache and result (hit/miss).', ['cache', 'result'],
+)
+
+
+def cache_lookup(cache, hit):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def metrics_registry():
+    # With several worker processes (gunicorn), PROMETHEUS_MULTIPROC_DIR must
+    # be set before the workers start: every process then writes its samples
+    # to files there and a scrape adds them all up
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+class MetricsMiddleware:
+    # Request, error, latency and query metrics per view. Runs inside
+    # QueryTimingMiddleware, whose query counts it reads.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start = perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, perf_counter() - start)
+        return response
+
+    def observe(self, request, response, seconds):
+        view = view_name(request) or 'unmatched'
+        REQUESTS.labels(view, request.method, str(response.status_code)).inc()
+        if response.status_code >= 500:
+            REQUEST_ERRORS.labels(view).inc()
+        REQUEST_LATENCY.labels(view).observe(seconds)
+        timing = getattr(request, 'request_timing', None)
+        if timing is not None and timing.sampled:
+            REQUEST_QUERIES.labels(view).observe(timing.queries)
+
+
+def metrics_view(request):
+    # Prometheus scrape endpoint. With METRICS_TOKEN set, scrapers must send
+    # it as a bearer token.
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse('Unauthorized\n', status=401, content_type='text/plain')
+    return HttpResponse(generate_latest(metrics_registry()), content_type=CONTENT_TYPE_LATEST)
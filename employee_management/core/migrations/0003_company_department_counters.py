@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:24
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(queryset, field):
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts), 0)
+
+
+def populate_counters(apps, schema_editor):
+    using = schema_editor.connection.alias
+    Company = apps.get_model('core', 'Company')
+    Department = apps.get_model('core', 'Department')
+    Employee = apps.get_model('core', 'Employee')
+    Department.objects.using(using).update(
+        employee_count=count_subquery(Employee.objects.using(using), 'department'),
+    )
+    Company.objects.using(using).update(
+        department_count=count_subquery(Department.objects.using(using), 'company'),
+        employee_count=count_subquery(Employee.objects.using(using), 'department__company'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_remove_employee_email_alter_employee_mobile_number'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='department_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='employee_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='department',
+            name='employee_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
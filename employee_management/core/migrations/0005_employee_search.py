@@ -0,0 +1,65 @@
+from django.db import migrations
+
+SEARCH_TABLE = 'core_employee_search'
+
+CREATE_SEARCH_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        name, designation, address, email, company_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    f"""INSERT INTO {SEARCH_TABLE}(rowid, name, designation, address, email, company_id)
+        SELECT e.id, e.name, e.designation, e.address, u.email, e.company_id
+        FROM core_employee e JOIN core_user u ON u.id = e.user_id""",
+    f"""CREATE TRIGGER IF NOT EXISTS core_employee_search_insert AFTER INSERT ON core_employee BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name, designation, address, email, company_id)
+        VALUES (new.id, new.name, new.designation, new.address,
+                (SELECT email FROM core_user WHERE id = new.user_id), new.company_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS core_employee_search_update
+        AFTER UPDATE OF name, designation, address, user_id, company_id ON core_employee BEGIN
+        UPDATE {SEARCH_TABLE}
+        SET name = new.name, designation = new.designation, address = new.address,
+            email = (SELECT email FROM core_user WHERE id = new.user_id), company_id = new.company_id
+        WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS core_employee_search_delete AFTER DELETE ON core_employee BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS core_user_search_update AFTER UPDATE OF email ON core_user BEGIN
+        UPDATE {SEARCH_TABLE} SET email = new.email
+        WHERE rowid IN (SELECT id FROM core_employee WHERE user_id = new.id);
+    END""",
+]
+
+DROP_SEARCH_SQL = [
+    'DROP TRIGGER IF EXISTS core_user_search_update',
+    'DROP TRIGGER IF EXISTS core_employee_search_delete',
+    'DROP TRIGGER IF EXISTS core_employee_search_update',
+    'DROP TRIGGER IF EXISTS core_employee_search_insert',
+    f'DROP TABLE IF EXISTS {SEARCH_TABLE}',
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SEARCH_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SEARCH_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_employee_access_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:00
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+search = import_module('core.migrations.0005_employee_search')
+
+# SQLite adds the column by rebuilding core_user, which the search index
+# triggers (0005) refer to, so they are dropped around it
+SEARCH_TRIGGERS = [statement for statement in search.CREATE_SEARCH_SQL if statement.startswith('CREATE TRIGGER')]
+DROP_SEARCH_TRIGGERS = [statement for statement in search.DROP_SEARCH_SQL if statement.startswith('DROP TRIGGER')]
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_company_shard'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_sqlite(DROP_SEARCH_TRIGGERS), run_on_sqlite(SEARCH_TRIGGERS)),
+        migrations.AddField(
+            model_name='user',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(run_on_sqlite(SEARCH_TRIGGERS), run_on_sqlite(DROP_SEARCH_TRIGGERS)),
+    ]
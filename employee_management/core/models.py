@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.core.validators import EmailValidator, RegexValidator
 from datetime import date
@@ -19,7 +20,25 @@ class CustomUserManager(BaseUserManager):
         extra_fields.setdefault('role', 'admin')
         return self.create_user(email, password, **extra_fields)
 
-class User(AbstractUser):
+class ManagedFieldsMixin:
+    # Counter and version columns only change through F() UPDATEs
+    # (core/counters.py, revoke_tokens()), the shard through move_company.
+    # Saving a loaded instance leaves them out, so a stale copy can't write
+    # old values over concurrent increments. Deferred fields are left out
+    # too, as Model.save() does.
+    managed_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (not args and not self._state.adding and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert')):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.managed_fields and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+class User(ManagedFieldsMixin, AbstractUser):
     username = None
     email = models.EmailField(unique=True, validators=[EmailValidator()])
     ROLES = (
@@ -28,38 +47,82 @@ class User(AbstractUser):
         ('employee', 'Employee'),
     )
     role = models.CharField(max_length=10, choices=ROLES, default='employee')
+    # Carried by tokens as the `ver` claim; revoke_tokens() increments it, so
+    # tokens issued before then stop being accepted
+    token_version = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
+    managed_fields = ('token_version',)
 
     objects = CustomUserManager()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Deactivating a user revokes their tokens (core/signals.py)
+        instance._loaded_is_active = instance.__dict__.get('is_active')
+        return instance
+
     def __str__(self):
         return self.email
 
-class Company(models.Model):
+class Company(ManagedFieldsMixin, models.Model):
     name = models.CharField(max_length=100, unique=True)
+    # Denormalized counters, kept up to date by core/signals.py
+    department_count = models.IntegerField(default=0, editable=False)
+    employee_count = models.IntegerField(default=0, editable=False)
+    # Bumped on every write to the company, its departments or employees;
+    # the API derives ETag/Last-Modified from these (core/api/conditional.py)
+    data_version = models.PositiveIntegerField(default=0, editable=False)
+    data_modified = models.DateTimeField(default=timezone.now, editable=False)
+    # Database alias holding the company's departments and employees
+    # (core/sharding.py); blank for the primary
+    shard = models.CharField(max_length=100, blank=True, default='', editable=False)
+
+    managed_fields = ('department_count', 'employee_count', 'data_version', 'data_modified', 'shard')
     
     @property
     def number_of_departments(self):
-        return self.departments.count()
+        return self.department_count
     
     @property
     def number_of_employees(self):
-        return Employee.objects.filter(department__company=self).count()
+        return self.employee_count
     def __str__(self):
         return self.name
 
-class Department(models.Model):
+class TenantQuerySet(models.QuerySet):
+    def create(self, **kwargs):
+        # save() with self._db rather than self.db: without a .using() the
+        # routers get the new row as a hint, which ShardRouter needs to find
+        # its company's shard (core/sharding.py)
+        obj = self.model(**kwargs)
+        obj.save(force_insert=True, using=self._db)
+        return obj
+
+class Department(ManagedFieldsMixin, models.Model):
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='departments')
     name = models.CharField(max_length=100)
+    employee_count = models.IntegerField(default=0, editable=False)
+
+    managed_fields = ('employee_count',)
+
+    objects = TenantQuerySet.as_manager()
     
     @property
     def number_of_employees(self):
-        return self.employees.count()
+        return self.employee_count
 
     class Meta:
         unique_together = ['company', 'name']
+
+    def save(self, *args, **kwargs):
+        # Run the counter updates from the post_save receiver in the same transaction
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name    
 
@@ -82,6 +145,32 @@ class Employee(models.Model):
     address = models.TextField()
     designation = models.CharField(max_length=100)
     hired_on = models.DateField(null=True, blank=True)
+
+    objects = TenantQuerySet.as_manager()
+
+    class Meta:
+        # Managers always filter by company; dashboards group by status and
+        # sort by hire date or name within a company
+        indexes = [
+            models.Index(fields=['company', 'status'], name='core_emp_company_status_idx'),
+            models.Index(fields=['department', 'status'], name='core_emp_dept_status_idx'),
+            models.Index(fields=['company', 'hired_on'], name='core_emp_company_hired_idx'),
+            models.Index(fields=['company', 'name'], name='core_emp_company_name_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored department/company so the counters and data
+        # versions can follow a move
+        instance._loaded_department_id = instance.__dict__.get('department_id')
+        instance._loaded_company_id = instance.__dict__.get('company_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
     
     @property
     def days_employed(self):
@@ -90,3 +179,25 @@ class Employee(models.Model):
         return 0
     def __str__(self):
         return self.name
+
+
+class IdSequence(models.Model):
+    # Last primary key handed out for a sharded table, so ids stay unique
+    # across shards (core.sharding.allocate_ids)
+    name = models.CharField(max_length=100, primary_key=True)
+    last_id = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.name}: {self.last_id}'
+
+
+class DataVersion(models.Model):
+    # Versions of data no company row carries: `companies` goes up when a
+    # company is deleted, which the remaining companies' versions can't show
+    # (core.counters.bump_global_version)
+    name = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveIntegerField(default=0)
+    modified = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f'{self.name}: {self.version}'
@@ -0,0 +1,100 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import Company, User
+from .sharding import TENANT_MODELS, company_of, shard_for_company, sharding_enabled, tenant_aliases
+
+# The replica a read-only request (replica_reads()) reads from, and whether
+# it has written since, in which case it reads its own writes from the primary
+_replica = ContextVar('replica', default=None)
+_pinned = ContextVar('pinned_to_primary', default=False)
+
+
+@contextmanager
+def replica_reads():
+    # One replica per block, so all of its reads see the same copy
+    replicas = settings.DATABASE_REPLICAS
+    replica = _replica.set(random.choice(replicas) if replicas else None)
+    pinned = _pinned.set(False)
+    try:
+        yield
+    finally:
+        _pinned.reset(pinned)
+        _replica.reset(replica)
+
+
+def pin_to_primary():
+    _pinned.set(True)
+
+
+def note_write():
+    # Called by the routers on every write
+    if _replica.get() is not None:
+        pin_to_primary()
+
+
+def current_replica():
+    return None if _pinned.get() else _replica.get()
+
+
+class ReplicaRouter:
+    # Reads inside replica_reads() go to a settings.DATABASE_REPLICAS alias
+    # until the first write; everything else uses the primary. None leaves
+    # the choice to Django (the primary, or an explicit .using()).
+    def db_for_read(self, model, **hints):
+        return current_replica()
+
+    def db_for_write(self, model, **hints):
+        note_write()
+        # Objects read from a replica are saved to the primary, not back to
+        # the alias they were loaded from
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db in settings.DATABASE_REPLICAS:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are copies of the migrated primary (manage.py sync_replica)
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ShardRouter:
+    # Department/Employee queries with a company in their hints (instance
+    # saves, related managers) go to the company's shard; querysets without
+    # one are pointed there by core.sharding.tenant_queryset()/sharded().
+    # Companies and users are written to the primary even when the instance
+    # came from a shard's copy. Listed before ReplicaRouter.
+    def db_for_read(self, model, **hints):
+        if not sharding_enabled() or model not in TENANT_MODELS:
+            return None
+        company_id = company_of(hints.get('instance'))
+        return shard_for_company(company_id) if company_id is not None else None
+
+    def db_for_write(self, model, **hints):
+        if not sharding_enabled():
+            return None
+        note_write()
+        if model in (Company, User):
+            return DEFAULT_DB_ALIAS
+        return self.db_for_read(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if not sharding_enabled():
+            return None
+        aliases = tenant_aliases()
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
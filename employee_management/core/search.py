@@ -0,0 +1,79 @@
+import re
+from django.db import connections, router
+from django.db.models import Q
+from .models import Employee
+from .sharding import ShardedQuerySet
+
+# FTS5 index over name, designation, address and the user's email, keyed by
+# employee id, with company_id stored (unindexed) for tenant filtering.
+# Created and kept in sync by triggers in migration 0005 (SQLite only), so
+# bulk_create()/update() writes are covered too.
+SEARCH_TABLE = 'core_employee_search'
+
+
+def match_expression(text):
+    # Quote every word so user input can't inject FTS5 syntax; each word is
+    # a prefix match and all of them must appear
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+class RankedSearch:
+    # Sliceable, countable search results for the paginators. Matching,
+    # tenant filtering and ranking all run inside the FTS table; only the
+    # requested page of employees is then loaded from `queryset`. Joining the
+    # FTS table into the employee query instead lets SQLite drive the join
+    # from the company index and re-run MATCH for every row.
+    def __init__(self, queryset, expression, scope):
+        self.queryset = queryset
+        self.where = [f'{SEARCH_TABLE} MATCH %s']
+        self.params = [expression]
+        if 'company_id' in scope:
+            self.where.append('company_id = %s')
+            self.params.append(scope['company_id'])
+        if 'employee_id' in scope:
+            # A NULL id (employee user without a profile) matches nothing
+            self.where.append('rowid = %s')
+            self.params.append(scope['employee_id'])
+
+    def execute(self, select, suffix='', params=()):
+        using = self.queryset.db
+        sql = f'SELECT {select} FROM {SEARCH_TABLE} WHERE {" AND ".join(self.where)} {suffix}'
+        with connections[using].cursor() as cursor:
+            cursor.execute(sql, self.params + list(params))
+            return cursor.fetchall()
+
+    def count(self):
+        return self.execute('COUNT(*)')[0][0]
+
+    def __getitem__(self, page):
+        offset = page.start or 0
+        ranks = dict(self.execute('rowid, rank', 'ORDER BY rank, rowid LIMIT %s OFFSET %s',
+                                  [page.stop - offset, offset]))
+        employees = self.queryset.in_bulk(list(ranks))
+        # Kept on the rows so results from several shards can be merged
+        for pk, employee in employees.items():
+            employee.search_rank = ranks[pk]
+        return [employees[pk] for pk in ranks if pk in employees]
+
+
+def search_employees(queryset, text, **scope):
+    # Ranked matches within a role-scoped Employee queryset. `scope`
+    # (company_id and/or employee_id) repeats the queryset's filters so the
+    # FTS side can apply them too.
+    expression = match_expression(text)
+    if not expression or queryset.query.is_empty():
+        return queryset.none()
+    if isinstance(queryset, ShardedQuerySet):
+        parts = [search_employees(part, text, **scope) for part in queryset.parts]
+        ranked = all(isinstance(part, RankedSearch) for part in parts)
+        return ShardedQuerySet(parts, ('search_rank', 'id') if ranked else None)
+    using = queryset.db or router.db_for_read(Employee)
+    if connections[using].vendor != 'sqlite':
+        words = Q()
+        for word in re.findall(r'\w+', text):
+            words &= (
+                Q(name__icontains=word) | Q(designation__icontains=word)
+                | Q(address__icontains=word) | Q(user__email__icontains=word)
+            )
+        return queryset.filter(words).order_by('id')
+    return RankedSearch(queryset, expression, scope)
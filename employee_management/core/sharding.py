@@ -0,0 +1,358 @@
+import heapq
+import time
+import uuid
+from collections import defaultdict
+from functools import cmp_to_key
+from itertools import chain, islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, router, transaction
+from django.db.models import Count, F, Max
+
+from .metrics import cache_lookup
+from .models import Company, Department, Employee, IdSequence, User
+
+# Departments and employees live on their company's shard (settings.
+# DATABASE_SHARDS). Companies, with their counters, data versions and shard
+# map entry, and users stay on the primary; every shard keeps a copy of the
+# company and user rows its tenants point at, so joins and foreign keys
+# work locally.
+TENANT_MODELS = (Department, Employee)
+
+# company id -> (alias, monotonic expiry)
+_shard_map = {}
+# The shared shard map version _shard_map was filled under. move_company()
+# changes it in settings.SHARD_MAP_CACHE, which every process checks on each
+# lookup, so none of them keeps routing a moved company to its old database.
+SHARD_MAP_VERSION_KEY = 'shard_map:version'
+_shard_map_version = [None]
+
+
+def sharding_enabled():
+    return bool(getattr(settings, 'DATABASE_SHARDS', None))
+
+
+def is_shard(alias):
+    # A tenant database other than the primary
+    return alias != DEFAULT_DB_ALIAS and alias in settings.DATABASE_SHARDS
+
+
+def tenant_aliases():
+    # Every database that can hold tenant rows: companies created before
+    # sharding was turned on stay on the primary
+    return list(dict.fromkeys([DEFAULT_DB_ALIAS, *settings.DATABASE_SHARDS]))
+
+
+def company_alias(using):
+    # Where the Company rows that carry counters and versions live
+    return DEFAULT_DB_ALIAS if is_shard(using) else using
+
+
+def remember_shard(company_id, alias):
+    _shard_map[company_id] = (alias or DEFAULT_DB_ALIAS, time.monotonic() + settings.SHARD_MAP_TTL)
+
+
+def forget_shard(company_id=None):
+    if company_id is None:
+        _shard_map.clear()
+    else:
+        _shard_map.pop(company_id, None)
+
+
+def shard_map_version():
+    return caches[settings.SHARD_MAP_CACHE].get(SHARD_MAP_VERSION_KEY)
+
+
+def bump_shard_map_version():
+    # A fresh token rather than a counter, so a version the cache evicted
+    # and set again can't match what a process saw before
+    caches[settings.SHARD_MAP_CACHE].set(SHARD_MAP_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def shard_for_company(company_id):
+    # Cached for SHARD_MAP_TTL seconds, and dropped as soon as the shared
+    # version shows a company has moved
+    version = shard_map_version()
+    if version != _shard_map_version[0]:
+        _shard_map.clear()
+        _shard_map_version[0] = version
+    entry = _shard_map.get(company_id)
+    hit = entry is not None and entry[1] > time.monotonic()
+    cache_lookup('shard_map', hit)
+    if not hit:
+        alias = Company.objects.using(DEFAULT_DB_ALIAS).filter(pk=company_id).values_list('shard', flat=True).first()
+        remember_shard(company_id, alias)
+        entry = _shard_map[company_id]
+    return entry[0]
+
+
+async def ashard_for_company(company_id):
+    return await sync_to_async(shard_for_company)(company_id)
+
+
+def pick_shard():
+    # New companies go to the shard holding the fewest
+    counts = dict(
+        Company.objects.using(DEFAULT_DB_ALIAS).order_by().values_list('shard').annotate(total=Count('pk'))
+    )
+    return min(settings.DATABASE_SHARDS, key=lambda alias: counts.get(alias, 0))
+
+
+def company_of(instance):
+    if isinstance(instance, Company):
+        return instance.pk
+    if isinstance(instance, TENANT_MODELS):
+        return instance.company_id
+    return None
+
+
+def tenant_queryset(queryset, company_id):
+    # Department/Employee rows of one company, read from its shard
+    if not sharding_enabled() or company_id is None:
+        return queryset
+    return queryset.using(shard_for_company(company_id))
+
+
+def sharded(queryset):
+    # Department/Employee rows across every tenant database (admin views)
+    if not sharding_enabled():
+        return queryset
+    return ShardedQuerySet([queryset.using(alias) for alias in tenant_aliases()])
+
+
+def allocate_ids(model, count=1):
+    # Primary keys for new tenant rows come from one sequence on the primary,
+    # so they stay unique (and keyset-pageable) across shards
+    name = model._meta.label_lower
+    sequences = IdSequence.objects.using(DEFAULT_DB_ALIAS)
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        if not sequences.filter(name=name).update(last_id=F('last_id') + count):
+            highest = max(
+                model.objects.using(alias).aggregate(highest=Max('pk'))['highest'] or 0
+                for alias in tenant_aliases()
+            )
+            sequences.create(name=name, last_id=highest + count)
+        last_id = sequences.get(name=name).last_id
+    return range(last_id - count + 1, last_id + 1)
+
+
+def copy_objects(objects, target):
+    # Upsert rows into `target` by primary key, without signals. The
+    # instances themselves keep pointing at their own database.
+    if not objects:
+        return
+    model = type(objects[0])
+    fields = model._meta.concrete_fields
+    model.objects.using(target).bulk_create(
+        [model(**{field.attname: getattr(obj, field.attname) for field in fields}) for obj in objects],
+        update_conflicts=True,
+        unique_fields=[model._meta.pk.name],
+        update_fields=[field.name for field in fields if not field.primary_key],
+    )
+
+
+def copy_rows(model, pks, target, source=DEFAULT_DB_ALIAS):
+    copy_objects(list(model.objects.using(source).filter(pk__in=pks)), target)
+
+
+def shard_batches(model, objects):
+    # (alias, objects) for a bulk insert of new tenant rows. On shards the
+    # rows get global ids, and employees' users are copied over first.
+    if not objects:
+        return
+    if not sharding_enabled():
+        yield router.db_for_write(model), objects
+        return
+    batches = defaultdict(list)
+    for obj in objects:
+        batches[shard_for_company(obj.company_id)].append(obj)
+    ids = iter(allocate_ids(model, len(objects)))
+    for alias, batch in batches.items():
+        for obj in batch:
+            obj.pk = next(ids)
+        if model is Employee and is_shard(alias):
+            copy_objects([obj.user for obj in batch], alias)
+        yield alias, batch
+
+
+def move_company(company_id, target):
+    # Copy a company's departments and employees to `target`, point the shard
+    # map at it and drop the old rows. The source database's write lock is
+    # held throughout, so no write to it lands between the copy and the
+    # switch; a source shard also loses its copy of the company, so a write
+    # routed there afterwards fails its foreign key instead of being lost.
+    # The shared shard map version then sends every process to `target`.
+    # Returns (source, departments moved, employees moved).
+    company = Company.objects.using(DEFAULT_DB_ALIAS).get(pk=company_id)
+    source = company.shard or DEFAULT_DB_ALIAS
+    if source == target:
+        return source, 0, 0
+    with transaction.atomic(using=source):
+        Company.objects.using(source).filter(pk=company_id).update(name=F('name'))
+        departments = list(Department.objects.using(source).filter(company_id=company_id))
+        employees = list(Employee.objects.using(source).filter(company_id=company_id))
+        user_ids = [employee.user_id for employee in employees]
+        with transaction.atomic(using=target):
+            if is_shard(target):
+                copy_objects([company], target)
+                copy_rows(User, user_ids, target)
+            copy_objects(departments, target)
+            copy_objects(employees, target)
+        Company.objects.using(DEFAULT_DB_ALIAS).filter(pk=company_id).update(shard=target)
+        # _raw_delete(): the rows still exist, so no delete signals or cascades
+        Employee.objects.filter(company_id=company_id)._raw_delete(source)
+        Department.objects.filter(company_id=company_id)._raw_delete(source)
+        if is_shard(source):
+            User.objects.filter(pk__in=user_ids)._raw_delete(source)
+            Company.objects.filter(pk=company_id)._raw_delete(source)
+    forget_shard(company_id)
+    bump_shard_map_version()
+    return source, len(departments), len(employees)
+
+
+def order_key(ordering, fields):
+    # Sort key for merging rows (model instances, values() dicts or
+    # values_list() tuples) in a queryset's ORDER BY
+    terms = [(term.lstrip('-'), term.startswith('-')) for term in ordering]
+
+    def value(row, name):
+        name = 'id' if name == 'pk' else name
+        if isinstance(row, dict):
+            return row[name]
+        if isinstance(row, tuple):
+            return row[fields.index(name)]
+        if not hasattr(row, '_meta'):
+            # values_list(flat=True)
+            return row
+        for part in name.split('__'):
+            row = getattr(row, part)
+        return row
+
+    def compare(a, b):
+        for name, descending in terms:
+            x, y = value(a, name), value(b, name)
+            if x == y:
+                continue
+            # NULLs first, as SQLite sorts them
+            result = -1 if x is None else 1 if y is None else -1 if x < y else 1
+            return -result if descending else result
+        return 0
+    return cmp_to_key(compare)
+
+
+class ShardedQuerySet:
+    # Read-only fan-out of one query over several databases. Chained calls
+    # apply to every part; results are merged in the query's ORDER BY, which
+    # keyset pagination on `id` relies on (ids are unique across shards).
+    # Slicing [a:b] fetches the first b rows of every part.
+    chainable = (
+        'all', 'filter', 'exclude', 'order_by', 'select_related', 'prefetch_related', 'only', 'defer',
+        'values', 'values_list', 'annotate', 'distinct', 'none',
+    )
+
+    def __init__(self, parts, ordering=None, low=0, high=None):
+        self.parts = parts
+        self.ordering = ordering
+        self.low, self.high = low, high
+        self._result_cache = None
+
+    def __repr__(self):
+        return f'<ShardedQuerySet {self.parts!r}>'
+
+    @property
+    def model(self):
+        return self.parts[0].model
+
+    @property
+    def query(self):
+        return self.parts[0].query
+
+    def __getattr__(self, name):
+        if name not in self.chainable:
+            raise AttributeError(name)
+
+        def chained(*args, **kwargs):
+            return ShardedQuerySet([getattr(part, name)(*args, **kwargs) for part in self.parts], self.ordering)
+        return chained
+
+    def key(self):
+        part = self.parts[0]
+        ordering = self.ordering
+        if ordering is None:
+            ordering = [term for term in part.query.order_by or part.model._meta.ordering if isinstance(term, str)]
+        if not ordering:
+            return None
+        return order_key(ordering, list(getattr(part, '_fields', None) or ()))
+
+    def merged(self, parts):
+        key = self.key()
+        return heapq.merge(*parts, key=key) if key else chain.from_iterable(parts)
+
+    def fetch(self):
+        if self._result_cache is None:
+            parts = self.parts if self.high is None else [part[:self.high] for part in self.parts]
+            self._result_cache = list(islice(self.merged(parts), self.low, self.high))
+        return self._result_cache
+
+    def __iter__(self):
+        return iter(self.fetch())
+
+    def __len__(self):
+        return len(self.fetch())
+
+    def __bool__(self):
+        return bool(self.fetch())
+
+    def __aiter__(self):
+        async def rows():
+            for row in await sync_to_async(self.fetch)():
+                yield row
+        return rows()
+
+    def __getitem__(self, index):
+        if self._result_cache is not None:
+            return self._result_cache[index]
+        if isinstance(index, int):
+            return list(self[index:index + 1])[0]
+        start = self.low + (index.start or 0)
+        stop = self.high if index.stop is None else self.low + index.stop
+        if self.high is not None and stop is not None:
+            stop = min(stop, self.high)
+        return ShardedQuerySet(self.parts, self.ordering, start, stop)
+
+    def iterator(self, chunk_size=None):
+        # Streams every part at once, merged; for exports
+        return self.merged([part.iterator(chunk_size=chunk_size) for part in self.parts])
+
+    def count(self):
+        if self._result_cache is not None or self.high is not None or self.low:
+            return len(self.fetch())
+        return sum(part.count() for part in self.parts)
+
+    def exists(self):
+        return any(part.exists() for part in self.parts)
+
+    def first(self):
+        rows = self if self.key() else self.order_by('pk')
+        for row in rows[:1]:
+            return row
+        return None
+
+    def get(self, *args, **kwargs):
+        rows = [row for part in self.filter(*args, **kwargs).parts for row in part[:2]]
+        if not rows:
+            raise self.model.DoesNotExist(f'{self.model._meta.object_name} matching query does not exist.')
+        if len(rows) > 1:
+            raise self.model.MultipleObjectsReturned(f'get() returned more than one {self.model._meta.object_name}.')
+        return rows[0]
+
+    async def acount(self):
+        return await sync_to_async(self.count)()
+
+    async def afirst(self):
+        return await sync_to_async(self.first)()
+
+    async def aget(self, *args, **kwargs):
+        return await sync_to_async(self.get)(*args, **kwargs)
@@ -1,16 +1,152 @@
-from django.db.models.signals import post_save, post_delete
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import Department, Employee
-
-@receiver([post_save, post_delete], sender=Department)
-def update_department_count(sender, instance, **kwargs):
-    # Update the company's department count
-    company = instance.company
-    company.refresh_from_db()  
-    
-
-@receiver([post_save, post_delete], sender=Employee)
-def update_employee_count(sender, instance, **kwargs):
-    # Update the company's employee count
-    company = instance.company
-    company.refresh_from_db()  
\ No newline at end of file
+from .api.authentication import revoke_tokens
+from .counters import adjust_department_count, adjust_employee_count, bump_data_version, bump_global_version
+from .models import Company, Department, Employee, User
+from .sharding import (
+    allocate_ids, copy_objects, copy_rows, forget_shard, is_shard, pick_shard, remember_shard, sharded,
+    sharding_enabled,
+)
+
+@receiver(post_save, sender=Department)
+def increment_department_count(sender, instance, created, raw=False, using='default', **kwargs):
+    if created and not raw:
+        adjust_department_count(instance.company_id, 1, using)
+
+@receiver(post_delete, sender=Department)
+def decrement_department_count(sender, instance, using='default', **kwargs):
+    adjust_department_count(instance.company_id, -1, using)
+
+@receiver(post_save, sender=Employee)
+def update_employee_count(sender, instance, created, raw=False, using='default', **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_loaded_department_id', None)
+    previous_company = getattr(instance, '_loaded_company_id', None) or instance.company_id
+    if created:
+        adjust_employee_count(instance.department_id, instance.company_id, 1, using)
+    elif previous is not None and (previous, previous_company) != (instance.department_id, instance.company_id):
+        # Department or company move: one F() update per side
+        adjust_employee_count(previous, previous_company, -1, using)
+        adjust_employee_count(instance.department_id, instance.company_id, 1, using)
+    instance._loaded_department_id = instance.department_id
+    instance._loaded_company_id = instance.company_id
+
+@receiver(post_delete, sender=Employee)
+def decrement_employee_count(sender, instance, using='default', **kwargs):
+    adjust_employee_count(instance.department_id, instance.company_id, -1, using)
+
+# Data versions: ETag validators and response cache keys (core/api/conditional.py)
+
+@receiver(post_save, sender=Company)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def bump_company_version(sender, instance, raw=False, using='default', **kwargs):
+    if not raw:
+        bump_data_version([instance.pk if sender is Company else instance.company_id], using)
+
+@receiver(post_delete, sender=Company)
+def bump_company_list_version(sender, instance, using='default', **kwargs):
+    # A deleted company takes its own version with it; admins' company
+    # validators read this one instead
+    if using == DEFAULT_DB_ALIAS:
+        bump_global_version('companies')
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def bump_employee_version(sender, instance, raw=False, using='default', **kwargs):
+    if raw:
+        return
+    company_ids = {instance.company_id, getattr(instance, '_loaded_company_id', None)} - {None}
+    bump_data_version(company_ids, using)
+    instance._loaded_company_id = instance.company_id
+
+@receiver(post_save, sender=User)
+def bump_user_version(sender, instance, created, update_fields=None, raw=False, using='default', **kwargs):
+    # Employee payloads include the user's email and role; logins only
+    # touch last_login and leave the versions alone
+    if created or raw or (update_fields is not None and not {'email', 'role'} & set(update_fields)):
+        return
+    company_ids = Employee.objects.using(using).filter(user_id=instance.pk).values_list('company_id')
+    if sharding_enabled():
+        company_ids = [company_id for company_id, in sharded(company_ids)]
+    bump_data_version(company_ids, using)
+
+# Access tokens authorize from their claims (core/api/authentication.py), so
+# they must be revoked when the user can no longer sign in or loses their
+# employee record
+
+@receiver(post_save, sender=User)
+def revoke_deactivated_user_tokens(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if created or raw or (update_fields is not None and 'is_active' not in update_fields):
+        return
+    if not instance.is_active and getattr(instance, '_loaded_is_active', True):
+        revoke_tokens(instance.pk)
+    instance._loaded_is_active = instance.is_active
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    revoke_tokens(instance.pk)
+
+@receiver(post_delete, sender=Employee)
+def revoke_deleted_employee_tokens(sender, instance, **kwargs):
+    revoke_tokens(instance.user_id)
+
+# Sharding (core/sharding.py): shard assignment, global ids for tenant rows
+# and the company/user copies kept on each shard
+
+@receiver(pre_save, sender=Company)
+def assign_company_shard(sender, instance, raw=False, **kwargs):
+    if not raw and instance._state.adding and not instance.shard and sharding_enabled():
+        instance.shard = pick_shard()
+
+@receiver(post_save, sender=Company)
+def copy_company_to_shard(sender, instance, raw=False, using='default', **kwargs):
+    if raw or using != DEFAULT_DB_ALIAS or not sharding_enabled():
+        return
+    remember_shard(instance.pk, instance.shard)
+    if is_shard(instance.shard):
+        copy_objects([instance], instance.shard)
+
+@receiver(pre_delete, sender=Company)
+def delete_company_from_shard(sender, instance, using='default', **kwargs):
+    # The primary's cascade only sees rows on the primary
+    if using != DEFAULT_DB_ALIAS or not sharding_enabled():
+        return
+    forget_shard(instance.pk)
+    if is_shard(instance.shard):
+        employees = Employee.objects.using(instance.shard).filter(company_id=instance.pk)
+        user_ids = list(employees.values_list('user_id', flat=True))
+        # Cascades to the departments and employees, with their receivers
+        Company.objects.using(instance.shard).filter(pk=instance.pk).delete()
+        User.objects.using(instance.shard).filter(pk__in=user_ids).delete()
+
+@receiver(pre_save, sender=Department)
+@receiver(pre_save, sender=Employee)
+def prepare_tenant_row(sender, instance, raw=False, using='default', **kwargs):
+    if raw or not sharding_enabled() or not instance._state.adding:
+        return
+    if instance.pk is None:
+        instance.pk = allocate_ids(sender)[0]
+    if sender is Employee and is_shard(using):
+        copy_rows(User, [instance.user_id], using)
+
+@receiver(post_save, sender=User)
+def update_user_copies(sender, instance, created, raw=False, using='default', **kwargs):
+    if created or raw or using != DEFAULT_DB_ALIAS or not sharding_enabled():
+        return
+    values = {field.attname: getattr(instance, field.attname) for field in User._meta.concrete_fields if not field.primary_key}
+    for alias in settings.DATABASE_SHARDS:
+        if is_shard(alias):
+            User.objects.using(alias).filter(pk=instance.pk).update(**values)
+
+@receiver(pre_delete, sender=User)
+def delete_user_from_shards(sender, instance, using='default', **kwargs):
+    if using != DEFAULT_DB_ALIAS or not sharding_enabled():
+        return
+    for alias in settings.DATABASE_SHARDS:
+        if is_shard(alias):
+            Employee.objects.using(alias).filter(user_id=instance.pk).delete()
+            User.objects.using(alias).filter(pk=instance.pk).delete()
@@ -0,0 +1,71 @@
+from datetime import date
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.analytics import workforce_analytics
+from core.models import Company, Department, Employee, User
+
+
+@override_settings(API_RESPONSE_CACHE=None)
+class CompanyAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.acme = Company.objects.create(name='Acme')
+        cls.globex = Company.objects.create(name='Globex')
+        engineering = Department.objects.create(name='Engineering', company=cls.acme)
+        sales = Department.objects.create(name='Sales', company=cls.acme)
+        cls.admin = User.objects.create(email='admin@test.com', role='admin')
+        rows = [
+            ('manager', engineering, 'Manager', 'active', date(2014, 1, 10)),
+            ('employee', engineering, 'Engineer', 'active', date(2024, 2, 29)),
+            ('employee', engineering, 'Engineer', 'pending', date(2025, 3, 1)),
+            ('employee', sales, 'Account Executive', 'inactive', date(2021, 3, 2)),
+            ('employee', sales, 'Account Executive', 'active', None),
+        ]
+        for n, (role, department, designation, status, hired_on) in enumerate(rows):
+            user = User.objects.create(email=f'{role}{n}@acme.com', role=role)
+            Employee.objects.create(
+                user=user, company=cls.acme, department=department, name=f'Person {n}', status=status,
+                mobile_number='1234567890', address='Cairo', designation=designation, hired_on=hired_on
+            )
+        cls.manager = User.objects.get(email='manager0@acme.com')
+        cls.employee = User.objects.get(email='employee1@acme.com')
+
+    def test_breakdowns(self):
+        report = workforce_analytics(Employee.objects.filter(company=self.acme), today=date(2026, 3, 1))
+        self.assertEqual(report['headcount'], 5)
+        self.assertEqual(report['by_status'], [
+            {'status': 'active', 'count': 3}, {'status': 'inactive', 'count': 1}, {'status': 'pending', 'count': 1},
+        ])
+        self.assertEqual([(row['name'], row['count']) for row in report['by_department']],
+                         [('Engineering', 3), ('Sales', 2)])
+        self.assertEqual(report['by_designation'][0], {'designation': 'Account Executive', 'count': 2})
+        # 2025-03-01 is one year to the day; 2021-03-02 is a day short of five
+        self.assertEqual(report['by_tenure'], [
+            {'bucket': '<1y', 'count': 0}, {'bucket': '1-3y', 'count': 2}, {'bucket': '3-5y', 'count': 1},
+            {'bucket': '5-10y', 'count': 0}, {'bucket': '10y+', 'count': 1}, {'bucket': 'unknown', 'count': 1},
+        ])
+        self.assertEqual(report['hires_per_month'], [
+            {'month': '2014-01', 'count': 1}, {'month': '2021-03', 'count': 1},
+            {'month': '2024-02', 'count': 1}, {'month': '2025-03', 'count': 1},
+        ])
+
+    def test_managers_only_see_their_company(self):
+        client = APIClient()
+        client.force_authenticate(user=self.manager)
+        # Principal, ETag validators, company and five aggregates
+        with self.assertNumQueries(8):
+            response = client.get(reverse('company-analytics', args=[self.acme.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['headcount'], 5)
+        self.assertEqual(client.get(reverse('company-analytics', args=[self.globex.id])).status_code, 404)
+
+        client.force_authenticate(user=self.admin)
+        response = client.get(reverse('company-analytics', args=[self.globex.id]))
+        self.assertEqual(response.data['headcount'], 0)
+        self.assertEqual(response.data['by_tenure'][-1], {'bucket': 'unknown', 'count': 0})
+
+    def test_employees_are_forbidden(self):
+        client = APIClient()
+        client.force_authenticate(user=self.employee)
+        self.assertEqual(client.get(reverse('company-analytics', args=[self.acme.id])).status_code, 403)
@@ -0,0 +1,32 @@
+from django.test import TestCase, override_settings
+from core.benchmarks.api import ROLES, missing_routes, percentile, run_benchmark
+from core.benchmarks.seed import seed
+
+
+# A fast hasher: the benchmark signs in and creates users as every role
+@override_settings(API_RESPONSE_CACHE=None, PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class APIBenchmarkTests(TestCase):
+    def test_every_route_has_a_scenario(self):
+        self.assertEqual(missing_routes(), [])
+
+    def test_runs_every_scenario_as_every_role(self):
+        seed('default', companies=3, departments=2, employees=30, admins=1)
+        results = run_benchmark(requests=1)
+        self.assertIn('GET async-employee-list', results)
+        for name, by_role in results.items():
+            self.assertEqual(set(by_role), set(ROLES))
+            for role, result in by_role.items():
+                with self.subTest(name=name, role=role):
+                    self.assertIsInstance(result['status'], int)
+                    self.assertLess(result['status'], 500)
+                    self.assertGreaterEqual(result['queries'], 1)
+                    self.assertGreater(result['peak_kib'], 0)
+        self.assertEqual(results['GET employee-list']['manager']['status'], 200)
+        self.assertEqual(results['POST company-list']['manager']['status'], 403)
+        self.assertEqual(results['DELETE employee-detail']['admin']['status'], 204)
+
+    def test_percentile_is_an_observed_value(self):
+        samples = [5, 1, 4, 2, 3, 10, 9, 8, 7, 6]
+        self.assertEqual(percentile(samples, 50), 5)
+        self.assertEqual(percentile(samples, 95), 10)
+        self.assertEqual(percentile([3], 99), 3)
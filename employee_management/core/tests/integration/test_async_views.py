@@ -0,0 +1,107 @@
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.api.serializers import CustomTokenObtainPairSerializer
+from core.models import Company, Department, Employee, User
+
+
+@override_settings(API_RESPONSE_CACHE=None)
+class AsyncReadViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.acme = Company.objects.create(name='Acme')
+        globex = Company.objects.create(name='Globex')
+        cls.department = Department.objects.create(name='Engineering', company=cls.acme)
+        Department.objects.create(name='Sales', company=globex)
+        cls.admin = User.objects.create(email='admin@test.com', role='admin')
+        cls.manager = User.objects.create(email='manager@acme.com', role='manager')
+        cls.employee = Employee.objects.create(
+            user=cls.manager, company=cls.acme, department=cls.department, name='Mona',
+            mobile_number='1234567890', address='Cairo', designation='Manager'
+        )
+        for i in range(3):
+            user = User.objects.create(email=f'employee{i}@acme.com')
+            Employee.objects.create(
+                user=user, company=cls.acme, department=cls.department, name=f'Employee {i}',
+                mobile_number='1234567890', address='Cairo', designation='Engineer'
+            )
+        # get_token() queries, so mint the tokens outside the async tests
+        cls.tokens = {
+            user.pk: f'Bearer {CustomTokenObtainPairSerializer.get_token(user).access_token}'
+            for user in (cls.admin, cls.manager)
+        }
+
+    def token(self, user):
+        return self.tokens[user.pk]
+
+    async def test_responses_match_the_sync_endpoints(self):
+        client = AsyncClient()
+        for user in (self.admin, self.manager):
+            sync = APIClient(HTTP_AUTHORIZATION=self.token(user))
+            for name, args, params in [
+                ('company-list', [], {}),
+                ('company-detail', [self.acme.id], {}),
+                ('department-list', [], {}),
+                ('department-detail', [self.department.id], {}),
+                ('employee-list', [], {}),
+                ('employee-list', [], {'page_size': 2, 'fields': 'id,name', 'expand': 'department'}),
+                ('employee-detail', [self.employee.id], {}),
+                ('user-profile', [], {}),
+            ]:
+                with self.subTest(user=user.email, name=name, params=params):
+                    expected = await self.run_sync(sync.get, reverse(name, args=args), params)
+                    response = await client.get(
+                        reverse(f'async-{name}', args=args), params, headers={'Authorization': self.token(user)}
+                    )
+                    self.assertEqual(response.status_code, expected.status_code)
+                    self.assertEqual(
+                        response.content.replace(b'/api/async/', b'/api/'), expected.content
+                    )
+
+    async def test_cursor_pages_follow_through(self):
+        client, headers = AsyncClient(), {'Authorization': self.token(self.admin)}
+        url, ids = reverse('async-employee-list') + '?page_size=3', []
+        while url:
+            data = (await client.get(url, headers=headers)).json()
+            ids += [row['id'] for row in data['results']]
+            url = data['next']
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), 4)
+        previous = (await client.get(data['previous'], headers=headers)).json()
+        self.assertEqual([row['id'] for row in previous['results']], ids[:3])
+
+    async def test_authentication_and_scoping(self):
+        client = AsyncClient()
+        response = await client.get(reverse('async-company-list'))
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
+        response = await client.get(reverse('async-company-list'), headers={'Authorization': 'Bearer nope'})
+        self.assertEqual(response.status_code, 401)
+
+        other = await Department.objects.exclude(company=self.acme).afirst()
+        response = await client.get(
+            reverse('async-department-detail', args=[other.id]), headers={'Authorization': self.token(self.manager)}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_writes_are_not_allowed(self):
+        client, token = AsyncClient(), self.token(self.admin)
+        for method in ('post', 'put', 'patch', 'delete'):
+            with self.subTest(method=method):
+                response = await getattr(client, method)(
+                    reverse('async-company-list'), headers={'Authorization': token}
+                )
+                self.assertEqual(response.status_code, 405)
+                self.assertEqual(response['Allow'], 'GET, HEAD')
+
+    async def test_conditional_get(self):
+        client, token = AsyncClient(), self.token(self.manager)
+        response = await client.get(reverse('async-employee-list'), headers={'Authorization': token})
+        response = await client.get(
+            reverse('async-employee-list'), headers={'Authorization': token, 'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def run_sync(self, get, url, params):
+        return await sync_to_async(get)(url, params)
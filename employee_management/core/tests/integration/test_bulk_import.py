@@ -0,0 +1,77 @@
+from django.contrib.auth.hashers import check_password
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.bulk import hash_passwords
+from core.models import Company, Department, Employee, User
+
+
+class BulkImportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.company = Company.objects.create(name='Acme')
+        self.department = Department.objects.create(name='Engineering', company=self.company)
+        self.other_company = Company.objects.create(name='Globex')
+        self.other_department = Department.objects.create(name='Sales', company=self.other_company)
+        self.admin_user = User.objects.create(email='admin@test.com', role='admin')
+        User.objects.create(email='taken@test.com')
+
+    def row(self, email, **overrides):
+        row = {
+            'name': 'Jane Doe', 'email': email, 'password': 'testpass123',
+            'company': self.company.id, 'department': self.department.id,
+            'mobile_number': '1234567890', 'address': 'Address', 'designation': 'Developer',
+        }
+        row.update(overrides)
+        return row
+
+    def test_json_import_reports_row_errors(self):
+        self.client.force_authenticate(user=self.admin_user)
+        rows = [
+            self.row('one@test.com'),
+            self.row('taken@test.com'),
+            self.row('two@test.com', department=self.other_department.id),
+            self.row('three@test.com'),
+            self.row('one@test.com'),
+            self.row('bad-email'),
+        ]
+        response = self.client.post(reverse('employee-bulk-import'), rows, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['row'] for error in response.data['errors']], [1, 2, 4, 5])
+
+        user = User.objects.get(email='one@test.com')
+        self.assertTrue(user.check_password('testpass123'))
+        self.assertEqual((user.first_name, user.last_name, user.role), ('Jane', 'Doe', 'employee'))
+        self.company.refresh_from_db()
+        self.department.refresh_from_db()
+        self.assertEqual(self.company.number_of_employees, 2)
+        self.assertEqual(self.department.number_of_employees, 2)
+
+    def test_csv_import_for_manager_uses_their_company(self):
+        manager = User.objects.create(email='manager@test.com', role='manager')
+        Employee.objects.create(
+            user=manager, company=self.company, department=self.department, name='Manager',
+            mobile_number='1234567890', address='Address', designation='Manager'
+        )
+        self.client.force_authenticate(user=manager)
+        body = (
+            'name,email,password,department,mobile_number,address,designation\n'
+            f'Ann Lee,ann@test.com,testpass123,{self.department.id},1234567890,Address,QA\n'
+            f'Bob Ray,bob@test.com,testpass123,{self.other_department.id},1234567890,Address,QA\n'
+        )
+        response = self.client.post(reverse('employee-bulk-import'), body, content_type='text/csv')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 1)
+        self.assertIn('department', response.data['errors'][0]['errors'])
+        self.assertEqual(Employee.objects.get(user__email='ann@test.com').company, self.company)
+
+    def test_employee_cannot_import(self):
+        self.client.force_authenticate(user=User.objects.get(email='taken@test.com'))
+        response = self.client.post(reverse('employee-bulk-import'), [self.row('x@test.com')], format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_hash_passwords_with_process_pool(self):
+        hashes = hash_passwords(['first', 'second'], workers=2, threshold=0)
+        self.assertTrue(check_password('first', hashes[0]))
+        self.assertTrue(check_password('second', hashes[1]))
@@ -0,0 +1,113 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core import bulk
+from core.models import Company, Department, Employee, User
+
+
+class BulkUpdateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.company = Company.objects.create(name='Acme')
+        self.engineering = Department.objects.create(name='Engineering', company=self.company)
+        self.platform = Department.objects.create(name='Platform', company=self.company)
+        self.other_company = Company.objects.create(name='Globex')
+        self.other_department = Department.objects.create(name='Sales', company=self.other_company)
+        self.manager = User.objects.create(email='manager@acme.com', role='manager')
+        self.employees = [
+            self.hire(self.manager if n == 0 else User.objects.create(email=f'e{n}@acme.com'), self.engineering)
+            for n in range(4)
+        ]
+        self.outsider = self.hire(User.objects.create(email='e@globex.com'), self.other_department)
+        self.client.force_authenticate(user=self.manager)
+
+    def hire(self, user, department):
+        return Employee.objects.create(
+            user=user, company=department.company, department=department, name=user.email,
+            mobile_number='1234567890', address='Cairo', designation='Engineer'
+        )
+
+    def bulk_update(self, body):
+        return self.client.post(reverse('employee-bulk-update'), body, format='json')
+
+    def test_move_by_ids_is_one_update(self):
+        version = Company.objects.get(pk=self.company.pk).data_version
+        ids = [employee.id for employee in self.employees[1:]]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.bulk_update({
+                'ids': ids, 'patch': {'department': self.platform.id, 'designation': 'Platform Engineer'},
+            })
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data, {'updated': 3})
+        employee_updates = [query for query in queries if query['sql'].startswith('UPDATE "core_employee"')]
+        self.assertEqual(len(employee_updates), 1)
+
+        moved = Employee.objects.filter(id__in=ids)
+        self.assertEqual(set(moved.values_list('department_id', 'designation')), {(self.platform.id, 'Platform Engineer')})
+        self.engineering.refresh_from_db()
+        self.platform.refresh_from_db()
+        self.assertEqual((self.engineering.employee_count, self.platform.employee_count), (1, 3))
+        company = Company.objects.get(pk=self.company.pk)
+        self.assertEqual(company.employee_count, 4)
+        self.assertGreater(company.data_version, version)
+
+    def test_status_by_filter(self):
+        response = self.bulk_update({
+            'filter': {'department': self.engineering.id, 'status': 'pending'}, 'patch': {'status': 'inactive'},
+        })
+        self.assertEqual(response.data, {'updated': 4})
+        self.assertEqual(Employee.objects.get(pk=self.outsider.pk).status, 'pending')
+        self.assertEqual(Employee.objects.filter(company=self.company, status='inactive').count(), 4)
+
+    def test_set_based_validation(self):
+        ids = [self.employees[1].id, self.outsider.id]
+        response = self.bulk_update({'ids': ids, 'patch': {'status': 'active'}})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(self.outsider.id), response.data['ids'])
+        response = self.bulk_update({'ids': ids[:1], 'patch': {'department': self.other_department.id}})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('department', response.data)
+        self.assertFalse(Employee.objects.filter(status='active').exists())
+
+        self.client.force_authenticate(user=User.objects.create(email='admin@test.com', role='admin'))
+        response = self.bulk_update({
+            'ids': [self.employees[1].id, self.outsider.id], 'patch': {'department': self.platform.id},
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('every selected employee', response.data['department'])
+
+    def test_move_never_crosses_tenants(self):
+        # An admin's filter matches only Acme when it is checked; a Globex
+        # employee that matches by the time of the UPDATE stays where it is
+        self.client.force_authenticate(user=User.objects.create(email='admin@test.com', role='admin'))
+        validate = bulk.validate_bulk_update
+
+        def validate_then_hire(*args):
+            errors = validate(*args)
+            Employee.objects.filter(pk=self.outsider.pk).update(designation='Engineer', status='pending')
+            return errors
+
+        Employee.objects.filter(pk=self.outsider.pk).update(status='active')
+        with mock.patch('core.bulk.validate_bulk_update', side_effect=validate_then_hire):
+            response = self.bulk_update({'filter': {'status': 'pending'}, 'patch': {'department': self.platform.id}})
+        self.assertEqual(response.data, {'updated': 4})
+        self.assertEqual(Employee.objects.get(pk=self.outsider.pk).department_id, self.other_department.id)
+        self.other_department.refresh_from_db()
+        self.platform.refresh_from_db()
+        self.assertEqual((self.other_department.employee_count, self.platform.employee_count), (1, 4))
+
+    def test_malformed_requests(self):
+        self.assertEqual(self.bulk_update({'ids': [1], 'patch': {'name': 'Bob'}}).status_code, 400)
+        self.assertEqual(self.bulk_update({'ids': [1], 'patch': {}}).status_code, 400)
+        self.assertEqual(self.bulk_update({'patch': {'status': 'active'}}).status_code, 400)
+        self.assertEqual(self.bulk_update({'ids': [1], 'filter': {'status': 'active'},
+                                           'patch': {'status': 'active'}}).status_code, 400)
+
+    def test_employees_are_forbidden(self):
+        self.client.force_authenticate(user=self.employees[1].user)
+        response = self.bulk_update({'ids': [self.employees[1].id], 'patch': {'status': 'active'}})
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import Company, DataVersion, Department, Employee, User
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.acme = Company.objects.create(name='Acme')
+        self.globex = Company.objects.create(name='Globex')
+        self.department = Department.objects.create(name='Engineering', company=self.acme)
+        self.other_department = Department.objects.create(name='Engineering', company=self.globex)
+        manager = User.objects.create(email='manager@acme.com', role='manager')
+        self.employee = Employee.objects.create(
+            user=manager, company=self.acme, department=self.department, name='Mona',
+            mobile_number='1234567890', address='Cairo', designation='Manager'
+        )
+        self.client.force_authenticate(user=manager)
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_data_is_not_modified(self):
+        url = reverse('employee-list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+
+        with self.assertNumQueries(2):
+            response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_writes_change_the_validator(self):
+        urls = [
+            reverse('company-list'),
+            reverse('department-list'),
+            reverse('employee-detail', args=[self.employee.id]),
+        ]
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+        self.assertEqual(len(set(etags.values())), len(urls))
+
+        # Another tenant's writes don't invalidate this manager's caches
+        self.other_department.name = 'Sales'
+        self.other_department.save()
+        for url in urls:
+            self.assertEqual(self.revalidate(url, etags[url]).status_code, 304)
+
+        for write in (
+            lambda: Department.objects.create(name='Sales', company=self.acme),
+            lambda: User.objects.filter(pk=self.employee.user_id).get().save(update_fields=['email']),
+            lambda: self.employee.save(),
+        ):
+            write()
+            for url in urls:
+                response = self.revalidate(url, etags[url])
+                self.assertEqual(response.status_code, 200)
+                etags[url] = response['ETag']
+
+    def test_logins_do_not_change_the_validator(self):
+        url = reverse('company-list')
+        etag = self.client.get(url)['ETag']
+        self.employee.user.save(update_fields=['last_login'])
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+    def test_deleting_a_company_changes_the_admin_validators(self):
+        self.client.force_authenticate(user=User.objects.create(email='admin@test.com', role='admin'))
+        url = reverse('company-list')
+        initech = Company.objects.create(name='Initech')
+        for delete in (
+            lambda: self.client.delete(reverse('company-detail', args=[self.globex.id])),
+            lambda: Company.objects.get(pk=initech.pk).delete(),
+        ):
+            # Last-Modified has one-second resolution
+            an_hour_ago = timezone.now() - timedelta(hours=1)
+            Company.objects.update(data_modified=an_hour_ago)
+            DataVersion.objects.update(modified=an_hour_ago)
+            response = self.client.get(url)
+            etag, last_modified = response['ETag'], response['Last-Modified']
+            delete()
+            response = self.revalidate(url, etag)
+            self.assertEqual(response.status_code, 200)
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['name'] for row in response.json()['results']], ['Acme'])
+
+        # Down to no companies at all
+        etag = response['ETag']
+        Company.objects.get(pk=self.acme.pk).delete()
+        response = self.revalidate(url, etag)
+        self.assertEqual((response.status_code, response.json()['results']), (200, []))
@@ -0,0 +1,62 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import Company, Department, Employee, User
+
+
+@override_settings(API_RESPONSE_CACHE=None)
+class DashboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.acme = Company.objects.create(name='Acme')
+        Company.objects.create(name='Globex')
+        cls.engineering = Department.objects.create(name='Engineering', company=cls.acme)
+        Department.objects.create(name='Sales', company=cls.acme)
+        cls.admin = User.objects.create(email='admin@test.com', role='admin')
+        cls.manager = User.objects.create(email='manager@acme.com', role='manager')
+        cls.manager_employee = Employee.objects.create(
+            user=cls.manager, company=cls.acme, department=cls.engineering, name='Mona',
+            mobile_number='1234567890', address='Cairo', designation='Manager'
+        )
+        cls.employee = User.objects.create(email='employee@acme.com', role='employee')
+        Employee.objects.create(
+            user=cls.employee, company=cls.acme, department=cls.engineering, name='Omar',
+            mobile_number='1234567890', address='Giza', designation='Engineer'
+        )
+
+    def get_as(self, user, queries, **params):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        with self.assertNumQueries(queries):
+            response = client.get(reverse('dashboard'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_admin_gets_the_companies(self):
+        data = self.get_as(self.admin, 1)
+        self.assertEqual([company['name'] for company in data['companies']['results']], ['Acme', 'Globex'])
+        self.assertEqual(data['companies']['results'][0]['number_of_departments'], 2)
+
+    def test_manager_gets_everything_in_a_fixed_number_of_queries(self):
+        # Principal, company, profile, departments
+        data = self.get_as(self.manager, 4, page_size=1)
+        client = APIClient()
+        client.force_authenticate(user=self.manager)
+        detail = client.get(reverse('employee-detail', args=[self.manager_employee.id])).json()
+        self.assertEqual(data['profile'], detail)
+        self.assertEqual(data['company']['number_of_employees'], 2)
+        self.assertEqual([department['name'] for department in data['departments']['results']], ['Engineering'])
+        self.assertEqual(data['departments']['results'][0]['number_of_employees'], 2)
+        self.assertNotIn('employees', data)
+
+        # The link continues on the list endpoint
+        self.assertIn('/api/departments/', data['departments']['next'])
+        following = client.get(data['departments']['next']).json()
+        self.assertEqual([department['name'] for department in following['results']], ['Sales'])
+
+    def test_employee_gets_their_profile(self):
+        data = self.get_as(self.employee, 4)
+        self.assertEqual(data['profile']['name'], 'Omar')
+        self.assertEqual(data['company']['name'], 'Acme')
+        self.assertEqual(len(data['departments']['results']), 2)
+        self.assertNotIn('employees', data)
@@ -0,0 +1,67 @@
+from django.contrib.admin.models import ADDITION, LogEntry
+from django.db.models.signals import post_delete
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import Company, Department, Employee, User
+
+
+@override_settings(API_RESPONSE_CACHE=None, BULK_DELETE_CHUNK_SIZE=2)
+class SetBasedDeletionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create(email='admin@test.com', role='admin')
+        self.acme = Company.objects.create(name='Acme')
+        self.engineering = Department.objects.create(name='Engineering', company=self.acme)
+        self.sales = Department.objects.create(name='Sales', company=self.acme)
+        self.globex = Company.objects.create(name='Globex')
+        self.support = Department.objects.create(name='Support', company=self.globex)
+        self.manager = self.hire('manager@acme.com', self.sales, role='manager')
+        for n in range(5):
+            self.hire(f'engineer{n}@acme.com', self.engineering)
+        self.hire('agent@globex.com', self.support)
+        LogEntry.objects.create(user=User.objects.get(email='engineer0@acme.com'), action_flag=ADDITION,
+                                object_repr='Engineering')
+
+        self.deleted = []
+        post_delete.connect(self.record, sender=Employee)
+        self.addCleanup(post_delete.disconnect, self.record, sender=Employee)
+
+    def record(self, sender, instance, **kwargs):
+        self.deleted.append(instance.pk)
+
+    def hire(self, email, department, role='employee'):
+        user = User.objects.create(email=email, role=role)
+        return Employee.objects.create(
+            user=user, company=department.company, department=department, name=email,
+            mobile_number='1234567890', address='Cairo', designation='Engineer'
+        )
+
+    def test_deleting_a_department_removes_its_employees_and_users(self):
+        self.client.force_authenticate(user=self.manager.user)
+        version = Company.objects.get(pk=self.acme.pk).data_version
+        response = self.client.delete(reverse('department-detail', args=[self.engineering.id]))
+        self.assertEqual(response.status_code, 204)
+
+        self.assertFalse(Department.objects.filter(pk=self.engineering.pk).exists())
+        self.assertFalse(Employee.objects.filter(department_id=self.engineering.pk).exists())
+        self.assertFalse(User.objects.filter(email__startswith='engineer').exists())
+        self.assertFalse(LogEntry.objects.exists())
+        self.assertEqual(self.deleted, [])
+        acme = Company.objects.get(pk=self.acme.pk)
+        self.assertEqual((acme.department_count, acme.employee_count), (1, 1))
+        self.assertGreater(acme.data_version, version)
+        self.assertEqual(Department.objects.get(pk=self.sales.pk).employee_count, 1)
+
+    def test_deleting_a_company_leaves_other_tenants_alone(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.delete(reverse('company-detail', args=[self.acme.id]))
+        self.assertEqual(response.status_code, 204)
+
+        self.assertEqual(list(Company.objects.values_list('name', flat=True)), ['Globex'])
+        self.assertEqual(list(Department.objects.values_list('name', flat=True)), ['Support'])
+        self.assertEqual(list(Employee.objects.values_list('name', flat=True)), ['agent@globex.com'])
+        self.assertEqual(set(User.objects.values_list('email', flat=True)), {'admin@test.com', 'agent@globex.com'})
+        self.assertEqual(self.deleted, [])
+        globex = Company.objects.get(pk=self.globex.pk)
+        self.assertEqual((globex.department_count, globex.employee_count), (1, 1))
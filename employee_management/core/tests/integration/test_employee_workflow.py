@@ -49,4 +49,4 @@ class EmployeeWorkflowTests(TestCase):
         dept_employees_url = reverse('department-employees', args=[self.department.id])
         response = self.client.get(dept_employees_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
\ No newline at end of file
+        self.assertEqual(len(response.data['results']), 1)
\ No newline at end of file
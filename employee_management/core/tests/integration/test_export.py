@@ -0,0 +1,48 @@
+import csv
+import io
+import json
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import Company, Department, Employee, User
+
+
+class EmployeeExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employees = {}
+        for name in ('Acme', 'Globex'):
+            company = Company.objects.create(name=name)
+            department = Department.objects.create(name='Engineering', company=company)
+            for i in range(3):
+                user = User.objects.create(email=f'{name.lower()}{i}@test.com', role='manager' if i == 0 else 'employee')
+                self.employees.setdefault(name, []).append(Employee.objects.create(
+                    user=user, company=company, department=department, name=f'{name} {i}',
+                    mobile_number='1234567890', address='Address, with comma', designation='Developer'
+                ))
+
+    def read(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_is_scoped_to_manager_company(self):
+        manager = self.employees['Acme'][0].user
+        self.client.force_authenticate(user=manager)
+        response = self.client.get(reverse('employee-export'))
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        self.assertEqual([row['email'] for row in rows], ['acme0@test.com', 'acme1@test.com', 'acme2@test.com'])
+        self.assertEqual(rows[1]['address'], 'Address, with comma')
+
+    def test_ndjson_export_for_admin(self):
+        self.client.force_authenticate(user=User.objects.create(email='admin@test.com', role='admin'))
+        response = self.client.get(reverse('employee-export') + '?output=ndjson')
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]['role'], 'manager')
+        self.assertEqual(rows[0]['days_employed'], 0)
+
+    def test_unknown_output_is_rejected(self):
+        self.client.force_authenticate(user=User.objects.create(email='admin@test.com', role='admin'))
+        response = self.client.get(reverse('employee-export') + '?output=xml')
+        self.assertEqual(response.status_code, 400)
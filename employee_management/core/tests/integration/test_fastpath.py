@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import Company, Department, Employee, User
+
+
+@override_settings(EMPLOYEE_FAST_READS=True)
+class FastReadTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        company = Company.objects.create(name='Acme')
+        department = Department.objects.create(name='Engineering', company=company)
+        rows = [
+            ('admin@acme.com', 'admin', 'Zoë Ångström', 'Line\u2028break "quoted" \\ \u0007', date(2019, 2, 28)),
+            ('omar@acme.com', 'employee', 'عمر علي', 'Cairo\n', None),
+            ('future@acme.com', 'employee', 'Future Hire', '', date.today() + timedelta(days=3)),
+        ]
+        for email, role, name, address, hired_on in rows:
+            user = User.objects.create(email=email, role=role)
+            Employee.objects.create(
+                user=user, company=company, department=department, name=name, status='active',
+                mobile_number='1234567890', address=address, designation='Engineer', hired_on=hired_on
+            )
+        self.client.force_authenticate(user=User.objects.get(email='admin@acme.com'))
+
+    def fetch(self, url, params):
+        # Bypass the response cache so each path really runs
+        with override_settings(API_RESPONSE_CACHE=None):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    def test_output_matches_the_serializer_byte_for_byte(self):
+        employee = Employee.objects.order_by('id').first()
+        cases = [
+            (reverse('employee-list'), {}),
+            (reverse('employee-list'), {'page_size': 2}),
+            (reverse('employee-list'), {'fields': 'id,name,days_employed,email', 'expand': 'company'}),
+            (reverse('employee-list'), {'expand': 'department,company'}),
+            (reverse('employee-detail', args=[employee.id]), {}),
+            (reverse('employee-detail', args=[employee.id]), {'fields': 'user,hired_on'}),
+        ]
+        for url, params in cases:
+            with self.subTest(url=url, params=params):
+                with override_settings(EMPLOYEE_FAST_READS=False):
+                    expected = self.fetch(url, params)
+                self.assertEqual(self.fetch(url, params), expected)
+
+    def test_days_employed_is_computed_in_sql(self):
+        data = self.client.get(reverse('employee-list')).json()['results']
+        expected = {employee.id: employee.days_employed for employee in Employee.objects.all()}
+        self.assertEqual({row['id']: row['days_employed'] for row in data}, expected)
+        self.assertIn('\\u2028', self.client.get(reverse('employee-list')).content.decode())
@@ -0,0 +1,68 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import Company, Department, Employee, User
+
+
+class EmployeeFieldsetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.company = Company.objects.create(name='Acme')
+        self.department = Department.objects.create(name='Engineering', company=self.company)
+        for i in range(5):
+            user = User.objects.create(email=f'employee{i}@acme.com', role='admin' if i == 0 else 'employee')
+            Employee.objects.create(
+                user=user, company=self.company, department=self.department, name=f'Employee {i}',
+                mobile_number='1234567890', address='Cairo', designation='Engineer'
+            )
+        self.client.force_authenticate(user=User.objects.get(email='employee0@acme.com'))
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), [query['sql'] for query in queries]
+
+    def test_default_shape_is_unchanged(self):
+        data, _ = self.get(reverse('employee-list'))
+        self.assertEqual(list(data['results'][0]), [
+            'id', 'days_employed', 'user', 'role', 'email', 'status', 'name', 'mobile_number',
+            'address', 'designation', 'hired_on', 'company', 'department',
+        ])
+
+    def test_narrow_fields_read_narrow_rows(self):
+        data, queries = self.get(reverse('employee-list'), fields='id,name,designation,days_employed')
+        self.assertEqual(list(data['results'][0]), ['id', 'days_employed', 'name', 'designation'])
+        self.assertEqual(len(data['results']), 5)
+        select = queries[-1]
+        self.assertNotIn('core_user', select)
+        self.assertNotIn('"core_employee"."address"', select)
+
+        data, queries = self.get(
+            reverse('department-employees', args=[self.department.id]), fields='id,email'
+        )
+        self.assertEqual(data['results'][0], {'id': 1, 'email': 'employee0@acme.com'})
+        self.assertNotIn('"core_user"."password"', queries[-1])
+
+    def test_expand_nests_relations_without_extra_queries(self):
+        url = reverse('employee-list')
+        _, plain = self.get(url, fields='id')
+        data, queries = self.get(url, fields='id', expand='company,department')
+        self.assertEqual(len(queries), len(plain))
+        self.assertEqual(data['results'][0], {
+            'id': 1,
+            'company': {'id': self.company.id, 'name': 'Acme'},
+            'department': {'id': self.department.id, 'name': 'Engineering'},
+        })
+
+        data, _ = self.get(reverse('employee-detail', args=[1]), expand='department')
+        self.assertEqual(data['department']['name'], 'Engineering')
+        self.assertEqual(data['email'], 'employee0@acme.com')
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse('employee-list'), {'fields': 'id,salary'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('employee-list'), {'expand': 'user'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,40 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import Company, Department, Employee, User
+
+
+@override_settings(API_RESPONSE_CACHE=None, METRICS_TOKEN=None, REQUEST_TIMING={'SAMPLE_RATE': 1})
+class MetricsEndpointTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.acme = Company.objects.create(name='Acme')
+        cls.department = Department.objects.create(name='Engineering', company=cls.acme)
+        cls.manager = User.objects.create(email='manager@acme.com', role='manager')
+        Employee.objects.create(
+            user=cls.manager, company=cls.acme, department=cls.department, name='Mona',
+            mobile_number='1234567890', address='Cairo', designation='Manager'
+        )
+
+    def test_requests_and_signins_are_exposed(self):
+        client = APIClient()
+        client.post(reverse('signin'), {'email': 'manager@acme.com', 'password': 'wrong'}, format='json')
+        client.force_authenticate(user=self.manager)
+        self.assertEqual(client.get(reverse('employee-list')).status_code, 200)
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        lines = response.content.decode().splitlines()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', lines)
+        self.assertTrue(any(line.startswith(
+            'http_requests_total{method="GET",status="200",view="EmployeeViewSet.list"} ') for line in lines))
+        self.assertTrue(any(line.startswith(
+            'http_request_db_queries_count{view="EmployeeViewSet.list"} ') for line in lines))
+        self.assertTrue(any(line.startswith('signin_attempts_total{outcome="invalid_credentials"} ') for line in lines))
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        response = self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer scrape-secret'})
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,46 @@
+from unittest import mock
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.api.pagination import IdCursorPagination
+from core.models import Company, Department, Employee, User
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = User.objects.create(email='admin@test.com', role='admin')
+        self.client.force_authenticate(user=self.admin_user)
+        self.company = Company.objects.create(name='Test Company')
+        self.department = Department.objects.create(name='Test Department', company=self.company)
+        users = User.objects.bulk_create(User(email=f'employee{i}@test.com') for i in range(12))
+        Employee.objects.bulk_create(
+            Employee(
+                user=user, company=self.company, department=self.department, name=user.email,
+                mobile_number='1234567890', address='Address', designation='Developer'
+            )
+            for user in users
+        )
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertLessEqual(len(response.data['results']), 5)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_employee_pages_cover_every_row_in_id_order(self):
+        ids = self.walk(reverse('employee-list') + '?page_size=5')
+        self.assertEqual(ids, list(Employee.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_department_employees_action_is_paginated(self):
+        url = reverse('department-employees', args=[self.department.id]) + '?page_size=5'
+        self.assertEqual(len(self.walk(url)), 12)
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(IdCursorPagination, 'max_page_size', 3):
+            response = self.client.get(reverse('employee-list') + '?page_size=100000')
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNotNone(response.data['next'])
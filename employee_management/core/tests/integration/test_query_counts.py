@@ -0,0 +1,103 @@
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Company, Department, Employee, User
+
+# Query budget per endpoint for an admin; it must not depend on the number
+# of rows. Every GET except the profile pays one query for its ETag
+# validators.
+QUERY_BUDGET = {
+    'company-list': 2,
+    'company-detail': 2,
+    'company-departments': 3,
+    'department-list': 2,
+    'department-detail': 2,
+    'department-employees': 3,
+    'employee-list': 2,
+    'employee-detail': 2,
+    'user-profile': 1,
+}
+
+# Managers and employees pay one extra query to resolve their principal,
+# except on the profile, which loads it anyway. Admins have no profile.
+ROLES = ('admin', 'manager', 'employee')
+PRINCIPAL_QUERIES = {'admin': 0, 'manager': 1, 'employee': 1}
+
+ROW_COUNTS = (1, 100, 1000)
+
+
+
+# bulk_create() skips the receivers that bump the data versions, so cached
+# responses would outlive the seeding between row counts
+@override_settings(API_RESPONSE_CACHE=None)
+class QueryCountRegressionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.password = make_password('testpass123')
+        cls.admin_user = User.objects.create(email='admin@test.com', password=cls.password, role='admin')
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def seed(self, rows):
+        # Grow the dataset to `rows` companies, departments and employees
+        # (at least two employees: a manager and an employee). Departments
+        # live in the first company and employees in the first department
+        # so the nested actions return every row too.
+        existing = Company.objects.count()
+        Company.objects.bulk_create(Company(name=f'Company {i}') for i in range(existing, rows))
+        company = Company.objects.order_by('id').first()
+        existing = Department.objects.count()
+        Department.objects.bulk_create(
+            Department(company=company, name=f'Department {i}') for i in range(existing, rows)
+        )
+        department = Department.objects.order_by('id').first()
+        existing = Employee.objects.count()
+        users = User.objects.bulk_create(
+            User(email=f'employee{i}@test.com', password=self.password) for i in range(existing, max(rows, 2))
+        )
+        Employee.objects.bulk_create(
+            Employee(
+                user=user, company=company, department=department, name=f'Employee {user.email}',
+                mobile_number='1234567890', address='Address', designation='Developer'
+            )
+            for user in users
+        )
+        manager, employee = Employee.objects.order_by('id')[:2]
+        User.objects.filter(pk=manager.user_id).update(role='manager')
+        # Fresh instances, without a cached principal
+        users = {
+            'admin': self.admin_user,
+            'manager': User.objects.get(pk=manager.user_id),
+            'employee': User.objects.get(pk=employee.user_id),
+        }
+        return company, department, employee, users
+
+    def urls(self, company, department, employee):
+        return {
+            'company-list': reverse('company-list'),
+            'company-detail': reverse('company-detail', args=[company.id]),
+            'company-departments': reverse('company-departments', args=[company.id]),
+            'department-list': reverse('department-list'),
+            'department-detail': reverse('department-detail', args=[department.id]),
+            'department-employees': reverse('department-employees', args=[department.id]),
+            'employee-list': reverse('employee-list'),
+            'employee-detail': reverse('employee-detail', args=[employee.id]),
+            'user-profile': reverse('user-profile'),
+        }
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        for rows in ROW_COUNTS:
+            company, department, employee, users = self.seed(rows)
+            for role in ROLES:
+                self.client.force_authenticate(user=users[role])
+                for name, url in self.urls(company, department, employee).items():
+                    if role == 'admin' and name == 'user-profile':
+                        continue
+                    budget = QUERY_BUDGET[name] + (0 if name == 'user-profile' else PRINCIPAL_QUERIES[role])
+                    with self.subTest(role=role, endpoint=name, rows=rows):
+                        with self.assertNumQueries(budget):
+                            response = self.client.get(url)
+                        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,57 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import Company, Department, Employee, User
+from core.routers import current_replica, replica_reads
+
+
+# The test database stands in for the replica: every query records the
+# replica the router had picked when it ran (None = primary)
+@override_settings(DATABASE_REPLICAS=['default'], API_RESPONSE_CACHE=None)
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.acme = Company.objects.create(name='Acme')
+        self.department = Department.objects.create(name='Engineering', company=self.acme)
+        manager = User.objects.create(email='manager@acme.com', role='manager')
+        self.employee = Employee.objects.create(
+            user=manager, company=self.acme, department=self.department, name='Mona',
+            mobile_number='1234567890', address='Cairo', designation='Manager'
+        )
+        self.client.force_authenticate(user=manager)
+        self.routed = []
+
+        def record(execute, sql, params, many, context):
+            self.routed.append(current_replica())
+            return execute(sql, params, many, context)
+        wrapper = connection.execute_wrapper(record)
+        wrapper.__enter__()
+        self.addCleanup(wrapper.__exit__, None, None, None)
+
+    def test_get_requests_read_from_the_replica(self):
+        for url in (reverse('employee-list'), reverse('company-detail', args=[self.acme.id]),
+                    reverse('department-employees', args=[self.department.id]), reverse('user-profile')):
+            with self.subTest(url=url):
+                self.routed.clear()
+                self.assertEqual(self.client.get(url).status_code, 200)
+                self.assertTrue(self.routed)
+                self.assertEqual(set(self.routed), {'default'})
+
+    def test_write_requests_stay_on_the_primary(self):
+        response = self.client.patch(
+            reverse('department-detail', args=[self.department.id]), {'name': 'Platform'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.routed)
+        self.assertEqual(set(self.routed), {None})
+
+    def test_reads_after_a_write_use_the_primary(self):
+        with replica_reads():
+            employee = Employee.objects.get(pk=self.employee.pk)
+            employee.designation = 'Director'
+            employee.save()
+            self.assertEqual(Employee.objects.get(pk=self.employee.pk).designation, 'Director')
+        reads, writes = self.routed[0], self.routed[1:]
+        self.assertEqual(reads, 'default')
+        self.assertEqual(set(writes), {None})
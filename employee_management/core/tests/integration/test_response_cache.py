@@ -0,0 +1,64 @@
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import Company, Department, Employee, User
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        caches['api'].clear()
+        self.client = APIClient()
+        self.acme = Company.objects.create(name='Acme')
+        self.globex = Company.objects.create(name='Globex')
+        self.department = Department.objects.create(name='Engineering', company=self.acme)
+        Department.objects.create(name='Engineering', company=self.globex)
+        self.admin = User.objects.create(email='admin@test.com', role='admin')
+        self.manager = User.objects.create(email='manager@acme.com', role='manager')
+        self.employee = Employee.objects.create(
+            user=self.manager, company=self.acme, department=self.department, name='Mona',
+            mobile_number='1234567890', address='Cairo', designation='Manager'
+        )
+
+    def test_hits_skip_the_queryset_and_serializer(self):
+        self.client.force_authenticate(user=self.manager)
+        url = reverse('department-list')
+        first = self.client.get(url)
+        # Principal and validator lookups only
+        with self.assertNumQueries(2):
+            second = self.client.get(url)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_keys_depend_on_role_and_company(self):
+        url = reverse('department-list')
+        self.client.force_authenticate(user=self.manager)
+        self.assertEqual(len(self.client.get(url).json()['results']), 1)
+        self.client.force_authenticate(user=self.admin)
+        self.assertEqual(len(self.client.get(url).json()['results']), 2)
+
+    def test_writes_are_never_served_stale(self):
+        self.client.force_authenticate(user=self.manager)
+        url = reverse('employee-detail', args=[self.employee.id])
+        self.assertEqual(self.client.get(url).json()['designation'], 'Manager')
+        self.employee.designation = 'Director'
+        self.employee.save()
+        self.assertEqual(self.client.get(url).json()['designation'], 'Director')
+        user = User.objects.get(pk=self.manager.pk)
+        user.email = 'mona@acme.com'
+        user.save(update_fields=['email'])
+        self.assertEqual(self.client.get(url).json()['email'], 'mona@acme.com')
+
+        departments = reverse('department-list')
+        self.assertEqual(len(self.client.get(departments).json()['results']), 1)
+        Department.objects.create(name='Sales', company=self.acme)
+        self.assertEqual(len(self.client.get(departments).json()['results']), 2)
+
+    @override_settings(API_RESPONSE_CACHE=None)
+    def test_cache_can_be_disabled(self):
+        self.client.force_authenticate(user=self.manager)
+        url = reverse('department-list')
+        self.client.get(url)
+        with self.assertNumQueries(3):
+            self.client.get(url)
@@ -0,0 +1,51 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import Company, Department, Employee, User
+
+
+class EmployeeSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.acme = Company.objects.create(name='Acme')
+        self.globex = Company.objects.create(name='Globex')
+        self.acme_dept = Department.objects.create(name='Engineering', company=self.acme)
+        self.globex_dept = Department.objects.create(name='Engineering', company=self.globex)
+        self.manager = self.create('manager@acme.com', 'Mona Hassan', 'Engineering Manager', self.acme_dept, role='manager')
+        self.engineer = self.create('omar@acme.com', 'Omar Ali', 'Backend Engineer', self.acme_dept)
+        self.designer = self.create('sara@acme.com', 'Sara Nabil', 'Designer', self.acme_dept, address='Engineer St')
+        self.other = self.create('karim@globex.com', 'Karim Adel', 'Backend Engineer', self.globex_dept)
+        self.client.force_authenticate(user=self.manager.user)
+
+    def create(self, email, name, designation, department, role='employee', address='Cairo'):
+        user = User.objects.create(email=email, role=role)
+        return Employee.objects.create(
+            user=user, company=department.company, department=department, name=name,
+            mobile_number='1234567890', address=address, designation=designation
+        )
+
+    def search(self, query):
+        response = self.client.get(reverse('employee-search'), {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_search_is_ranked_and_company_scoped(self):
+        ids = self.search('engineer')
+        self.assertNotIn(self.other.id, ids)
+        self.assertEqual(set(ids), {self.manager.id, self.engineer.id, self.designer.id})
+        self.assertEqual(self.search('backend eng'), [self.engineer.id])
+
+    def test_index_follows_writes(self):
+        self.assertEqual(self.search('omar@acme'), [self.engineer.id])
+        self.engineer.designation = 'Accountant'
+        self.engineer.save()
+        self.assertEqual(self.search('accountant'), [self.engineer.id])
+        User.objects.filter(pk=self.engineer.user_id).update(email='o.ali@acme.com')
+        self.assertEqual(self.search('o.ali'), [self.engineer.id])
+        self.engineer.delete()
+        self.assertEqual(self.search('accountant'), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self.search('"NEAR( OR *'), [])
+        response = self.client.get(reverse('employee-search'))
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,204 @@
+from asgiref.sync import async_to_sync
+from io import StringIO
+from django.core.management import call_command
+from django.db import IntegrityError, connections
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.api.serializers import CustomTokenObtainPairSerializer
+from core.benchmarks.database import drop_database, register_sqlite_database
+from core.counters import rebuild_counters
+from core.models import Company, Department, Employee, User
+from core import sharding
+from core.sharding import forget_shard
+
+SHARDS = ['test_shard_a', 'test_shard_b']
+
+
+# Two throwaway SQLite files as shards next to the test database, which
+# stays the primary. TransactionTestCase, since writes span databases.
+@override_settings(DATABASE_SHARDS=SHARDS, API_RESPONSE_CACHE=None)
+class ShardingTests(TransactionTestCase):
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.paths = {alias: register_sqlite_database(alias) for alias in SHARDS}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias, path in cls.paths.items():
+            drop_database(alias, path)
+            del connections[alias]
+            # connections.settings is settings.DATABASES
+            del connections.settings[alias]
+
+    def setUp(self):
+        forget_shard()
+        self.client = APIClient()
+        self.admin = User.objects.create(email='admin@test.com', role='admin')
+        self.acme = Company.objects.create(name='Acme')
+        self.globex = Company.objects.create(name='Globex')
+        self.engineering = Department.objects.create(name='Engineering', company=self.acme)
+        self.sales = Department.objects.create(name='Sales', company=self.globex)
+        self.manager = self.hire('manager@acme.com', self.engineering, 'Mona', role='manager')
+        for i in range(3):
+            self.hire(f'employee{i}@acme.com', self.engineering, f'Acme Engineer {i}')
+            self.hire(f'employee{i}@globex.com', self.sales, f'Globex Engineer {i}')
+
+    def hire(self, email, department, name, role='employee'):
+        user = User.objects.create(email=email, role=role)
+        return Employee.objects.create(
+            user=user, company=department.company, department=department, name=name,
+            mobile_number='1234567890', address='Cairo', designation='Engineer'
+        )
+
+    def test_tenant_rows_live_on_their_company_shard(self):
+        self.assertEqual((self.acme.shard, self.globex.shard), ('test_shard_a', 'test_shard_b'))
+        self.assertEqual(Employee.objects.using('test_shard_a').count(), 4)
+        self.assertEqual(Employee.objects.using('test_shard_b').count(), 3)
+        self.assertFalse(Employee.objects.using('default').exists())
+        # Copies of the company and user rows the tenant rows point at
+        self.assertEqual(list(Company.objects.using('test_shard_b').values_list('name', flat=True)), ['Globex'])
+        self.assertEqual(User.objects.using('test_shard_b').count(), 3)
+
+        ids = [pk for alias in SHARDS for pk in Employee.objects.using(alias).values_list('id', flat=True)]
+        self.assertEqual(len(set(ids)), 7)
+        self.acme.refresh_from_db()
+        self.assertEqual((self.acme.department_count, self.acme.employee_count), (1, 4))
+
+    def test_manager_reads_their_own_shard(self):
+        self.client.force_authenticate(user=self.manager.user)
+        response = self.client.get(reverse('employee-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual({row['company'] for row in response.data['results']}, {self.acme.id})
+        response = self.client.get(reverse('department-detail', args=[self.sales.id]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get(reverse('user-profile')).data['email'], 'manager@acme.com')
+
+    def test_admin_lists_gather_every_shard(self):
+        self.client.force_authenticate(user=self.admin)
+        url, ids = reverse('employee-list') + '?page_size=3', []
+        while url:
+            data = self.client.get(url).data
+            ids += [row['id'] for row in data['results']]
+            url = data['next']
+        self.assertEqual(ids, sorted(
+            pk for alias in SHARDS for pk in Employee.objects.using(alias).values_list('id', flat=True)
+        ))
+        response = self.client.get(reverse('department-list'))
+        self.assertEqual([row['name'] for row in response.data['results']], ['Engineering', 'Sales'])
+        response = self.client.get(reverse('employee-detail', args=[ids[-1]]))
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(reverse('employee-search'), {'q': 'engineer'})
+        self.assertEqual(response.data['count'], 7)
+        response = self.client.get(reverse('employee-export'))
+        self.assertEqual(len(b''.join(response.streaming_content).decode().splitlines()), 8)
+
+    def test_async_views_read_from_the_shards(self):
+        client = AsyncClient()
+        for user, count in ((self.admin, 7), (self.manager.user, 4)):
+            token = f'Bearer {CustomTokenObtainPairSerializer.get_token(user).access_token}'
+            forget_shard()
+            response = async_to_sync(client.get)(reverse('async-employee-list'), headers={'Authorization': token})
+            self.assertEqual(len(response.json()['results']), count)
+        response = async_to_sync(client.get)(reverse('async-user-profile'), headers={'Authorization': token})
+        self.assertEqual(response.json()['email'], 'manager@acme.com')
+
+    def test_writes_go_to_the_company_shard(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(reverse('employee-list'), {
+            'name': 'Jane Doe', 'email': 'jane@globex.com', 'password': 'testpass123',
+            'company': self.globex.id, 'department': self.sales.id, 'mobile_number': '1234567890',
+            'address': 'Giza', 'designation': 'Analyst',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Employee.objects.using('test_shard_b').filter(name='Jane Doe').exists())
+
+        response = self.client.patch(
+            reverse('employee-detail', args=[response.data['id']]), {'designation': 'Director'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Employee.objects.using('test_shard_b').get(name='Jane Doe').designation, 'Director')
+        self.globex.refresh_from_db()
+        self.assertEqual(self.globex.employee_count, 4)
+
+    def test_bulk_update_spans_the_shards(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(reverse('employee-bulk-update'), {
+            'filter': {'designation': 'Engineer'}, 'patch': {'status': 'active'},
+        }, format='json')
+        self.assertEqual(response.data, {'updated': 7})
+        platform = Department.objects.create(name='Platform', company=self.acme)
+        response = self.client.post(reverse('employee-bulk-update'), {
+            'filter': {'department': self.engineering.id}, 'patch': {'department': platform.id},
+        }, format='json')
+        self.assertEqual(response.data, {'updated': 4})
+        self.assertEqual(Department.objects.using('test_shard_a').get(pk=platform.pk).employee_count, 4)
+        self.assertEqual(Employee.objects.using('test_shard_b').filter(status='active').count(), 3)
+
+    def test_move_company(self):
+        call_command('move_company', self.acme.id, 'test_shard_b', stdout=StringIO())
+        self.assertFalse(Employee.objects.using('test_shard_a').exists())
+        self.assertFalse(User.objects.using('test_shard_a').exists())
+        self.assertEqual(Employee.objects.using('test_shard_b').count(), 7)
+        self.acme.refresh_from_db()
+        self.assertEqual((self.acme.shard, self.acme.employee_count), ('test_shard_b', 4))
+
+        self.client.force_authenticate(user=self.manager.user)
+        self.assertEqual(len(self.client.get(reverse('employee-list')).data['results']), 4)
+
+        # And back onto the primary
+        call_command('move_company', self.acme.id, 'default', stdout=StringIO())
+        self.assertEqual(Employee.objects.using('default').count(), 4)
+        self.assertEqual(len(self.client.get(reverse('employee-list')).data['results']), 4)
+
+    def test_other_processes_follow_a_move(self):
+        self.client.force_authenticate(user=self.manager.user)
+        self.assertEqual(len(self.client.get(reverse('employee-list')).data['results']), 4)
+        # What another server process has cached when the command runs
+        stale_map, stale_version = dict(sharding._shard_map), list(sharding._shard_map_version)
+        self.assertEqual(stale_map[self.acme.id][0], 'test_shard_a')
+
+        call_command('move_company', self.acme.id, 'test_shard_b', stdout=StringIO())
+        sharding._shard_map.update(stale_map)
+        sharding._shard_map_version[:] = stale_version
+        self.assertEqual(len(self.client.get(reverse('employee-list')).data['results']), 4)
+        self.assertEqual(sharding.shard_for_company(self.acme.id), 'test_shard_b')
+        response = self.client.post(reverse('department-list'), {'name': 'Platform'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Department.objects.using('test_shard_b').filter(name='Platform').exists())
+
+        # Rows written to the old shard all the same fail instead of being lost
+        with self.assertRaises(IntegrityError):
+            Department.objects.using('test_shard_a').create(name='Orphan', company_id=self.acme.id)
+
+    def test_rebuild_counters_sums_every_shard(self):
+        Company.objects.update(employee_count=0, department_count=0)
+        Department.objects.using('test_shard_a').update(employee_count=0)
+        rebuild_counters()
+        self.assertEqual(
+            dict(Company.objects.values_list('name', 'employee_count')), {'Acme': 4, 'Globex': 3}
+        )
+        self.assertEqual(Department.objects.using('test_shard_a').get().employee_count, 4)
+
+    def test_company_destroy_clears_its_shard_and_users(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.delete(reverse('company-detail', args=[self.globex.id]))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Employee.objects.using('test_shard_b').exists())
+        self.assertFalse(Department.objects.using('test_shard_b').exists())
+        self.assertFalse(Company.objects.using('test_shard_b').exists())
+        self.assertFalse(User.objects.using('test_shard_b').exists())
+        self.assertFalse(User.objects.filter(email__endswith='@globex.com').exists())
+        self.assertEqual(Employee.objects.using('test_shard_a').count(), 4)
+
+    def test_deleting_a_company_clears_its_shard(self):
+        self.globex.delete()
+        self.assertFalse(Employee.objects.using('test_shard_b').exists())
+        self.assertFalse(Company.objects.using('test_shard_b').exists())
+        self.assertFalse(User.objects.using('test_shard_b').exists())
@@ -0,0 +1,77 @@
+import re
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.api.serializers import CustomTokenObtainPairSerializer
+from core.models import Company, Department, Employee, User
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for metric in header.split(', '):
+        name, *params = metric.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+@override_settings(API_RESPONSE_CACHE=None, REQUEST_TIMING={'SAMPLE_RATE': 1, 'HEADER': True, 'SLOW_REQUEST_MS': 60000})
+class QueryTimingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.acme = Company.objects.create(name='Acme')
+        cls.department = Department.objects.create(name='Engineering', company=cls.acme)
+        cls.manager = User.objects.create(email='manager@acme.com', role='manager')
+        Employee.objects.create(
+            user=cls.manager, company=cls.acme, department=cls.department, name='Mona',
+            mobile_number='1234567890', address='Cairo', designation='Manager'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+
+    def test_server_timing_header(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('employee-list'), {'fields': 'id,name'})
+        metrics = parse_server_timing(response['Server-Timing'])
+        self.assertEqual(metrics['db']['desc'], '"3 queries"')
+        self.assertGreater(float(metrics['serialize']['dur']), 0)
+        self.assertGreaterEqual(float(metrics['total']['dur']), float(metrics['db']['dur']))
+        self.assertEqual(metrics['view']['desc'], '"EmployeeViewSet.list"')
+
+        response = self.client.get(reverse('employee-search'), {'q': 'mona'})
+        self.assertEqual(parse_server_timing(response['Server-Timing'])['view']['desc'], '"EmployeeViewSet.search"')
+        response = self.client.get(reverse('user-profile'))
+        self.assertEqual(parse_server_timing(response['Server-Timing'])['view']['desc'], '"UserProfileView.get"')
+
+    @override_settings(REQUEST_TIMING={'SAMPLE_RATE': 0, 'HEADER': True, 'SLOW_REQUEST_MS': 60000})
+    def test_unsampled_requests_get_no_header(self):
+        response = self.client.get(reverse('employee-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(DEBUG=False, REQUEST_TIMING={'SAMPLE_RATE': 1})
+    def test_header_is_only_sent_in_debug_by_default(self):
+        response = self.client.get(reverse('employee-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(REQUEST_TIMING={'SAMPLE_RATE': 1, 'HEADER': True, 'SLOW_REQUEST_MS': 0, 'TOP_QUERIES': 2})
+    def test_slow_requests_are_logged_with_their_top_queries(self):
+        with self.assertLogs('core.timing', 'WARNING') as logs:
+            self.client.get(reverse('department-employees', args=[self.department.id]))
+        entry = logs.records[0].request_timing
+        self.assertEqual(entry['view'], 'DepartmentViewSet.employees')
+        self.assertEqual(entry['status'], 200)
+        self.assertTrue(entry['sampled'])
+        self.assertGreater(entry['queries'], 2)
+        self.assertEqual(len(entry['top_queries']), 2)
+        self.assertTrue(all(re.match(r'\s*SELECT', query['sql']) for query in entry['top_queries']))
+
+    async def test_async_views_record_their_queries(self):
+        token = await sync_to_async(lambda: str(CustomTokenObtainPairSerializer.get_token(self.manager).access_token))()
+        response = await AsyncClient().get(reverse('async-employee-list'), headers={'Authorization': f'Bearer {token}'})
+        metrics = parse_server_timing(response['Server-Timing'])
+        self.assertNotEqual(metrics['db']['desc'], '"0 queries"')
+        self.assertEqual(metrics['view']['desc'], '"EmployeeViewSet.list"')
@@ -35,4 +35,40 @@ class CompanyViewSetIntegrationTests(TestCase):
         company_depts_url = reverse('company-departments', args=[company_id])
         response = self.client.get(company_depts_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
\ No newline at end of file
+        self.assertEqual(len(response.data['results']), 1)
+
+class CompanyCountQueryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = User.objects.create_user(
+            email='admin@test.com',
+            password='testpass123',
+            role='admin'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def create_companies(self, count):
+        start = Company.objects.count()
+        for i in range(start, start + count):
+            company = Company.objects.create(name=f'Company {i}')
+            Department.objects.create(name='Engineering', company=company)
+
+    # One query for the rows plus one for the ETag/Last-Modified validators
+    def test_company_list_query_count_is_constant(self):
+        self.create_companies(1)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('company-list'))
+        self.assertEqual(response.data['results'][0]['number_of_departments'], 1)
+        self.assertEqual(response.data['results'][0]['number_of_employees'], 0)
+
+        self.create_companies(20)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('company-list'))
+        self.assertEqual(len(response.data['results']), 21)
+
+    def test_department_list_query_count_is_constant(self):
+        self.create_companies(20)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('department-list'))
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual(response.data['results'][0]['number_of_employees'], 0)
@@ -0,0 +1,133 @@
+import time
+from unittest import mock
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from core.api.authentication import ClaimsJWTAuthentication, revoke_tokens, verified_tokens
+from core.api.serializers import CustomTokenObtainPairSerializer, EmployeeUpdateSerializer
+from core.deletion import delete_company
+from core.models import Company, Department, Employee, User
+
+CLAIMS_AUTH = {
+    'DEFAULT_AUTHENTICATION_CLASSES': ('core.api.authentication.ClaimsJWTAuthentication',),
+    'DEFAULT_PERMISSION_CLASSES': ('rest_framework.permissions.IsAuthenticated',),
+    'DEFAULT_PAGINATION_CLASS': 'core.api.pagination.IdCursorPagination',
+}
+
+
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        verified_tokens.clear()
+        self.factory = APIRequestFactory()
+        self.company = Company.objects.create(name='Test Company')
+        self.department = Department.objects.create(name='Test Department', company=self.company)
+        self.manager = User.objects.create(email='manager@test.com', role='manager')
+        self.employee = Employee.objects.create(
+            user=self.manager, company=self.company, department=self.department, name='Manager',
+            mobile_number='1234567890', address='Address', designation='Manager'
+        )
+        self.admin_user = User.objects.create(email='admin@test.com', role='admin')
+
+    def access_token(self, user):
+        return str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+
+    def authenticate(self, token):
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return ClaimsJWTAuthentication().authenticate(request)
+
+    def test_authenticates_from_claims_without_queries(self):
+        token = self.access_token(self.manager)
+        # The first sight of a token checks its version
+        with self.assertNumQueries(1):
+            self.authenticate(token)
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(token)
+            self.assertEqual(user.id, self.manager.id)
+            self.assertEqual(user.role, 'manager')
+            self.assertEqual(user.employee.id, self.employee.id)
+            self.assertEqual(user.employee.company, self.company)
+
+    def test_verified_tokens_are_cached(self):
+        token = self.access_token(self.manager)
+        self.authenticate(token)
+        with mock.patch.object(ClaimsJWTAuthentication, 'get_validated_token') as validate:
+            self.authenticate(token)
+        validate.assert_not_called()
+
+    def test_role_change_revokes_tokens(self):
+        token = self.access_token(self.manager)
+        self.authenticate(token)
+        request = self.factory.patch('/')
+        request.user = self.admin_user
+        serializer = EmployeeUpdateSerializer(
+            self.employee, data={'role': 'employee'}, partial=True, context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+        # Signing in again, even within the same second, gives a working token
+        user, _ = self.authenticate(self.access_token(User.objects.get(pk=self.manager.pk)))
+        self.assertEqual(user.role, 'employee')
+
+    def test_revocations_by_other_workers_apply_within_the_check_interval(self):
+        token = self.access_token(self.manager)
+        self.authenticate(token)
+        # What revoke_tokens() does in another process: only the database changes
+        User.objects.filter(pk=self.manager.pk).update(token_version=F('token_version') + 1)
+        self.authenticate(token)
+        later = time.time() + 31
+        with mock.patch('core.api.authentication.time.time', return_value=later):
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate(token)
+
+    def test_saving_a_stale_user_keeps_the_revocation(self):
+        token = self.access_token(self.manager)
+        stale = User.objects.get(pk=self.manager.pk)
+        self.authenticate(token)
+        revoke_tokens(self.manager.pk)
+        stale.first_name = 'Mona'
+        stale.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_deactivation_revokes_tokens(self):
+        token = self.access_token(self.manager)
+        self.authenticate(token)
+        user = User.objects.get(pk=self.manager.pk)
+        user.first_name = 'Mona'
+        user.save()
+        self.authenticate(token)
+        user.is_active = False
+        user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_deleting_the_employee_or_company_revokes_tokens(self):
+        token = self.access_token(self.manager)
+        self.authenticate(token)
+        Employee.objects.get(pk=self.employee.pk).delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+        # core/deletion.py deletes without signals
+        user = User.objects.create(email='employee@test.com')
+        Employee.objects.create(
+            user=user, company=self.company, department=self.department, name='Employee',
+            mobile_number='1234567890', address='Address', designation='Engineer'
+        )
+        token = self.access_token(user)
+        self.authenticate(token)
+        delete_company(Company.objects.get(pk=self.company.pk))
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    @override_settings(REST_FRAMEWORK=CLAIMS_AUTH)
+    def test_manager_lists_company_employees_with_claims_auth(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access_token(self.manager)}')
+        response = client.get(reverse('employee-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.employee.id])
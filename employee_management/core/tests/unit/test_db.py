@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.db import connections
+from django.test import SimpleTestCase
+
+
+class SQLiteProfileTests(SimpleTestCase):
+    def open(self, profile):
+        # A standalone connection to a scratch file with the profile's options
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        default = connections['default']
+        settings_dict = {**default.settings_dict, 'NAME': os.path.join(directory.name, 'profile.sqlite3'),
+                         **settings.SQLITE_PROFILES[profile]}
+        connection = type(default)(settings_dict, alias=f'profile_{profile}')
+        self.addCleanup(connection.close)
+        return connection
+
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_performance_profile_applies_pragmas_on_connect(self):
+        connection = self.open('performance')
+        self.assertEqual(self.pragma(connection, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(connection, 'synchronous'), 1)
+        self.assertEqual(self.pragma(connection, 'busy_timeout'), 5000)
+        self.assertEqual(self.pragma(connection, 'cache_size'), -65536)
+        self.assertEqual(self.pragma(connection, 'temp_store'), 2)
+        self.assertEqual(connection.settings_dict['CONN_MAX_AGE'], 600)
+
+    def test_stock_profile_leaves_sqlite_defaults(self):
+        connection = self.open('stock')
+        self.assertEqual(self.pragma(connection, 'journal_mode'), 'delete')
+        self.assertEqual(self.pragma(connection, 'synchronous'), 2)
@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+import tempfile
+from django.conf import settings
+from django.test import SimpleTestCase
+
+WORKER = "from core.metrics import REQUESTS; REQUESTS.labels('EmployeeViewSet.list', 'GET', '200').inc(2)"
+SCRAPE = "from prometheus_client import generate_latest; from core.metrics import metrics_registry; " \
+         "print(generate_latest(metrics_registry()).decode())"
+
+
+class MultiprocessMetricsTests(SimpleTestCase):
+    def run_python(self, code, directory):
+        # Multiprocess mode is picked when prometheus_client is imported, so
+        # every "worker" is a fresh interpreter
+        env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': directory}
+        return subprocess.run([sys.executable, '-c', code], cwd=settings.BASE_DIR, env=env,
+                              capture_output=True, text=True, check=True).stdout
+
+    def test_scrape_adds_up_every_worker(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.run_python(WORKER, directory)
+            self.run_python(WORKER, directory)
+            exposition = self.run_python(SCRAPE, directory)
+        self.assertIn(
+            'http_requests_total{method="GET",status="200",view="EmployeeViewSet.list"} 4.0', exposition.splitlines()
+        )
@@ -1,6 +1,10 @@
-from django.test import TestCase
+from io import StringIO
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
 from django.contrib.auth import get_user_model
-from core.models import Company, Department, Employee
+from core.api.serializers import EmployeeUpdateSerializer
+from core.counters import rebuild_counters
+from core.models import Company, Department, Employee, User
 from datetime import date
 
 class UserModelTests(TestCase):
@@ -37,4 +41,94 @@ class DepartmentModelTests(TestCase):
             company=self.company
         )
         self.assertEqual(str(dept), 'Test Department')
-        self.assertEqual(dept.number_of_employees, 0)
\ No newline at end of file
+        self.assertEqual(dept.number_of_employees, 0)
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Test Company')
+        self.dept_a = Department.objects.create(name='A', company=self.company)
+        self.dept_b = Department.objects.create(name='B', company=self.company)
+        user = User.objects.create_user(email='emp@test.com', password='testpass123')
+        self.employee = Employee.objects.create(
+            user=user, company=self.company, department=self.dept_a,
+            name='Emp', mobile_number='1234567890', address='Addr', designation='Dev'
+        )
+
+    def test_counters_follow_create_move_and_delete(self):
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.number_of_departments, 2)
+        self.assertEqual(self.company.number_of_employees, 1)
+
+        employee = Employee.objects.get(pk=self.employee.pk)
+        employee.department = self.dept_b
+        employee.save()
+        self.dept_a.refresh_from_db()
+        self.dept_b.refresh_from_db()
+        self.assertEqual(self.dept_a.number_of_employees, 0)
+        self.assertEqual(self.dept_b.number_of_employees, 1)
+
+        employee.delete()
+        self.dept_b.delete()
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.number_of_departments, 1)
+        self.assertEqual(self.company.number_of_employees, 0)
+
+    def test_saving_a_stale_instance_keeps_the_counters(self):
+        stale_company = Company.objects.get(pk=self.company.pk)
+        stale_department = Department.objects.get(pk=self.dept_a.pk)
+        Department.objects.create(name='C', company=self.company)
+        user = User.objects.create_user(email='emp2@test.com', password='testpass123')
+        Employee.objects.create(
+            user=user, company=self.company, department=self.dept_a,
+            name='Emp 2', mobile_number='1234567890', address='Addr', designation='Dev'
+        )
+        version = Company.objects.get(pk=self.company.pk).data_version
+
+        stale_company.name = 'Renamed'
+        stale_company.save()
+        stale_department.name = 'Renamed'
+        stale_department.save()
+        company = Company.objects.get(pk=self.company.pk)
+        self.assertEqual((company.name, company.department_count, company.employee_count), ('Renamed', 3, 2))
+        self.assertGreater(company.data_version, version)
+        self.assertEqual(Department.objects.get(pk=self.dept_a.pk).employee_count, 2)
+
+    def test_rebuild_counters_command(self):
+        Company.objects.update(department_count=0, employee_count=0)
+        Department.objects.update(employee_count=7)
+        call_command('rebuild_counters', stdout=StringIO())
+        self.company.refresh_from_db()
+        self.dept_a.refresh_from_db()
+        self.assertEqual(self.company.number_of_departments, 2)
+        self.assertEqual(self.company.number_of_employees, 1)
+        self.assertEqual(self.dept_a.number_of_employees, 1)
+
+    def test_rebuild_agrees_after_a_move_to_another_companys_department(self):
+        other = Company.objects.create(name='Other Company')
+        other_department = Department.objects.create(name='C', company=other)
+        request = RequestFactory().patch('/')
+        request.user = User.objects.create(email='admin@test.com', role='admin')
+        serializer = EmployeeUpdateSerializer(
+            self.employee, data={'department': other_department.id}, partial=True, context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        def counters():
+            return (
+                dict(Company.objects.values_list('name', 'employee_count')),
+                dict(Department.objects.values_list('name', 'employee_count')),
+            )
+        live = counters()
+        self.assertEqual(live, ({'Test Company': 1, 'Other Company': 0}, {'A': 0, 'B': 0, 'C': 1}))
+        rebuild_counters()
+        self.assertEqual(counters(), live)
+
+        # Moving the employee's company follows as well
+        employee = Employee.objects.get(pk=self.employee.pk)
+        employee.company = other
+        employee.save()
+        live = counters()
+        self.assertEqual(live[0], {'Test Company': 0, 'Other Company': 1})
+        rebuild_counters()
+        self.assertEqual(counters(), live)
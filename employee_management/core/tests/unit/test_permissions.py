@@ -2,6 +2,7 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIRequestFactory
 from core.api.permissions import IsAdminUser, IsManagerUser
+from core.api.principal import get_principal
 from core.models import Company, Department, Employee
 
 class PermissionTests(TestCase):
@@ -27,4 +28,39 @@ class PermissionTests(TestCase):
     def test_manager_permission(self):
         request = self.factory.get('/')
         request.user = self.manager_user
-        self.assertTrue(IsManagerUser().has_permission(request, None))
\ No newline at end of file
+        self.assertTrue(IsManagerUser().has_permission(request, None))
+
+class PrincipalTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.company = Company.objects.create(name='Test Company')
+        self.other_company = Company.objects.create(name='Other Company')
+        self.department = Department.objects.create(name='Test Department', company=self.company)
+        self.manager_user = get_user_model().objects.create(email='manager@test.com', role='manager')
+        self.employee = Employee.objects.create(
+            user=self.manager_user, company=self.company, department=self.department, name='Manager',
+            mobile_number='1234567890', address='Address', designation='Manager'
+        )
+
+    def test_principal_is_resolved_once_per_request(self):
+        request = self.factory.get('/')
+        request.user = self.manager_user
+        with self.assertNumQueries(1):
+            principal = get_principal(request)
+            self.assertIs(get_principal(request), principal)
+        self.assertEqual(
+            (principal.role, principal.employee_id, principal.company_id),
+            ('manager', self.employee.id, self.company.id)
+        )
+
+    def test_manager_object_permission_compares_ids(self):
+        request = self.factory.get('/')
+        request.user = self.manager_user
+        permission = IsManagerUser()
+        get_principal(request)
+        other_department = Department(id=999, company_id=self.other_company.id)
+        with self.assertNumQueries(0):
+            self.assertTrue(permission.has_object_permission(request, None, self.department))
+            self.assertTrue(permission.has_object_permission(request, None, self.company))
+            self.assertFalse(permission.has_object_permission(request, None, other_department))
+            self.assertFalse(permission.has_object_permission(request, None, self.other_company))
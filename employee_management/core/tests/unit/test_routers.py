@@ -0,0 +1,81 @@
+import os
+import sqlite3
+import tempfile
+
+from django.db import router
+from django.test import SimpleTestCase, override_settings
+from core.checks import shard_map_cache_check
+from core.management.commands.sync_replica import copy_sqlite_database
+from core.models import Company, Employee
+from core.routers import replica_reads
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(SimpleTestCase):
+    def test_reads_use_the_primary_outside_replica_blocks(self):
+        self.assertEqual(router.db_for_read(Employee), 'default')
+        self.assertEqual(router.db_for_write(Employee), 'default')
+
+    def test_reads_use_the_replica_until_the_first_write(self):
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Employee), 'replica')
+            self.assertEqual(router.db_for_read(Company), 'replica')
+            self.assertEqual(router.db_for_write(Employee), 'default')
+            self.assertEqual(router.db_for_read(Employee), 'default')
+            self.assertEqual(router.db_for_read(Company), 'default')
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Employee), 'replica')
+        self.assertEqual(router.db_for_read(Employee), 'default')
+
+    @override_settings(DATABASE_REPLICAS=['replica-1', 'replica-2'])
+    def test_one_replica_per_block(self):
+        for _ in range(20):
+            with replica_reads():
+                aliases = {router.db_for_read(Employee) for _ in range(10)}
+            self.assertEqual(len(aliases), 1)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_uses_the_primary(self):
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Employee), 'default')
+
+    def test_objects_read_from_a_replica_are_saved_to_the_primary(self):
+        company = Company(name='Acme')
+        company._state.db = 'replica'
+        self.assertEqual(router.db_for_write(Company, instance=company), 'default')
+        other = Company(name='Globex')
+        other._state.db = 'default'
+        self.assertTrue(router.allow_relation(company, other))
+        self.assertFalse(router.allow_migrate('replica', 'core'))
+        self.assertTrue(router.allow_migrate('default', 'core'))
+
+
+class CopySQLiteDatabaseTests(SimpleTestCase):
+    def test_copies_a_snapshot_over_the_target(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        source, target = (os.path.join(directory.name, name) for name in ('primary.sqlite3', 'replica.sqlite3'))
+        primary = sqlite3.connect(source)
+        primary.executescript('CREATE TABLE t (n INTEGER); INSERT INTO t VALUES (1), (2);')
+        copy_sqlite_database(source, target)
+        primary.execute('INSERT INTO t VALUES (3)')
+        primary.commit()
+        primary.close()
+
+        replica = sqlite3.connect(target)
+        self.assertEqual(replica.execute('SELECT COUNT(*) FROM t').fetchone()[0], 2)
+        replica.close()
+        copy_sqlite_database(source, target)
+        replica = sqlite3.connect(target)
+        self.assertEqual(replica.execute('SELECT COUNT(*) FROM t').fetchone()[0], 3)
+        replica.close()
+
+
+class ShardMapCacheCheckTests(SimpleTestCase):
+    def test_warns_about_a_per_process_cache(self):
+        self.assertEqual(shard_map_cache_check(None), [])
+        with override_settings(DATABASE_SHARDS=['shard1']):
+            self.assertEqual([warning.id for warning in shard_map_cache_check(None)], ['core.W001'])
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp'}}
+        with override_settings(DATABASE_SHARDS=['shard1'], CACHES=shared):
+            self.assertEqual(shard_map_cache_check(None), [])
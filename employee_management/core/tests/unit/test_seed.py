@@ -0,0 +1,31 @@
+from django.test import TestCase
+from core.benchmarks.seed import seed
+from core.models import Company, Department, Employee, User
+
+
+class SeedTests(TestCase):
+    def test_seed_builds_consistent_dataset(self):
+        company_ids = seed('default', companies=2, departments=3, employees=20, batch_size=7, admins=1)
+        self.assertEqual(len(company_ids), 2)
+        self.assertEqual(Department.objects.count(), 6)
+        self.assertEqual(Employee.objects.count(), 20)
+        self.assertEqual(User.objects.filter(role='manager').count(), 2)
+        self.assertFalse(User.objects.filter(role='admin', employee__isnull=False).exists())
+        self.assertEqual(User.objects.filter(role='admin').count(), 1)
+        company = Company.objects.get(pk=company_ids[0])
+        self.assertEqual(company.number_of_departments, 3)
+        self.assertEqual(company.number_of_employees, Employee.objects.filter(company=company).count())
+        self.assertTrue(User.objects.first().check_password('password123'))
+        for employee in Employee.objects.select_related('department'):
+            self.assertEqual(employee.company_id, employee.department.company_id)
+
+    def test_seed_is_deterministic(self):
+        seed('default', companies=1, departments=2, employees=5)
+        first = list(Employee.objects.order_by('id').values_list('name', 'designation', 'hired_on'))
+        Employee.objects.all().delete()
+        User.objects.all().delete()
+        Department.objects.all().delete()
+        Company.objects.all().delete()
+        seed('default', companies=1, departments=2, employees=5)
+        second = list(Employee.objects.order_by('id').values_list('name', 'designation', 'hired_on'))
+        self.assertEqual(first, second)
@@ -0,0 +1,184 @@
+import logging
+import random
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger('core.timing')
+
+# The RequestTiming of the request being handled, if it was sampled.
+# ContextVars follow sync_to_async()/async_to_sync(), so queries the async
+# views run in a worker thread are recorded too.
+_timing = ContextVar('request_timing', default=None)
+
+
+def timing_settings():
+    return {
+        'SAMPLE_RATE': 0.01,       # share of requests whose queries are recorded
+        'SLOW_REQUEST_MS': 500,    # log requests that take at least this long
+        'TOP_QUERIES': 5,          # statements to include in the slow request log
+        'HEADER': settings.DEBUG,  # send Server-Timing on sampled requests
+        **getattr(settings, 'REQUEST_TIMING', {}),
+    }
+
+
+class RequestTiming:
+    def __init__(self, sampled):
+        self.sampled = sampled
+        self.started = perf_counter()
+        self.queries = 0
+        self.sql = 0.0
+        self.serialize = 0.0
+        self.serializing = False
+        self.view = None
+        # SQL text -> [executions, seconds]
+        self.statements = {}
+
+    def add_query(self, sql, seconds):
+        self.queries += 1
+        self.sql += seconds
+        statement = self.statements.get(sql)
+        if statement is None:
+            self.statements[sql] = [1, seconds]
+        else:
+            statement[0] += 1
+            statement[1] += seconds
+
+    def top_queries(self, count):
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:count]
+        return [{'sql': sql, 'count': n, 'total_ms': round(seconds * 1000, 3)} for sql, (n, seconds) in ranked]
+
+    def server_timing(self, total):
+        header = (
+            f'db;dur={self.sql * 1000:.2f};desc="{self.queries} queries", '
+            f'serialize;dur={self.serialize * 1000:.2f}, total;dur={total * 1000:.2f}'
+        )
+        return f'{header}, view;desc="{self.view}"' if self.view else header
+
+
+def record_query(execute, sql, params, many, context):
+    # Times cursor.execute(); rows are fetched afterwards, so large result
+    # sets are partly counted as application time
+    timing = _timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.add_query(sql, perf_counter() - start)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # Installed once per connection object, which outlives reconnects
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def timed_serialization(function, *args):
+    # Adds function(*args) to the request's `serialize` timing. Only the
+    # outermost call counts, so nested serializers aren't counted twice;
+    # queries it triggers stay under `db`.
+    timing = _timing.get()
+    if timing is None or timing.serializing:
+        return function(*args)
+    timing.serializing = True
+    start, sql = perf_counter(), timing.sql
+    try:
+        return function(*args)
+    finally:
+        timing.serialize += perf_counter() - start - (timing.sql - sql)
+        timing.serializing = False
+
+
+class TimedSerializerMixin:
+    def to_representation(self, instance):
+        return timed_serialization(super().to_representation, instance)
+
+
+def view_name(request):
+    # "EmployeeViewSet.list", "EmployeeViewSet.search", "UserProfileView.get"
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    view = match.func
+    # The async twins of the viewset endpoints (core/api/async_views.py)
+    viewset = getattr(view, 'view_initkwargs', {}).get('viewset_class')
+    if viewset is not None:
+        return f'{viewset.__name__}.{"retrieve" if "pk" in match.kwargs else "list"}'
+    view_class = getattr(view, 'cls', None) or getattr(view, 'view_class', None)
+    if view_class is None:
+        return match.view_name
+    action = (getattr(view, 'actions', None) or {}).get(request.method.lower(), request.method.lower())
+    return f'{view_class.__name__}.{action}'
+
+
+class QueryTimingMiddleware:
+    # Query count, SQL time and serializer time per request, sent back as a
+    # Server-Timing header; requests slower than SLOW_REQUEST_MS are logged
+    # to `core.timing` with their most expensive statements. Only sampled
+    # requests record queries; the rest just pay for two clock reads. SQL
+    # that runs while a streaming response is sent isn't included.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        options = timing_settings()
+        timing, token = self.start(request, options)
+        try:
+            response = self.get_response(request)
+        finally:
+            _timing.reset(token)
+        return self.finish(request, response, timing, options)
+
+    async def __acall__(self, request):
+        options = timing_settings()
+        timing, token = self.start(request, options)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timing.reset(token)
+        return self.finish(request, response, timing, options)
+
+    def start(self, request, options):
+        timing = RequestTiming(random.random() < options['SAMPLE_RATE'])
+        request.request_timing = timing
+        return timing, _timing.set(timing if timing.sampled else None)
+
+    def finish(self, request, response, timing, options):
+        total = perf_counter() - timing.started
+        timing.view = view_name(request)
+        if timing.sampled and options['HEADER']:
+            response['Server-Timing'] = timing.server_timing(total)
+        if total * 1000 >= options['SLOW_REQUEST_MS']:
+            entry = {
+                'method': request.method,
+                'path': request.path,
+                'view': timing.view,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 3),
+                'sampled': timing.sampled,
+            }
+            if timing.sampled:
+                entry.update(
+                    queries=timing.queries,
+                    sql_ms=round(timing.sql * 1000, 3),
+                    serialize_ms=round(timing.serialize * 1000, 3),
+                    top_queries=timing.top_queries(options['TOP_QUERIES']),
+                )
+            logger.warning('Slow request %s %s (%s): %.0f ms', request.method, request.path, timing.view,
+                           total * 1000, extra={'request_timing': entry})
+        return response
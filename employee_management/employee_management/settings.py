@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -45,6 +46,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so its timings cover the rest of the stack (core/timing.py)
+    'core.timing.QueryTimingMiddleware',
+    'core.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -82,13 +86,69 @@ WSGI_APPLICATION = 'employee_management.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# SQLite connection profiles. PRAGMAS are applied to every new connection
+# by core/db.py. 'performance' switches to WAL, so readers and the writer
+# stop blocking each other, and keeps connections open between requests.
+# 'stock' is SQLite's defaults (rollback journal, synchronous=FULL, a new
+# connection per request). Select one with the SQLITE_PROFILE env var;
+# `manage.py bench_sqlite_load` compares them.
+SQLITE_PROFILES = {
+    'stock': {
+        'CONN_MAX_AGE': 0,
+        'PRAGMAS': {},
+    },
+    'performance': {
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'PRAGMAS': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,        # ms
+            'mmap_size': 268435456,      # 256 MiB
+            'cache_size': -65536,        # negative = KiB, so 64 MiB
+            'temp_store': 'MEMORY',
+        },
+    },
+}
+SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'performance')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        **SQLITE_PROFILES[SQLITE_PROFILE],
     }
 }
 
+# Read replicas (core/routers.py): GET requests to the API views read from
+# one of DATABASE_REPLICAS until they write; everything else uses `default`.
+# Locally SQLITE_REPLICA names a second SQLite file that
+# `manage.py sync_replica --interval N` keeps copying from the primary.
+DATABASE_ROUTERS = ['core.routers.ShardRouter', 'core.routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+if os.environ.get('SQLITE_REPLICA'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['SQLITE_REPLICA'],
+        'PRAGMAS': {**DATABASES['default']['PRAGMAS'], 'query_only': 'ON'},
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS = ['replica']
+
+# Shards (core/sharding.py): each company's departments and employees live
+# on the database its Company.shard names; companies and users stay on
+# `default`. Locally SQLITE_SHARDS is a comma-separated list of SQLite files
+# that become shard1..shardN (run `migrate --database shardN` for each).
+# Each process caches the shard map for SHARD_MAP_TTL seconds. A move bumps
+# a version in SHARD_MAP_CACHE that every lookup checks, so that cache must
+# be shared by all processes (LocMemCache only works with one).
+DATABASE_SHARDS = []
+SHARD_MAP_TTL = 30
+SHARD_MAP_CACHE = 'default'
+for number, path in enumerate(filter(None, os.environ.get('SQLITE_SHARDS', '').split(',')), 1):
+    DATABASES[f'shard{number}'] = {**DATABASES['default'], 'NAME': path.strip()}
+    DATABASE_SHARDS.append(f'shard{number}')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -109,21 +169,84 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 AUTH_USER_MODEL = 'core.User'
 REST_FRAMEWORK = {
+    # 'core.api.authentication.ClaimsJWTAuthentication' authorizes from the
+    # role/employee/company token claims without loading the user
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
-    )
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'core.api.pagination.IdCursorPagination',
 }
 
+# Serve JSON employee list/retrieve from QuerySet.values() rows instead of
+# EmployeeSerializer (same bytes, see core/api/fastpath.py). Off unless
+# EMPLOYEE_FAST_READS=1 is set: the fast path skips serializer code, so
+# fields or to_representation() changes added to EmployeeSerializer need a
+# matching change in fastpath.py before turning it on.
+EMPLOYEE_FAST_READS = os.environ.get('EMPLOYEE_FAST_READS') == '1'
+
+# Bulk employee import (POST /api/employees/bulk/)
+BULK_IMPORT_MAX_ROWS = 50000
+BULK_IMPORT_CHUNK_SIZE = 1000
+# Password hashing processes; None uses every CPU. Batches smaller than the
+# threshold are hashed inline since starting the pool costs more.
+BULK_IMPORT_HASH_WORKERS = None
+BULK_IMPORT_POOL_THRESHOLD = 64
+
+# Bulk employee update (POST /api/employees/bulk-update/)
+BULK_UPDATE_MAX_IDS = 50000
+# Rows per transaction when deleting a company or department (core/deletion.py)
+BULK_DELETE_CHUNK_SIZE = 1000
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'USER_ID_FIELD': 'email',
     'USER_ID_CLAIM': 'email',
+    'TOKEN_REFRESH_SERIALIZER': 'core.api.serializers.CustomTokenRefreshSerializer',
 }
 
+# ClaimsJWTAuthentication: size of the verified-token LRU and how often (in
+# seconds) a cached token is re-checked against its user's token_version,
+# which is how long other workers can keep accepting a revoked token
+JWT_CLAIMS_AUTH = {
+    'TOKEN_CACHE_SIZE': 10000,
+    'REVOCATION_CHECK_INTERVAL': 30,
+}
+
+# Read responses are cached under their ETag (core/api/caching.py), so a
+# write that bumps a company's data version makes its entries unreachable;
+# TIMEOUT/MAX_ENTRIES bound what is left behind (locmem evicts LRU).
+# API_RESPONSE_CACHE names the alias to use; None turns the cache off.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api-responses',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+API_RESPONSE_CACHE = 'api'
+
+# Per-request query timing (core/timing.py). Only a sample of requests
+# record their queries, and the Server-Timing header, which exposes query
+# counts and view names, is only sent in development.
+REQUEST_TIMING = {
+    'SAMPLE_RATE': float(os.environ.get('REQUEST_TIMING_SAMPLE_RATE', '0.01')),
+    'HEADER': DEBUG,
+}
+
+# Prometheus metrics at /metrics (core/metrics.py). Under gunicorn with
+# several workers, set PROMETHEUS_MULTIPROC_DIR in the environment to an
+# empty directory the workers share, so the scrape adds up every worker.
+# With METRICS_TOKEN set the scraper has to send it as a bearer token.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 
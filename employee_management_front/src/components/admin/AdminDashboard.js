@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import { fetchRemainingPages } from '../../utils/pagination';
 import './AdminDashboard.css';
 import CompanyCard from './CompanyCard';
 import DepartmentsList from './DepartmentsList';
@@ -36,12 +37,15 @@ const AdminDashboard = () => {
   const fetchCompanies = async () => {
     try {
       const token = localStorage.getItem('access_token');
-      const response = await axios.get('http://localhost:8000/api/companies/', {
+      const config = {
         headers: {
           Authorization: `Bearer ${token}`
         }
-      });
-      setCompanies(response.data);
+      };
+      // The first page of companies comes with the dashboard
+      const dashboard = await axios.get('http://localhost:8000/api/dashboard/', config);
+      const companyList = await fetchRemainingPages(dashboard.data.companies, config);
+      setCompanies(companyList);
       setIsLoading(false);
     } catch (err) {
       setError('Failed to fetch companies');
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
+import { fetchAllPages } from '../../utils/pagination';
 import DepartmentCard from './DepartmentCard';
 
 const DepartmentsList = ({ companyId, companyName, onDepartmentSelect, onBack }) => {
@@ -14,12 +15,12 @@ const DepartmentsList = ({ companyId, companyName, onDepartmentSelect, onBack })
   const fetchDepartments = async () => {
     try {
       const token = localStorage.getItem('access_token');
-      const response = await axios.get(`http://localhost:8000/api/companies/${companyId}/departments/`, {
+      const departmentList = await fetchAllPages(`http://localhost:8000/api/companies/${companyId}/departments/`, {
         headers: {
           Authorization: `Bearer ${token}`
         }
       });
-      setDepartments(response.data);
+      setDepartments(departmentList);
       setIsLoading(false);
     } catch (err) {
       setError('Failed to fetch departments');
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import axios from 'axios';
+import { fetchAllPages } from '../../utils/pagination';
 import EmployeeCard from './EmployeeCard';
 
 const EmployeesList = ({ departmentId, departmentName, companyName, onEmployeeSelect, onBack }) => {
@@ -14,12 +14,13 @@ const EmployeesList = ({ departmentId, departmentName, companyName, onEmployeeSe
   const fetchEmployees = async () => {
     try {
       const token = localStorage.getItem('access_token');
-      const response = await axios.get(`http://localhost:8000/api/departments/${departmentId}/employees/`, {
+      // EmployeeCard only shows these; the profile view loads the rest by id
+      const employeeList = await fetchAllPages(`http://localhost:8000/api/departments/${departmentId}/employees/?fields=id,name,designation,days_employed`, {
         headers: {
           Authorization: `Bearer ${token}`
         }
       });
-      setEmployees(response.data);
+      setEmployees(employeeList);
       setIsLoading(false);
     } catch (err) {
       setError('Failed to fetch employees');
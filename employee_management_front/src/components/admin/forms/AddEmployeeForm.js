@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
+import { fetchAllPages } from '../../../utils/pagination';
 
 const AddEmployeeForm = ({ companies, onSubmit, onCancel }) => {
   const [formData, setFormData] = useState({
@@ -30,12 +31,12 @@ const AddEmployeeForm = ({ companies, onSubmit, onCancel }) => {
   const fetchDepartments = async (companyId) => {
     try {
       const token = localStorage.getItem('access_token');
-      const response = await axios.get(`http://localhost:8000/api/companies/${companyId}/departments/`, {
+      const departmentList = await fetchAllPages(`http://localhost:8000/api/companies/${companyId}/departments/`, {
         headers: {
           Authorization: `Bearer ${token}`
         }
       });
-      setDepartments(response.data);
+      setDepartments(departmentList);
     } catch (err) {
       console.error(err);
     }
@@ -27,25 +27,16 @@ const EmployeeDashboard = () => {
   const fetchEmployeeData = async () => {
     try {
       const token = localStorage.getItem('access_token');
-      
-      // Get employee's profile
-      const profileResponse = await axios.get('http://localhost:8000/api/employees/', {
-        headers: {
-          Authorization: `Bearer ${token}`
-        }
-      });
-      
-      const profileData = profileResponse.data[0];
-      setProfile(profileData);
 
-      // Fetch company data from the companies endpoint
-      const companiesResponse = await axios.get('http://localhost:8000/api/companies/', {
+      // Profile and company in one request
+      const dashboard = await axios.get('http://localhost:8000/api/dashboard/', {
         headers: {
           Authorization: `Bearer ${token}`
         }
       });
 
-      setCompanies(companiesResponse.data);
+      setProfile(dashboard.data.profile);
+      setCompanies([dashboard.data.company]);
       setIsLoading(false);
     } catch (err) {
       setError('Failed to fetch employee data');
@@ -41,7 +41,7 @@ const EmployeeProfile = ({ employeeData, employeeId, onBack }) => {
           Authorization: `Bearer ${token}`,
         },
       });
-      setEmployee(response.data[0]);
+      setEmployee(response.data.results[0]);
       setIsLoading(false);
     } catch (err) {
       setError('Failed to fetch employee details');
@@ -67,7 +67,7 @@ const EmployeeProfile = ({ employeeData, employeeId, onBack }) => {
         },
       });
 
-      setEmployee(response.data[0]);
+      setEmployee(response.data.results[0]);
       setIsLoading(false);
     } catch (err) {
       setError('Failed to fetch your profile');
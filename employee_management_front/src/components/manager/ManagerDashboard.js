@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import { fetchRemainingPages } from '../../utils/pagination';
 import '../admin/AdminDashboard.css';
 import DepartmentCard from '../admin/DepartmentCard';
 import EmployeesList from '../admin/EmployeesList';
@@ -33,33 +34,18 @@ const ManagerDashboard = () => {
   const fetchManagerData = async () => {
     try {
       const token = localStorage.getItem('access_token');
-      
-      // Get manager's profile with their company information
-      const profileResponse = await axios.get('http://localhost:8000/api/profile/', {
+      const config = {
         headers: {
           Authorization: `Bearer ${token}`
         }
-      });
-      
+      };
 
-      
-      // Get company details
-      const companyResponse = await axios.get(`http://localhost:8000/api/companies/`, {
-        headers: {
-          Authorization: `Bearer ${token}`
-        }
-      });
-      
-      setCompany(companyResponse.data[0]);
-      
-      // Get departments for this company
-      const departmentsResponse = await axios.get(`http://localhost:8000/api/departments/`, {
-        headers: {
-          Authorization: `Bearer ${token}`
-        }
-      });
-      
-      setDepartments(departmentsResponse.data);
+      // Company and the first page of its departments in one request
+      const dashboard = await axios.get('http://localhost:8000/api/dashboard/', config);
+      setCompany(dashboard.data.company);
+
+      const departmentList = await fetchRemainingPages(dashboard.data.departments, config);
+      setDepartments(departmentList);
       setIsLoading(false);
     } catch (err) {
       setError('Failed to fetch company data');
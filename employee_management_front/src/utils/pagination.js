@@ -0,0 +1,18 @@
+import axios from 'axios';
+
+// List endpoints return cursor pages shaped like { next, previous, results }.
+// Follow the `next` links and return every row as a single array.
+export const fetchAllPages = async (url, config) => fetchRemainingPages({ next: url, results: [] }, config);
+
+// Rows of a page already in hand (e.g. from /api/dashboard/) plus every
+// page after it.
+export const fetchRemainingPages = async (page, config) => {
+  const results = [...page.results];
+  let next = page.next;
+  while (next) {
+    const response = await axios.get(next, config);
+    results.push(...response.data.results);
+    next = response.data.next;
+  }
+  return results;
+};